@@ -0,0 +1,818 @@
+#!/usr/bin/env python3
+"""
+OPNsense User Guide PDF Generator - Benchmarks
+Measures the cost of individual pieces of the PDF build pipeline
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import math
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFontFile
+from reportlab.pdfgen import canvas
+from reportlab.platypus.flowables import Flowable
+
+import guide_fonts
+import guide_model as model
+import guide_output
+import guide_pdf as guide
+import guide_tools
+import guide_topology
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(SCRIPT_DIR, "bench_baseline.json")
+
+# A metric regresses when it is this much slower than the baseline
+REGRESSION_THRESHOLD = 0.25
+# Per-chapter and per-call timings shorter than this in the baseline swing
+# by more than the threshold from run to run (by up to 60% on a busy
+# machine); they are gated on the median of all runs rather than on the
+# best one, and only fail when this much slower
+GATE_FLOOR_MS = 20.0
+SMALL_TIME_THRESHOLD = 1.0
+# Suspected regressions are measured again this many times; only metrics
+# that stay slow fail the gate
+CONFIRM_RUNS = 2
+
+
+def _best_of(repeat, func, *args):
+    """Fastest of `repeat` calls, in seconds, with the garbage collector paused"""
+    best = float("inf")
+    with _gc_paused():
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func(*args)
+            best = min(best, time.perf_counter() - start)
+    return best
+
+
+@contextlib.contextmanager
+def _gc_paused():
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+# ============================================================================
+# PAGE CHROME
+# ============================================================================
+
+
+class _PageState:
+    """Minimal stand-in for the doc template passed to page callbacks"""
+
+    page = 0
+
+
+def legacy_header_footer(canvas, doc):
+    """Header and footer drawn in full on every page (the pre-XObject behavior)"""
+    guide.page_decorations(canvas, doc)
+    guide.draw_page_number(canvas, doc.page)
+
+
+def _render_pages(on_page, pages, compression):
+    """Render `pages` pages carrying only the page chrome; return (seconds, bytes)"""
+    buffer = io.BytesIO()
+    canv = canvas.Canvas(buffer, pagesize=guide.PAGE_SIZE, pageCompression=compression)
+    doc = _PageState()
+
+    start = time.perf_counter()
+    for number in range(1, pages + 1):
+        doc.page = number
+        on_page(canv, doc)
+        canv.showPage()
+    canv.save()
+    return time.perf_counter() - start, len(buffer.getvalue())
+
+
+def bench_page_chrome(pages=500, repeat=5):
+    """Compare drawing the header/footer per page against reusing a form XObject"""
+    results = {}
+    for label, on_page in (
+        ("per-page drawing", legacy_header_footer),
+        ("form XObject", guide.header_footer),
+    ):
+        seconds = min(_render_pages(on_page, pages, 1)[0] for _ in range(repeat))
+        _, compressed = _render_pages(on_page, pages, 1)
+        _, uncompressed = _render_pages(on_page, pages, 0)
+        results[label] = {
+            "us_per_page": seconds / pages * 1e6,
+            "bytes": compressed,
+            "uncompressed_bytes": uncompressed,
+        }
+
+    print(f"Page header/footer, {pages} pages (best of {repeat})")
+    print(f"{'':20} {'us/page':>10} {'PDF bytes':>12} {'uncompressed':>14}")
+    for label, row in results.items():
+        print(
+            f"{label:20} {row['us_per_page']:10.1f} {row['bytes']:12,d} "
+            f"{row['uncompressed_bytes']:14,d}"
+        )
+    before, after = results["per-page drawing"], results["form XObject"]
+    print(
+        f"{'saving':20} {1 - after['us_per_page'] / before['us_per_page']:10.0%} "
+        f"{before['bytes'] - after['bytes']:12,d} "
+        f"{before['uncompressed_bytes'] - after['uncompressed_bytes']:14,d}"
+    )
+    print_logo_saving(bench_logo())
+    return results
+
+
+# ============================================================================
+# LOGO
+# ============================================================================
+
+# The raster logo the cover and header used before the SVG
+LEGACY_LOGO_PATH = os.path.join(guide.PROJECT_ROOT, "assets", "opnsense-logo.png")
+
+
+def legacy_draw_logo(canvas, x, y, width):
+    """The logo as the 600x177 PNG image (the pre-SVG behavior)"""
+    canvas.drawImage(
+        LEGACY_LOGO_PATH,
+        x,
+        y,
+        width=width,
+        height=width / 3.39,
+        preserveAspectRatio=True,
+        mask="auto",
+    )
+
+
+def _logo_pdf_bytes(draw_logo):
+    """Size of a PDF with the cover-size logo on one page and the header-size
+    logo on the next"""
+    buffer = io.BytesIO()
+    canv = canvas.Canvas(buffer, pagesize=guide.PAGE_SIZE)
+    draw_logo(canv, 166, 520, 280)
+    canv.showPage()
+    draw_logo(canv, 50, guide.PAGE_SIZE[1] - 22, 90)
+    canv.showPage()
+    canv.save()
+    return len(buffer.getvalue())
+
+
+def bench_logo():
+    """Bytes the logo adds to a PDF as the PNG image and as the SVG vector form"""
+    blank = _logo_pdf_bytes(lambda *args: None)
+    return {
+        "logo.png_bytes": _logo_pdf_bytes(legacy_draw_logo) - blank,
+        "logo.vector_bytes": _logo_pdf_bytes(guide.draw_logo) - blank,
+    }
+
+
+def print_logo_saving(metrics):
+    png, vector = metrics["logo.png_bytes"], metrics["logo.vector_bytes"]
+    print(
+        f"Logo: {vector:,d} bytes as a vector form, {png:,d} bytes as PNG "
+        f"(saves {png - vector:,d} bytes, {1 - vector / png:.0%})"
+    )
+
+
+# ============================================================================
+# FONTS
+# ============================================================================
+
+
+def _icon_pdf_bytes(continued):
+    """Size of a one-page PDF with a callout of every kind, drawn without
+    their icons when `continued` (as the second piece of a split box)"""
+    buffer = io.BytesIO()
+    canv = canvas.Canvas(buffer, pagesize=guide.PAGE_SIZE)
+    for index, kind in enumerate(guide.ICONBOX_ICONS):
+        box = guide.IconBox("Callout text", kind, continued=continued)
+        box.wrap(guide.PAGE_SIZE[0] - 100, 10000)
+        box.drawOn(canv, 50, 100 + 60 * index)
+    canv.showPage()
+    canv.save()
+    return len(buffer.getvalue())
+
+
+def bench_fonts(repeat=5):
+    """Cost of the embedded icon font: loading it, subsetting it with and
+    without the subset cache, and the bytes it adds to a PDF"""
+    guide_fonts.register_fonts()
+    font = pdfmetrics.getFont(guide.ICONBOX_ICON_FONT)
+    canv = canvas.Canvas(io.BytesIO())
+    guide_fonts.reserve_glyphs(
+        font.fontName, "".join(icon for _, icon in guide.ICONBOX_ICONS.values()), canv
+    )
+    subset = tuple(font.state[canv._doc].subsets[0])
+    path = os.path.join(guide_fonts.FONT_DIR, guide_fonts.FONT_FILES[font.fontName])
+    return {
+        "fonts.load_ms": _per_call_ms(
+            repeat, 1, lambda: guide_fonts.EmbeddedFont(font.fontName, path)
+        ),
+        "fonts.subset_ms": _per_call_ms(
+            repeat, 1, lambda: TTFontFile.makeSubset(font.face, list(subset))
+        ),
+        "fonts.subset_cached_ms": _per_call_ms(
+            repeat, 1, lambda: guide_fonts.subset_font.__wrapped__(font.face, subset)
+        ),
+        "fonts.icon_bytes": _icon_pdf_bytes(False) - _icon_pdf_bytes(True),
+    }
+
+
+# ============================================================================
+# OUTPUT PROFILES
+# ============================================================================
+
+
+def bench_output_profiles():
+    """Size, time to first page and rewrite time of the guide per output profile.
+
+    The chapters come from the cache (filled by the first build), so the
+    timings are those of a rebuild.
+    """
+    metrics = {}
+    for name in guide_output.OUTPUT_PROFILES:
+        options = guide.RenderOptions(output_profile=name)
+        report = guide.render_guide(options, io.BytesIO()).output
+        metrics[f"output.{name}.bytes"] = report.byte_size
+        metrics[f"output.{name}.first_page_bytes"] = report.first_page_bytes
+        metrics[f"output.{name}_ms"] = report.seconds * 1000
+    return metrics
+
+
+def print_output_profiles(metrics):
+    print(
+        f"{'Output profile':16} {'bytes':>10} {'first page':>12} "
+        f"{'first page s':>13} {'rewrite ms':>11}"
+    )
+    for name in guide_output.OUTPUT_PROFILES:
+        first_page = metrics[f"output.{name}.first_page_bytes"]
+        print(
+            f"{name:16} {metrics[f'output.{name}.bytes']:10,d} {first_page:12,d} "
+            f"{guide_output.download_seconds(first_page):13.2f} "
+            f"{metrics[f'output.{name}_ms']:11.1f}"
+        )
+    print(
+        f"(first page: bytes to download before page 1 can be shown, and the "
+        f"time at {guide_output.FIRST_PAGE_BANDWIDTH / 1e6:g} Mbit/s with "
+        f"{guide_output.FIRST_PAGE_RTT * 1000:.0f} ms round trip)"
+    )
+
+
+# ============================================================================
+# IMPORT TIME
+# ============================================================================
+
+# Fresh-interpreter budget for importing the generator and exporting the
+# guide as JSONL, the path used by tools that only want the guide's data
+IMPORT_BUDGET_MS = 100
+
+_IMPORT_PROBE = """
+import io, json, sys, time
+start = time.perf_counter()
+import opnsense_user_guide
+opnsense_user_guide.export_jsonl(io.StringIO())
+elapsed = time.perf_counter() - start
+print(json.dumps({"ms": elapsed * 1000,
+                  "reportlab": "reportlab" in sys.modules,
+                  "pypdf": "pypdf" in sys.modules}))
+"""
+
+
+def _run_probe(source):
+    """Run Python source in a fresh interpreter and decode the JSON it prints"""
+    probe = subprocess.run(
+        [sys.executable, "-c", source],
+        cwd=SCRIPT_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(probe.stdout)
+
+
+def check_import_budget(budget_ms=IMPORT_BUDGET_MS, repeat=5):
+    """Check that non-PDF use of the generator stays fast and ReportLab-free.
+
+    Returns True when the best of `repeat` fresh interpreters is within
+    budget and neither ReportLab nor pypdf was imported.
+    """
+    runs = [_run_probe(_IMPORT_PROBE) for _ in range(repeat)]
+    best = min(run["ms"] for run in runs)
+    heavy = [name for name in ("reportlab", "pypdf") if any(r[name] for r in runs)]
+
+    print(f"Import + JSONL export: {best:.1f} ms (budget {budget_ms} ms)")
+    if heavy:
+        print(f"FAIL: imported {', '.join(heavy)} without rendering a PDF")
+    elif best > budget_ms:
+        print("FAIL: over budget")
+    return not heavy and best <= budget_ms
+
+
+# ============================================================================
+# BUILD PIPELINE SUITE
+# ============================================================================
+# Every metric is a number where smaller is better: times in milliseconds
+# (per build, per chapter or per call, best of N runs) and memory in KiB.
+
+_FULL_BUILD_PROBE = """
+import io, json, resource, time
+start = time.perf_counter()
+import guide_pdf
+result = guide_pdf.render_guide(guide_pdf.RenderOptions(use_cache=False), io.BytesIO())
+print(json.dumps({"ms": (time.perf_counter() - start) * 1000,
+                  "pages": result.page_count,
+                  "peak_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}))
+"""
+
+
+def bench_full_build(repeat=3):
+    """Cold single-pass build in a fresh interpreter, cached rebuild in-process"""
+    runs = [_run_probe(_FULL_BUILD_PROBE) for _ in range(repeat)]
+    metrics = {
+        "full_build.cold_ms": min(run["ms"] for run in runs),
+        "full_build.peak_rss_kib": min(run["peak_rss_kib"] for run in runs),
+    }
+
+    options = guide.RenderOptions(use_cache=False)
+    metrics["full_build.warm_ms"] = 1000 * _best_of(
+        repeat, guide.render_guide, options, io.BytesIO()
+    )
+    guide.render_guide(guide.RenderOptions(), io.BytesIO())  # fill the cache
+    metrics["full_build.cached_ms"] = 1000 * _best_of(
+        repeat, guide.render_guide, guide.RenderOptions(), io.BytesIO()
+    )
+    return metrics
+
+
+@contextlib.contextmanager
+def _draw_timer():
+    """Accumulate the time spent in top-level Flowable.drawOn() calls"""
+    original = Flowable.drawOn
+    state = {"depth": 0, "seconds": 0.0}
+
+    def drawOn(self, *args, **kwargs):
+        if state["depth"]:
+            return original(self, *args, **kwargs)
+        state["depth"] += 1
+        start = time.perf_counter()
+        try:
+            return original(self, *args, **kwargs)
+        finally:
+            state["seconds"] += time.perf_counter() - start
+            state["depth"] -= 1
+
+    Flowable.drawOn = drawOn
+    try:
+        yield state
+    finally:
+        Flowable.drawOn = original
+
+
+def _chapter_timings(guide_content, key, styles):
+    """(compile, layout, draw) seconds for one build unit"""
+    start = time.perf_counter()
+    flowables = guide.compile_unit(guide_content, key, styles)
+    compiled = time.perf_counter()
+    doc = guide.GuideDocTemplate(
+        io.BytesIO(), local_links=False, pagesize=guide.PAGE_SIZE, **guide.PAGE_MARGINS
+    )
+    with _draw_timer() as draw:
+        doc.build(flowables)
+    total = time.perf_counter() - compiled
+    return compiled - start, total - draw["seconds"], draw["seconds"]
+
+
+def bench_chapters(repeat=3):
+    """Per-chapter compile, layout (wrap/split, page breaks, PDF write) and draw time"""
+    guide_content = model.load_guide()
+    styles = guide.get_styles()
+    metrics = {}
+    for key in guide.unit_keys(guide_content):
+        with _gc_paused():
+            runs = [_chapter_timings(guide_content, key, styles) for _ in range(repeat)]
+        for name, seconds in zip(("compile", "layout", "draw"), zip(*runs)):
+            metrics[f"chapter.{key}.{name}_ms"] = 1000 * min(seconds)
+    for name in ("compile", "layout", "draw"):
+        metrics[f"chapters.{name}_ms"] = sum(
+            value
+            for metric, value in metrics.items()
+            if metric.startswith("chapter.") and metric.endswith(f".{name}_ms")
+        )
+    return metrics
+
+
+def _blocks(block_type):
+    guide_content = model.load_guide()
+    return [
+        block
+        for chapter in guide_content.chapters
+        for block in model.iter_blocks(chapter.blocks)
+        if isinstance(block, block_type)
+    ]
+
+
+def _site_topology(interfaces=20, vlans=12):
+    """Nodes and links of a synthetic site: a firewall with `interfaces`
+    interfaces of `vlans` VLANs each, plus a ring of VPN links between the
+    interfaces (262 nodes and 282 links by default)"""
+    nodes = [["internet", "Internet", "internet"], ["fw", "OPNsense", "firewall"]]
+    links = [["internet", "fw", "WAN"]]
+    for i in range(interfaces):
+        nodes.append([f"igc{i}", f"igc{i}"])
+        links.append(["fw", f"igc{i}"])
+        links.append([f"igc{i}", f"igc{(i + 1) % interfaces}", "", "vpn"])
+        for tag in range(vlans):
+            nodes.append([f"igc{i}.{tag}", f"VLAN {tag}", "vlan"])
+            links.append([f"igc{i}", f"igc{i}.{tag}"])
+    return nodes, links
+
+
+def _per_call_ms(repeat, calls, func):
+    """Best-of-`repeat` time of func(), divided by the number of calls it makes"""
+    return 1000 * _best_of(repeat, func) / calls
+
+
+def bench_components(repeat=5):
+    """Per-call cost of the table helper, IconBox, the diagram flowables,
+    the topology layout and the tool reference parser.
+
+    The table and callout inputs are every table and callout in the guide.
+    Drawing happens on a throwaway canvas. A diagram's first placement in a
+    document is drawn onto the page; `reuse_ms` is a later one, which
+    places the form XObject recorded by the second.
+    """
+    tables = _blocks(model.Table)
+    callouts = _blocks(model.Callout)
+    canv = canvas.Canvas(io.BytesIO(), pagesize=guide.PAGE_SIZE)
+    width = guide.PAGE_SIZE[0] - 100
+
+    def make_tables():
+        for table in tables:
+            guide.create_styled_table(table.rows, table.col_widths)
+
+    boxes = [guide.IconBox(callout.text, callout.kind) for callout in callouts]
+
+    def wrap_boxes():
+        for box in boxes:
+            box.wrap(width, 10000)
+
+    def draw_boxes():
+        for box in boxes:
+            box.drawOn(canv, 50, 100)
+
+    wrap_boxes()
+    metrics = {
+        "create_styled_table_ms": _per_call_ms(repeat, len(tables), make_tables),
+        "iconbox.wrap_ms": _per_call_ms(repeat, len(boxes), wrap_boxes),
+        "iconbox.draw_ms": _per_call_ms(repeat, len(boxes), draw_boxes),
+    }
+    for kind, diagram_class in guide.DIAGRAMS.items():
+        diagram = diagram_class()
+
+        def first_placement():
+            # A fresh canvas has not seen the diagram, as in each chapter's document
+            page = canvas.Canvas(io.BytesIO(), pagesize=guide.PAGE_SIZE)
+            diagram.wrap(width, 10000)
+            diagram.drawOn(page, 50, 100)
+
+        def placement():
+            diagram.wrap(width, 10000)
+            diagram.drawOn(canv, 50, 100)
+
+        metrics[f"diagram.{kind}_ms"] = _per_call_ms(repeat, 1, first_placement)
+        metrics[f"diagram.{kind}.reuse_ms"] = _per_call_ms(repeat, 1, placement)
+
+    # Uncached layered layout and drawing of a few hundred node topology
+    nodes, links = _site_topology()
+    graph = guide_topology.topology_graph(nodes, links)
+    metrics["topology.layout_ms"] = _per_call_ms(
+        repeat, 1, lambda: guide_topology.layer_graph.__wrapped__(*graph)
+    )
+    metrics["topology.drawing_ms"] = _per_call_ms(
+        repeat,
+        1,
+        lambda: guide.TopologyDiagram.make_drawing(guide.TOPOLOGY_WIDTH, *graph, None),
+    )
+
+    # Uncached parse of the MCP server's tool definitions (Chapter 13)
+    metrics["tools.parse_ms"] = _per_call_ms(repeat, 1, guide_tools.parse_tools)
+    return metrics
+
+
+def _calibration_workload():
+    # Plain interpreter work (dict/str/sort), no ReportLab
+    words = [f"word{i % 997}" for i in range(20000)]
+    counts = {}
+    for word in words:
+        counts[word] = counts.get(word, 0) + 1
+    sorted(words)
+
+
+def calibrate(repeat=5):
+    """Time of a fixed pure-Python workload, a proxy for the machine's current speed"""
+    return 1000 * _best_of(repeat, _calibration_workload)
+
+
+def run_suite(repeat=5):
+    """Run every pipeline benchmark and return a flat dict of metrics"""
+    before = calibrate(repeat * 2)
+    metrics = {}
+    metrics.update(bench_full_build(repeat))
+    metrics.update(bench_chapters(repeat * 2))
+    metrics.update(bench_components(repeat * 2))
+    metrics.update(bench_logo())
+    metrics.update(bench_fonts(repeat * 2))
+    metrics.update(bench_output_profiles())
+    imports = [_run_probe(_IMPORT_PROBE) for _ in range(repeat)]
+    metrics["import_export_jsonl_ms"] = min(run["ms"] for run in imports)
+    # The slower of the two calibrations errs towards forgiving a noisy run
+    metrics["calibration_ms"] = max(before, calibrate(repeat * 2))
+    return metrics
+
+
+def compare(metrics, baseline, threshold=REGRESSION_THRESHOLD):
+    """Metrics that got worse than the baseline by more than `threshold`.
+
+    Returns a list of (name, baseline value, current value). Baseline times
+    are first scaled up by how much slower the calibration workload ran, so
+    a busy or throttled machine does not fail every metric at once; a faster
+    calibration is not trusted to tighten the gate. Times shorter than
+    GATE_FLOOR_MS in the baseline are allowed SMALL_TIME_THRESHOLD instead
+    when that is looser.
+    """
+    speed = 1.0
+    if baseline.get("calibration_ms") and metrics.get("calibration_ms"):
+        speed = max(1.0, metrics["calibration_ms"] / baseline["calibration_ms"])
+    regressions = []
+    for name, before in sorted(baseline.items()):
+        after = metrics.get(name)
+        if after is None or name == "calibration_ms":
+            continue
+        allowed = threshold
+        if name.endswith("_ms"):
+            if before < GATE_FLOOR_MS:
+                allowed = max(threshold, SMALL_TIME_THRESHOLD)
+            before *= speed
+        if after <= before * (1 + allowed):
+            continue
+        regressions.append((name, before, after))
+    return regressions
+
+
+def merge_runs(runs, baseline=None):
+    """Combine several suite runs into one set of metrics.
+
+    Every metric takes its lowest value, except times shorter than
+    GATE_FLOOR_MS in the baseline, which take their median, so that one
+    lucky run does not hide a regression of a few microseconds; and the
+    calibration time, which takes its highest and only ever loosens the gate.
+    """
+    baseline = baseline or {}
+    merged = {}
+    for name in runs[0]:
+        values = [run[name] for run in runs if name in run]
+        if name == "calibration_ms":
+            merged[name] = max(values)
+        elif name.endswith("_ms") and baseline.get(name, GATE_FLOOR_MS) < GATE_FLOOR_MS:
+            merged[name] = statistics.median(values)
+        else:
+            merged[name] = min(values)
+    return merged
+
+
+def print_metrics(metrics, baseline=None):
+    baseline = baseline or {}
+    print(f"{'metric':34} {'value':>12} {'baseline':>12} {'change':>8}")
+    for name, value in metrics.items():
+        before = baseline.get(name)
+        if before:
+            print(f"{name:34} {value:12.3f} {before:12.3f} {value / before - 1:8.0%}")
+        else:
+            print(f"{name:34} {value:12.3f}")
+
+
+# ============================================================================
+# SYNTHETIC SCALE STRESS
+# ============================================================================
+# One synthetic chapter holds a ChapterHeader, STRESS_CALLOUTS IconBoxes,
+# a STRESS_TABLE_ROWS-row table and some prose. At the largest default
+# scale that is 200 headers, 2,000 IconBoxes and 20,000 table rows.
+
+STRESS_SCALES = (25, 50, 100, 200)
+STRESS_CALLOUTS = 10
+STRESS_TABLE_ROWS = 100
+
+_STRESS_WORDS = (
+    "firewall rule interface gateway alias state table NAT outbound VLAN "
+    "tunnel peer certificate resolver blocklist carp failover traffic queue"
+).split()
+
+
+def _sentence(seed, words):
+    return " ".join(
+        _STRESS_WORDS[(seed * 7 + i * 3) % len(_STRESS_WORDS)] for i in range(words)
+    )
+
+
+def synthetic_guide(chapters):
+    """A deterministic guide_model.Guide with `chapters` synthetic chapters"""
+    kinds = ("info", "warning", "tip", "danger", "note")
+    result = []
+    for number in range(1, chapters + 1):
+        blocks = [model.Heading(f"Section {number}.1")]
+        for i in range(STRESS_CALLOUTS):
+            blocks.append(
+                model.Callout(_sentence(number + i, 12 + i * 4), kinds[i % 5])
+            )
+            blocks.append(model.Paragraph(_sentence(number * i, 40)))
+        rows = [["Name", "Value", "Notes"]]
+        rows += [
+            [f"item-{number}-{row}", str(row * number), _sentence(row, 3 + row % 9)]
+            for row in range(STRESS_TABLE_ROWS)
+        ]
+        blocks.append(model.Table(rows, id=f"stress_{number}"))
+        result.append(
+            model.Chapter(str(number), f"Synthetic Chapter {number}", "", blocks)
+        )
+    return model.Guide("Stress Test", result)
+
+
+def stress_run(chapters):
+    """Lay out and render a synthetic guide in one pass; return its measurements"""
+    stress_guide = synthetic_guide(chapters)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    options = guide.RenderOptions(
+        chapters=tuple(chapter.key for chapter in stress_guide.chapters),
+        use_cache=False,
+    )
+    result = guide.render_guide(options, guide=stress_guide)
+    seconds = time.perf_counter() - start
+    return {
+        "chapters": chapters,
+        "pages": result.page_count,
+        "seconds": seconds,
+        "rss_growth_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        - rss_before,
+    }
+
+
+def _growth_exponent(sizes, values):
+    """Least-squares slope of log(value) over log(size): 1.0 means linear"""
+    xs = [math.log(size) for size in sizes]
+    ys = [math.log(max(value, 1e-9)) for value in values]
+    mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    cov = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    var = sum((x - mean_x) ** 2 for x in xs)
+    return cov / var
+
+
+def bench_stress(scales=STRESS_SCALES):
+    """Render synthetic guides of growing size, each in a fresh interpreter.
+
+    Prints time and memory per chapter at every scale and the fitted growth
+    exponents. Returns a dict with the runs and the exponents.
+    """
+    runs = [
+        _run_probe(
+            "import json, bench_user_guide as b\n"
+            f"print(json.dumps(b.stress_run({chapters})))"
+        )
+        for chapters in scales
+    ]
+
+    print(
+        f"Synthetic stress: per chapter {STRESS_CALLOUTS} IconBoxes, "
+        f"{STRESS_TABLE_ROWS} table rows, 1 ChapterHeader"
+    )
+    print(
+        f"{'chapters':>9} {'pages':>7} {'seconds':>9} {'ms/chapter':>11} "
+        f"{'RSS growth MiB':>15}"
+    )
+    for run in runs:
+        print(
+            f"{run['chapters']:9d} {run['pages']:7d} {run['seconds']:9.2f} "
+            f"{1000 * run['seconds'] / run['chapters']:11.1f} "
+            f"{run['rss_growth_kib'] / 1024:15.1f}"
+        )
+    sizes = [run["chapters"] for run in runs]
+    exponents = {
+        "time": _growth_exponent(sizes, [run["seconds"] for run in runs]),
+        "memory": _growth_exponent(sizes, [run["rss_growth_kib"] for run in runs]),
+    }
+    print(
+        f"growth exponent (1.0 = linear): time {exponents['time']:.2f}, "
+        f"memory {exponents['memory']:.2f}"
+    )
+    return {"runs": runs, "exponents": exponents}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the user guide generator")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement")
+    parser.add_argument("-o", "--output", help="write the results as JSON to this file")
+    parser.add_argument(
+        "--baseline",
+        default=BASELINE_PATH,
+        help="baseline results to compare against (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=REGRESSION_THRESHOLD,
+        help="allowed slowdown before a metric fails, as a fraction "
+        "(default: %(default)s)",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="store the results as the new baseline instead of comparing",
+    )
+    parser.add_argument(
+        "--page-chrome",
+        action="store_true",
+        help="only compare per-page header/footer drawing with the form XObject",
+    )
+    parser.add_argument(
+        "--pages", type=int, default=500, help="pages for --page-chrome"
+    )
+    parser.add_argument(
+        "--stress",
+        action="store_true",
+        help="only run the synthetic scale benchmark (with -o: write its results)",
+    )
+    parser.add_argument(
+        "--scales",
+        type=lambda value: [int(n) for n in value.split(",")],
+        default=STRESS_SCALES,
+        help="synthetic chapter counts for --stress (default: 25,50,100,200)",
+    )
+    parser.add_argument(
+        "--output-profiles",
+        action="store_true",
+        help="only report size and time to first page for each output profile",
+    )
+    parser.add_argument(
+        "--check-imports",
+        action="store_true",
+        help="only check the import-time budget; exit 1 when it is exceeded",
+    )
+    args = parser.parse_args()
+
+    if args.check_imports:
+        sys.exit(0 if check_import_budget(repeat=args.repeat) else 1)
+    if args.page_chrome:
+        bench_page_chrome(args.pages, args.repeat)
+        sys.exit(0)
+    if args.output_profiles:
+        print_output_profiles(bench_output_profiles())
+        sys.exit(0)
+    if args.stress:
+        stress = bench_stress(args.scales)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as fh:
+                json.dump(stress, fh, indent=2)
+        sys.exit(0)
+
+    metrics = run_suite(args.repeat)
+    results = {
+        "python": sys.version.split()[0],
+        "reportlab": guide.reportlab.Version,
+        "metrics": metrics,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+        print_metrics(metrics)
+        print(f"Baseline saved: {args.baseline}")
+        sys.exit(0)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as fh:
+            baseline = json.load(fh)["metrics"]
+    runs = [metrics]
+    for _ in range(CONFIRM_RUNS):
+        if not compare(metrics, baseline, args.threshold):
+            break
+        runs.append(run_suite(args.repeat))
+        metrics = merge_runs(runs, baseline)
+    print_metrics(metrics, baseline)
+    print_logo_saving(metrics)
+    print_output_profiles(metrics)
+    regressions = compare(metrics, baseline, args.threshold)
+    for name, before, after in regressions:
+        print(f"REGRESSION: {name} {before:.3f} -> {after:.3f}")
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,3550 @@
+#!/usr/bin/env python3
+"""
+OPNsense User Guide - Content
+Every chapter of the guide as a guide_model document, rendered by opnsense_user_guide.py
+"""
+
+from guide_model import (
+    BulletList,
+    Callout,
+    Chapter,
+    Diagram,
+    Guide,
+    Heading,
+    KeepTogether,
+    PageBreak,
+    Paragraph,
+    Rule,
+    Spacer,
+    Table,
+    Topology,
+)
+from guide_tools import tool_reference_blocks
+
+# ============================================================================
+# CHAPTER 1: INTRODUCTION (LLM-OPTIMIZED)
+# ============================================================================
+
+CHAPTER_1 = Chapter(
+    key="1",
+    title="Introduction to OPNsense",
+    summary="Overview, architecture, and key features",
+    blocks=[
+        KeepTogether(
+            [
+                Callout(
+                    "THIS GUIDE IS OPTIMIZED FOR LLM/AI AGENTS. It provides structured, concise "
+                    "reference material for querying OPNsense configuration via MCP tools or "
+                    "API. Human-readable but machine-parseable.",
+                    "note",
+                ),
+                Spacer(15),
+                Paragraph(
+                    "OPNsense is an open-source firewall and routing platform based on FreeBSD "
+                    "with HardenedBSD security enhancements. Core capabilities: stateful packet "
+                    "filtering (pf), NAT, VPN (IPsec/OpenVPN/WireGuard), IDS/IPS (Suricata), "
+                    "traffic shaping, and high availability (CARP)."
+                ),
+            ]
+        ),
+        Spacer(15),
+        KeepTogether(
+            [
+                Heading("Quick Reference: OPNsense Fundamentals"),
+                Table(
+                    id="fundamentals",
+                    rows=[
+                        ["Concept", "Key Point"],
+                        [
+                            "Firewall Engine",
+                            "pf (packet filter) from OpenBSD - rules in /tmp/rules.debug",
+                        ],
+                        [
+                            "Rule Direction",
+                            "Rules apply where traffic ENTERS the firewall (inbound)",
+                        ],
+                        [
+                            "Rule Order",
+                            "First match wins (with 'quick' flag, default enabled)",
+                        ],
+                        [
+                            "State Table",
+                            "Connections tracked automatically, return traffic auto-allowed",
+                        ],
+                        ["NAT Processing", "NAT rules processed BEFORE firewall rules"],
+                        [
+                            "Default Policy",
+                            "Implicit deny - traffic blocked unless explicitly permitted",
+                        ],
+                        [
+                            "Config File",
+                            "XML at /conf/config.xml - never edit directly, use API/GUI",
+                        ],
+                        [
+                            "API",
+                            "REST API on port 443, key+secret auth, /api/ endpoints",
+                        ],
+                    ],
+                    col_widths=[110, 330],
+                ),
+            ]
+        ),
+        Spacer(20),
+        KeepTogether(
+            [
+                Heading("Key Features"),
+                Table(
+                    id="features_data",
+                    rows=[
+                        ["Feature", "Description", "Category"],
+                        [
+                            "Stateful Firewall",
+                            "Full packet inspection with state tracking",
+                            "Security",
+                        ],
+                        [
+                            "Multi-WAN",
+                            "Load balancing and failover support",
+                            "Networking",
+                        ],
+                        ["VPN Support", "IPsec, OpenVPN, WireGuard", "Connectivity"],
+                        ["Traffic Shaping", "QoS with pipes and queues", "Performance"],
+                        [
+                            "Intrusion Detection",
+                            "Suricata IDS/IPS integration",
+                            "Security",
+                        ],
+                        [
+                            "High Availability",
+                            "CARP with configuration sync",
+                            "Reliability",
+                        ],
+                        ["Web Proxy", "Squid with SSL inspection", "Services"],
+                        [
+                            "Captive Portal",
+                            "Guest network authentication",
+                            "Access Control",
+                        ],
+                    ],
+                    col_widths=[120, 220, 100],
+                ),
+            ]
+        ),
+        Spacer(20),
+        KeepTogether(
+            [
+                Heading("Network Architecture Overview"),
+                Spacer(10),
+                Diagram("network"),
+                Spacer(15),
+                Paragraph(
+                    "OPNsense sits between your internal networks and the internet, providing "
+                    "security, routing, and network services. It can manage multiple network "
+                    "segments (VLANs) and apply different security policies to each zone."
+                ),
+            ]
+        ),
+    ],
+)
+
+
+# ============================================================================
+# CHAPTER 2: INITIAL SETUP
+# ============================================================================
+
+CHAPTER_2 = Chapter(
+    key="2",
+    title="Initial Setup & Installation",
+    summary="Requirements, installation, and first boot",
+    blocks=[
+        KeepTogether(
+            [
+                Heading("System Requirements"),
+                Table(
+                    id="requirements_data",
+                    rows=[
+                        ["Component", "Minimum", "Recommended"],
+                        ["CPU", "1 GHz dual-core", "Multi-core 64-bit (AES-NI)"],
+                        ["RAM", "2 GB", "8 GB or more"],
+                        ["Storage", "8 GB SSD", "120 GB SSD"],
+                        ["Network", "2 NICs", "Intel NICs recommended"],
+                    ],
+                    col_widths=[120, 150, 170],
+                ),
+                Spacer(15),
+                Callout(
+                    "AES-NI support is highly recommended for VPN performance. Check CPU "
+                    "compatibility before deployment.",
+                    "tip",
+                ),
+            ]
+        ),
+        Spacer(20),
+        KeepTogether(
+            [
+                Heading("Installation Steps"),
+                BulletList(
+                    [
+                        "1. Download the latest OPNsense ISO from opnsense.org",
+                        "2. Create bootable USB using Rufus, Etcher, or dd command",
+                        "3. Boot from USB and select 'Install (UFS)' for most setups",
+                        "4. Configure network interfaces during installation",
+                        "5. Set root password and complete installation",
+                        "6. Access web interface at https://192.168.1.1 (default)",
+                        "7. Complete initial setup wizard",
+                    ],
+                ),
+            ]
+        ),
+        Spacer(15),
+        KeepTogether(
+            [
+                Heading("Post-Installation Checklist", level=2),
+                BulletList(
+                    [
+                        "Update to latest version (System → Firmware → Status)",
+                        "Configure WAN and LAN interfaces",
+                        "Set hostname and domain",
+                        "Configure DNS servers",
+                        "Enable SSH access (if needed)",
+                        "Set timezone and NTP servers",
+                        "Create admin user (avoid using root)",
+                        "Configure backup schedule",
+                    ],
+                    marker="☐",
+                ),
+            ]
+        ),
+    ],
+)
+
+
+# ============================================================================
+# CHAPTER 3: DASHBOARD & NAVIGATION
+# ============================================================================
+
+CHAPTER_3 = Chapter(
+    key="3",
+    title="Dashboard & Navigation",
+    summary="Interface overview and customization",
+    blocks=[
+        Paragraph(
+            "The OPNsense web interface provides a comprehensive dashboard and intuitive "
+            "navigation system. The main menu is organized into logical categories for "
+            "easy access to all features."
+        ),
+        Spacer(15),
+        KeepTogether(
+            [
+                Heading("Main Menu Structure"),
+                Table(
+                    id="menu_data",
+                    rows=[
+                        ["Menu", "Primary Functions"],
+                        ["Lobby", "Dashboard, widgets, password management"],
+                        ["System", "Settings, firmware, users, HA, certificates"],
+                        ["Interfaces", "Network interface configuration, VLANs"],
+                        ["Firewall", "Rules, NAT, aliases, traffic shaper"],
+                        ["VPN", "IPsec, OpenVPN, WireGuard"],
+                        ["Services", "DHCP, DNS, proxy, IDS/IPS"],
+                        ["Reporting", "Traffic graphs, logs, NetFlow"],
+                        ["Diagnostics", "System tools, packet capture, ping"],
+                    ],
+                    col_widths=[100, 340],
+                ),
+            ]
+        ),
+        Spacer(20),
+        KeepTogether(
+            [
+                Heading("Dashboard Widgets", level=2),
+                Paragraph(
+                    "The dashboard is customizable with drag-and-drop widgets. Common widgets "
+                    "include:"
+                ),
+                BulletList(
+                    [
+                        "<b>System Information</b>: CPU, memory, uptime, version",
+                        "<b>Interfaces</b>: Interface status and traffic",
+                        "<b>Gateways</b>: WAN gateway status and latency",
+                        "<b>Traffic Graphs</b>: Real-time bandwidth visualization",
+                        "<b>Services</b>: Status of enabled services",
+                        "<b>Firewall Logs</b>: Recent blocked/passed traffic",
+                    ],
+                ),
+            ]
+        ),
+    ],
+)
+
+
+# ============================================================================
+# CHAPTER 4: FIREWALL CONFIGURATION (EXPANDED)
+# ============================================================================
+
+CHAPTER_4 = Chapter(
+    key="4",
+    title="Firewall Configuration",
+    summary="Rules, aliases, states, and advanced options",
+    blocks=[
+        Paragraph(
+            "OPNsense contains a stateful packet filter based on pf (packet filter) from "
+            "OpenBSD. The firewall inspects packets, maintains connection states, and "
+            "applies rules to permit or deny traffic. Understanding rule processing, "
+            "state management, and interface binding is essential for effective security."
+        ),
+        Spacer(15),
+        KeepTogether(
+            [
+                Heading("Rule Processing Order"),
+                Spacer(10),
+                Diagram("firewall_rules"),
+                Spacer(15),
+                Paragraph(
+                    "Rules are evaluated in a specific order based on their category and "
+                    "position. Understanding this order is critical for troubleshooting:"
+                ),
+                Table(
+                    id="processing_data",
+                    rows=[
+                        ["Priority", "Rule Type", "Description"],
+                        [
+                            "1",
+                            "Floating (quick)",
+                            "Processed first, can match any interface",
+                        ],
+                        [
+                            "2",
+                            "Group Rules",
+                            "Applied to interface groups (e.g., all LANs)",
+                        ],
+                        [
+                            "3",
+                            "Interface Rules",
+                            "Per-interface rules, most common type",
+                        ],
+                        ["4", "Default Deny", "Implicit block if no rule matches"],
+                    ],
+                    col_widths=[60, 120, 260],
+                ),
+                Spacer(15),
+                Callout(
+                    "By default, all rules have 'quick' enabled, meaning the first matching rule "
+                    "wins. Without 'quick', the last matching rule would apply (rarely desired).",
+                    "warning",
+                ),
+            ]
+        ),
+        Spacer(20),
+        KeepTogether(
+            [
+                Heading("Rule Actions Explained"),
+                Table(
+                    id="actions_data",
+                    rows=[
+                        ["Action", "Network Response", "Best Use Case"],
+                        [
+                            "Pass",
+                            "Traffic allowed",
+                            "Explicitly permit desired traffic",
+                        ],
+                        [
+                            "Block",
+                            "Silently dropped",
+                            "WAN/untrusted - no response to attackers",
+                        ],
+                        [
+                            "Reject",
+                            "TCP RST or ICMP unreachable",
+                            "LAN/internal - faster client feedback",
+                        ],
+                    ],
+                    col_widths=[70, 150, 220],
+                ),
+                Spacer(15),
+                Paragraph(
+                    "<b>Block vs Reject:</b> Use Block on WAN interfaces to avoid revealing "
+                    "firewall presence. Use Reject on internal interfaces so clients receive "
+                    "immediate feedback rather than waiting for connection timeout."
+                ),
+            ]
+        ),
+        Spacer(20),
+        KeepTogether(
+            [
+                Heading("Stateful Packet Inspection"),
+                Paragraph(
+                    "OPNsense maintains a state table tracking all active connections. This "
+                    "provides:"
+                ),
+                BulletList(
+                    [
+                        "<b>Performance</b>: Return traffic matched by state, not rule evaluation",
+                        "<b>Security</b>: TCP sequence number validation prevents injection",
+                        "<b>Simplicity</b>: Only need rules for initiating direction",
+                        "<b>Tracking</b>: Connection limits, timeouts, and diagnostics",
+                    ],
+                ),
+            ]
+        ),
+        Spacer(15),
+        KeepTogether(
+            [
+                Heading("State Table Options", level=2),
+                Table(
+                    id="state_opts_4",
+                    rows=[
+                        ["Option", "Effect", "Use Case"],
+                        ["Keep State", "Normal stateful (default)", "Most traffic"],
+                        [
+                            "Sloppy State",
+                            "Less strict validation",
+                            "Asymmetric routing",
+                        ],
+                        [
+                            "Synproxy State",
+                            "Proxy TCP handshake",
+                            "Public servers (DDoS protection)",
+                        ],
+                        ["No State", "Stateless rule", "High-volume UDP, broadcasts"],
+                    ],
+                    col_widths=[100, 150, 190],
+                ),
+                Spacer(15),
+                Callout(
+                    "The state table size defaults to 1,000,000 entries. Monitor with 'pfctl "
+                    "-si' and increase under Firewall > Settings > Advanced if needed for "
+                    "high-traffic environments.",
+                    "tip",
+                ),
+            ]
+        ),
+        PageBreak(),
+        KeepTogether(
+            [
+                Heading("Aliases"),
+                Paragraph(
+                    "Aliases are named groups of hosts, networks, ports, or URLs that simplify "
+                    "rule management. When an alias is updated, all rules using it automatically "
+                    "reflect changes."
+                ),
+                Spacer(10),
+                Table(
+                    id="alias_data",
+                    rows=[
+                        ["Type", "Content", "Example Values"],
+                        ["Hosts", "IPs or FQDNs", "10.0.0.5, server.example.com"],
+                        ["Networks", "CIDR subnets", "192.168.1.0/24, 10.0.0.0/8"],
+                        ["Ports", "Port numbers/ranges", "80, 443, 8080-8090"],
+                        [
+                            "URL Table (IPs)",
+                            "Remote IP list URL",
+                            "Spamhaus DROP, Firehol",
+                        ],
+                        ["URL Table (Ports)", "Remote port list", "Dynamic port lists"],
+                        ["GeoIP", "Country codes", "US, CN, RU (MaxMind DB)"],
+                        ["BGP ASN", "AS numbers", "AS15169 (Google)"],
+                        [
+                            "Dynamic IPv6 Host",
+                            "Interface IPv6",
+                            "Track WAN IPv6 address",
+                        ],
+                        ["MAC Address", "Hardware addresses", "00:11:22:33:44:55"],
+                        [
+                            "External (advanced)",
+                            "pfTables via script",
+                            "Custom integrations",
+                        ],
+                    ],
+                    col_widths=[110, 120, 210],
+                ),
+            ]
+        ),
+        Spacer(15),
+        KeepTogether(
+            [
+                Heading("URL Table Aliases", level=2),
+                Paragraph(
+                    "URL Tables fetch IP lists from remote sources, enabling integration with "
+                    "threat intelligence feeds. Configure update frequency under the alias "
+                    "settings."
+                ),
+                BulletList(
+                    [
+                        "<b>Spamhaus DROP</b>: https://www.spamhaus.org/drop/drop.txt",
+                        "<b>Firehol Level1</b>: https://iplists.firehol.org/files/firehol_level1.netset",
+                        "<b>Emerging Threats</b>: https://rules.emergingthreats.net/fwrules/emerging-Block-IPs.txt",
+                    ],
+                ),
+                Spacer(15),
+                Callout(
+                    "Nest aliases within other aliases for complex rule sets. For example, "
+                    "create 'INTERNAL_NETS' containing 'LAN_NET', 'DMZ_NET', and 'GUEST_NET' "
+                    "aliases.",
+                    "tip",
+                ),
+            ]
+        ),
+        Spacer(20),
+        KeepTogether(
+            [
+                Heading("Rule Configuration Fields"),
+                Paragraph(
+                    "Each firewall rule contains multiple fields controlling match criteria and "
+                    "behavior:"
+                ),
+                Table(
+                    id="rule_fields",
+                    rows=[
+                        ["Field", "Options", "Notes"],
+                        [
+                            "Action",
+                            "Pass / Block / Reject",
+                            "What to do with matched traffic",
+                        ],
+                        ["Interface", "WAN, LAN, VLANs, Groups", "Where rule applies"],
+                        [
+                            "Direction",
+                            "In / Out",
+                            "'In' = entering interface (most common)",
+                        ],
+                        ["TCP/IP Version", "IPv4, IPv6, IPv4+IPv6", "Address family"],
+                        ["Protocol", "TCP, UDP, ICMP, Any, etc.", "Layer 4 protocol"],
+                        ["Source", "Any, IP, Alias, Network", "Traffic origin"],
+                        ["Destination", "Any, IP, Alias, Network", "Traffic target"],
+                        [
+                            "Destination Port",
+                            "Any, Port, Alias, Range",
+                            "Service port(s)",
+                        ],
+                        ["Log", "Enabled/Disabled", "Write to firewall log"],
+                        ["Category", "User-defined label", "Organize rules visually"],
+                    ],
+                    col_widths=[100, 130, 210],
+                ),
+            ]
+        ),
+        Spacer(20),
+        KeepTogether(
+            [
+                Heading("Advanced Rule Options", level=2),
+                BulletList(
+                    [
+                        "<b>Source Port</b>: Match originating port (rarely needed)",
+                        "<b>Gateway</b>: Policy-based routing to specific gateway",
+                        "<b>Schedule</b>: Time-based rule activation",
+                        "<b>State Type</b>: Keep/Sloppy/Synproxy/None",
+                        "<b>State Timeout</b>: Override default connection timeout",
+                        "<b>Max States</b>: Limit connections from this rule",
+                        "<b>Max Src Nodes</b>: Limit unique source IPs",
+                        "<b>Max Connections / Src</b>: Per-source connection limit",
+                        "<b>Tag / Tagged</b>: Mark packets for later matching",
+                        "<b>Allow Options</b>: Permit IP options (rarely needed)",
+                        "<b>TCP Flags</b>: Match specific TCP flags",
+                    ],
+                ),
+            ]
+        ),
+        PageBreak(),
+        KeepTogether(
+            [
+                Heading("Interface Rules Best Practices"),
+                Paragraph(
+                    "Rules are applied on the interface where traffic <b>enters</b> the "
+                    "firewall. This is the most common source of confusion for new users."
+                ),
+                Spacer(10),
+                Callout(
+                    "Traffic FROM LAN TO WAN is filtered by LAN interface rules (inbound to "
+                    "firewall). Traffic FROM WAN TO LAN is filtered by WAN interface rules.",
+                    "warning",
+                ),
+            ]
+        ),
+        Spacer(15),
+        KeepTogether(
+            [
+                Heading("LAN Rules Example", level=2),
+                Paragraph(
+                    "A typical LAN ruleset allowing internet access while blocking inter-VLAN "
+                    "traffic:"
+                ),
+                Table(
+                    id="lan_rules",
+                    rows=[
+                        ["#", "Action", "Source", "Destination", "Port", "Description"],
+                        [
+                            "1",
+                            "Pass",
+                            "LAN net",
+                            "LAN address",
+                            "443,22",
+                            "Access firewall GUI/SSH",
+                        ],
+                        [
+                            "2",
+                            "Block",
+                            "LAN net",
+                            "RFC1918",
+                            "Any",
+                            "Block other internal nets",
+                        ],
+                        ["3", "Pass", "LAN net", "Any", "Any", "Allow internet access"],
+                    ],
+                    col_widths=[25, 50, 70, 80, 60, 155],
+                ),
+            ]
+        ),
+        Spacer(15),
+        KeepTogether(
+            [
+                Heading("WAN Rules Example", level=2),
+                Paragraph(
+                    "WAN interface typically has minimal rules - most traffic blocked by "
+                    "default. Only add rules for explicitly exposed services:"
+                ),
+                Table(
+                    id="wan_rules",
+                    rows=[
+                        ["#", "Action", "Source", "Destination", "Port", "Description"],
+                        [
+                            "1",
+                            "Pass",
+                            "Any",
+                            "WAN address",
+                            "443",
+                            "HTTPS to web server",
+                        ],
+                        [
+                            "2",
+                            "Pass",
+                            "Any",
+                            "WAN address",
+                            "51820/UDP",
+                            "WireGuard VPN",
+                        ],
+                        ["-", "Block", "Any", "Any", "Any", "(implicit default deny)"],
+                    ],
+                    col_widths=[25, 50, 70, 80, 70, 145],
+                ),
+            ]
+        ),
+        Spacer(20),
+        KeepTogether(
+            [
+                Heading("Floating Rules"),
+                Paragraph(
+                    "Floating rules apply across multiple interfaces and are processed before "
+                    "interface rules. Use them for policies that span the entire firewall:"
+                ),
+                BulletList(
+                    [
+                        "Block known-bad IPs on ALL interfaces",
+                        "Apply QoS/traffic shaping globally",
+                        "Enforce policy across interface groups",
+                        "Quick deny rules that must match first",
+                        "Outbound direction filtering (rare)",
+                    ],
+                ),
+                Spacer(15),
+                Callout(
+                    "Set 'Quick' on floating rules to stop processing immediately on match. "
+                    "Without 'Quick', floating rules mark the packet but processing continues to "
+                    "interface rules.",
+                    "info",
+                ),
+            ]
+        ),
+        Spacer(20),
+        KeepTogether(
+            [
+                Heading("Viewing the Active Ruleset"),
+                Paragraph(
+                    "The actual pf ruleset loaded in memory may differ from the GUI "
+                    "representation. Always verify with CLI tools when troubleshooting:"
+                ),
+                BulletList(
+                    [
+                        "<font face='Courier' size='9'>pfctl -sr</font> - Show all loaded rules",
+                        "<font face='Courier' size='9'>pfctl -ss</font> - Show state table (active connections)",
+                        "<font face='Courier' size='9'>pfctl -si</font> - Show filter statistics and counters",
+                        "<font face='Courier' size='9'>pfctl -vvsr</font> - Verbose rules with hit counters",
+                        "<font face='Courier' size='9'>cat /tmp/rules.debug</font> - View rules file before loading",
+                    ],
+                    marker="",
+                ),
+            ]
+        ),
+    ],
+)
+
+
+# ============================================================================
+# CHAPTER 5: NETWORK ADDRESS TRANSLATION
+# ============================================================================
+
+CHAPTER_5 = Chapter(
+    key="5",
+    title="Network Address Translation",
+    summary="Port forwarding, outbound NAT, 1:1 NAT",
+    blocks=[
+        Paragraph(
+            "NAT allows internal networks with private IPs to communicate with external "
+            "networks. OPNsense supports multiple NAT types for different scenarios."
+        ),
+        Spacer(15),
+        KeepTogether(
+            [
+                Heading("NAT Types"),
+                Table(
+                    id="nat_data",
+                    rows=[
+                        ["Type", "Direction", "Common Use"],
+                        ["Port Forward", "Inbound", "Expose internal services"],
+                        ["Outbound NAT", "Outbound", "Internet access for LAN"],
+                        ["One-to-One", "Bidirectional", "Static IP mapping"],
+                        ["NPTv6", "IPv6", "IPv6 prefix translation"],
+                    ],
+                    col_widths=[120, 100, 220],
+                ),
+            ]
+        ),
+        Spacer(20),
+        KeepTogether(
+            [
+                Heading("Port Forwarding", level=2),
+                Paragraph(
+                    "Port forwarding (Destination NAT) redirects incoming traffic to internal "
+                    "hosts. Essential fields include:"
+                ),
+                BulletList(
+                    [
+                        "<b>Interface</b>: Usually WAN",
+                        "<b>Protocol</b>: TCP, UDP, or both",
+                        "<b>Destination Port</b>: External port to listen on",
+                        "<b>Redirect Target IP</b>: Internal host IP",
+                        "<b>Redirect Target Port</b>: Internal port",
+                    ],
+                ),
+                Spacer(15),
+                Callout(
+                    "NAT rules are processed BEFORE firewall rules. A port forward with 'Pass' "
+                    "association will bypass other firewall rules for that traffic.",
+                    "danger",
+                ),
+            ]
+        ),
+        Spacer(20),
+        KeepTogether(
+            [
+                Heading("Outbound NAT Modes", level=2),
+                Table(
+                    id="outbound_data",
+                    rows=[
+                        ["Mode", "Description"],
+                        [
+                            "Automatic",
+                            "Default, auto-generates rules for all interfaces",
+                        ],
+                        ["Hybrid", "Auto rules plus custom manual rules"],
+                        ["Manual", "Full manual control, no auto rules"],
+                        ["Disabled", "No outbound NAT (transparent bridge)"],
+                    ],
+                    col_widths=[120, 320],
+                ),
+            ]
+        ),
+        Spacer(20),
+        Heading("Practical NAT Examples"),
+        Paragraph(
+            "Common NAT configurations for real-world scenarios. Each example includes "
+            "the complete configuration steps."
+        ),
+        Spacer(15),
+        Heading("Example 1: Web Server Port Forward (HTTP/HTTPS)", level=2),
+        Paragraph(
+            "Expose an internal web server (192.168.1.100) to the internet on standard "
+            "ports."
+        ),
+        Spacer(10),
+        Table(
+            id="web_server_config",
+            rows=[
+                ["Setting", "HTTP Rule", "HTTPS Rule"],
+                ["Interface", "WAN", "WAN"],
+                ["Protocol", "TCP", "TCP"],
+                ["Destination", "WAN address", "WAN address"],
+                ["Destination Port", "80", "443"],
+                ["Redirect Target IP", "192.168.1.100", "192.168.1.100"],
+                ["Redirect Target Port", "80", "443"],
+                ["NAT Reflection", "Enable (for hairpin)", "Enable (for hairpin)"],
+                ["Filter Rule Assoc.", "Pass", "Pass"],
+            ],
+            col_widths=[120, 160, 160],
+        ),
+        Spacer(10),
+        Callout(
+            "SECURITY: Never expose management interfaces (SSH, WebUI) directly. Use VPN "
+            "for remote administration. Consider adding source IP restrictions if public "
+            "access is required.",
+            "danger",
+        ),
+        Spacer(15),
+        Heading("Example 2: Game Server Port Forward", level=2),
+        Paragraph("Common game server ports. Host is 192.168.1.50 on LAN."),
+        Spacer(10),
+        Table(
+            id="game_ports",
+            rows=[
+                ["Game/Service", "Protocol", "Port(s)", "Notes"],
+                ["Minecraft Java", "TCP", "25565", "Default server port"],
+                ["Minecraft Bedrock", "UDP", "19132", "Bedrock edition"],
+                ["Valheim", "UDP", "2456-2458", "Range required"],
+                ["Terraria", "TCP", "7777", "Default server port"],
+                ["Plex Media Server", "TCP", "32400", "Remote streaming"],
+                ["ARK: Survival", "UDP", "7777, 27015", "Game + query ports"],
+                ["Counter-Strike 2", "TCP/UDP", "27015-27020", "Server + RCON"],
+            ],
+            col_widths=[110, 60, 90, 180],
+        ),
+        Spacer(10),
+        BulletList(
+            [
+                "1. Firewall → NAT → Port Forward → Add",
+                "2. Interface: WAN, Protocol: as shown above",
+                "3. Destination: WAN address, Port: game port(s)",
+                "4. Redirect target: Game server LAN IP",
+                "5. Filter rule association: Pass (creates firewall rule)",
+                "6. Save and Apply Changes",
+            ],
+        ),
+        Spacer(15),
+        Heading("Example 3: Hairpin NAT (NAT Reflection)", level=2),
+        Paragraph(
+            "Allows LAN clients to access port-forwarded services using the public "
+            "IP/domain instead of the internal IP. Required when internal DNS returns "
+            "public IP."
+        ),
+        Spacer(10),
+        Table(
+            id="hairpin_config",
+            rows=[
+                ["Setting", "Location", "Value"],
+                [
+                    "NAT Reflection mode",
+                    "Firewall → Settings → Advanced",
+                    "Pure NAT (recommended)",
+                ],
+                [
+                    "Reflection for port forwards",
+                    "Firewall → Settings → Advanced",
+                    "Enabled",
+                ],
+                [
+                    "Automatic outbound NAT for Reflection",
+                    "Firewall → Settings → Advanced",
+                    "Enabled",
+                ],
+                [
+                    "Per-rule reflection",
+                    "Each port forward rule → NAT reflection",
+                    "Enable",
+                ],
+            ],
+            col_widths=[160, 150, 130],
+        ),
+        Spacer(10),
+        Callout(
+            "SPLIT DNS ALTERNATIVE: Instead of hairpin NAT, configure internal DNS "
+            "(Unbound) to resolve your domain to the internal IP. This is more efficient "
+            "and avoids NAT complexity. Services → Unbound DNS → Host Overrides.",
+            "tip",
+        ),
+        Spacer(15),
+        Heading("Example 4: Policy-Based Outbound NAT", level=2),
+        Paragraph(
+            "Route specific traffic through different WAN IPs or interfaces. Useful for "
+            "multi-WAN setups or VPN policy routing."
+        ),
+        Spacer(10),
+        Table(
+            id="policy_nat_example",
+            rows=[
+                ["Scenario", "Source", "Translation Address"],
+                [
+                    "VPN clients use VPN gateway",
+                    "10.0.8.0/24 (VPN subnet)",
+                    "VPN interface address",
+                ],
+                ["Servers use static IP", "192.168.1.100/32", "WAN static IP alias"],
+                [
+                    "IoT uses secondary WAN",
+                    "192.168.40.0/24 (IoT VLAN)",
+                    "WAN2 interface address",
+                ],
+                [
+                    "No NAT for site-to-site VPN",
+                    "192.168.1.0/24 to 10.0.0.0/24",
+                    "None (NO NAT rule)",
+                ],
+            ],
+            col_widths=[140, 140, 160],
+        ),
+        Spacer(10),
+        BulletList(
+            [
+                "1. Set NAT mode to Hybrid or Manual (Firewall → NAT → Outbound)",
+                "2. Add manual rule ABOVE automatic rules",
+                "3. Interface: Outbound interface (WAN, WAN2, VPN)",
+                "4. Source: Network/host to match",
+                "5. Translation: Interface address or specific IP",
+                "6. For NO NAT: Check 'Do not NAT' or set Translation to 'None'",
+            ],
+        ),
+        Spacer(10),
+        Paragraph(
+            "<b>No-NAT rule:</b> inter-VLAN and VPN traffic that must keep its "
+            "original source IP needs an outbound rule with NAT disabled, placed above "
+            "the rules that translate the same source. As an "
+            "opnsense_nat_create_outbound_rule call or source_nat API body:"
+        ),
+        Spacer(5),
+        Table(
+            id="no_nat_rule",
+            rows=[
+                ["Field", "Example Value", "Notes"],
+                ["interface", "wan", "Outbound interface"],
+                ["source_net", "10.0.6.0/24", "DMZ subnet"],
+                ["destination_net", "10.0.0.0/24", "LAN subnet"],
+                ["nonat", "1", "Do not translate"],
+                ["description", "DMZ to LAN - no NAT", ""],
+            ],
+        ),
+        Spacer(15),
+        Heading("Example 5: One-to-One (1:1) NAT", level=2),
+        Paragraph(
+            "Maps an entire public IP to an internal host. All ports forwarded "
+            "bidirectionally. Useful when ISP provides multiple static IPs."
+        ),
+        Spacer(10),
+        Table(
+            id="one_to_one_config",
+            rows=[
+                ["Setting", "Value", "Notes"],
+                ["Interface", "WAN", "Interface with public IP"],
+                ["External IP", "203.0.113.10", "Additional public IP from ISP"],
+                ["Internal IP", "192.168.1.100", "Server to expose"],
+                ["Destination", "Any or specific subnet", "Usually 'any'"],
+                ["NAT Reflection", "Enable", "If internal access needed"],
+            ],
+            col_widths=[100, 130, 210],
+        ),
+        Spacer(10),
+        Callout(
+            "1:1 NAT FIREWALL RULES: Unlike port forwards, 1:1 NAT does NOT "
+            "automatically create firewall rules. You must manually create WAN rules to "
+            "allow desired traffic to the external IP.",
+            "warning",
+        ),
+        Spacer(15),
+        KeepTogether(
+            [
+                Heading("MCP NAT Tools Quick Reference", level=2),
+                Table(
+                    id="mcp_nat_ref",
+                    rows=[
+                        ["Task", "MCP Tool"],
+                        ["List port forwards", "opnsense_nat_list_port_forwards"],
+                        ["Create port forward", "opnsense_nat_create_port_forward"],
+                        ["Delete port forward", "opnsense_nat_delete_port_forward"],
+                        ["List outbound NAT", "opnsense_nat_list_outbound"],
+                        ["Create outbound rule", "opnsense_nat_create_outbound_rule"],
+                        [
+                            "Get/Set NAT mode",
+                            "opnsense_nat_get_mode / opnsense_nat_set_mode",
+                        ],
+                        ["Analyze NAT config", "opnsense_nat_analyze_config"],
+                        ["Apply NAT changes", "opnsense_nat_apply_changes"],
+                    ],
+                    col_widths=[150, 290],
+                ),
+            ]
+        ),
+    ],
+)
+
+
+# ============================================================================
+# CHAPTER 6: VIRTUAL PRIVATE NETWORKS (EXPANDED)
+# ============================================================================
+
+CHAPTER_6 = Chapter(
+    key="6",
+    title="Virtual Private Networks",
+    summary="IPsec, OpenVPN, and WireGuard in depth",
+    blocks=[
+        Paragraph(
+            "OPNsense supports multiple VPN technologies for secure remote access and "
+            "site-to-site connectivity. Each technology has different strengths for "
+            "specific deployment scenarios. This chapter covers IPsec, OpenVPN, and "
+            "WireGuard in detail."
+        ),
+        Spacer(15),
+        Diagram("vpn"),
+        Spacer(20),
+        KeepTogether(
+            [
+                Heading("VPN Technology Comparison"),
+                Table(
+                    id="vpn_data",
+                    rows=[
+                        ["Feature", "IPsec", "OpenVPN", "WireGuard"],
+                        [
+                            "Best Use Case",
+                            "Site-to-Site",
+                            "Road Warriors",
+                            "Modern/Mobile",
+                        ],
+                        ["Performance", "Excellent", "Good", "Excellent"],
+                        ["Configuration", "Complex", "Moderate", "Simple"],
+                        ["Protocol", "UDP 500/4500", "UDP 1194 or TCP", "UDP 51820"],
+                        ["NAT Traversal", "NAT-T (UDP 4500)", "Native", "Native"],
+                        ["Mobile Support", "Limited", "Good", "Excellent"],
+                        [
+                            "Interoperability",
+                            "Universal",
+                            "OpenVPN only",
+                            "WireGuard only",
+                        ],
+                    ],
+                    col_widths=[95, 95, 95, 95],
+                ),
+            ]
+        ),
+        Spacer(20),
+        KeepTogether(
+            [
+                Heading("IPsec VPN"),
+                Paragraph(
+                    "IPsec is the industry standard for site-to-site VPNs, supported by "
+                    "virtually all enterprise firewalls. OPNsense 23.1+ uses the modern "
+                    "swanctl/Connections interface based on strongSwan's vici protocol."
+                ),
+                Spacer(10),
+                Heading("IPsec Phases Explained", level=2),
+                Table(
+                    id="ipsec_phases",
+                    rows=[
+                        ["Phase", "Purpose", "Key Settings"],
+                        [
+                            "Phase 1 (IKE)",
+                            "Authenticate peers, establish secure channel",
+                            "Encryption, Hash, DH Group, Lifetime",
+                        ],
+                        [
+                            "Phase 2 (ESP)",
+                            "Negotiate data encryption parameters",
+                            "Encryption, Hash, PFS Group, Lifetime",
+                        ],
+                    ],
+                    col_widths=[80, 180, 180],
+                ),
+            ]
+        ),
+        Spacer(15),
+        KeepTogether(
+            [
+                Heading("Recommended Phase 1 Settings", level=2),
+                Table(
+                    id="ph1_settings",
+                    rows=[
+                        ["Setting", "Recommended Value", "Notes"],
+                        ["Key Exchange", "IKEv2", "More secure, faster than IKEv1"],
+                        ["Encryption", "AES-256-GCM", "Authenticated encryption"],
+                        ["Hash", "(implicit in GCM)", "GCM includes authentication"],
+                        ["DH Group", "ECP384 or Curve25519", "Modern elliptic curve"],
+                        [
+                            "Lifetime",
+                            "28800 seconds (8 hours)",
+                            "Balance security/overhead",
+                        ],
+                        ["DPD", "Enabled, 10s interval", "Detect dead peers"],
+                    ],
+                    col_widths=[100, 130, 210],
+                ),
+            ]
+        ),
+        Spacer(15),
+        KeepTogether(
+            [
+                Heading("Recommended Phase 2 Settings", level=2),
+                Table(
+                    id="ph2_settings",
+                    rows=[
+                        ["Setting", "Recommended Value", "Notes"],
+                        ["Encryption", "AES-256-GCM", "Match Phase 1"],
+                        [
+                            "PFS Group",
+                            "ECP384 or Curve25519",
+                            "Perfect Forward Secrecy",
+                        ],
+                        ["Lifetime", "3600 seconds (1 hour)", "Shorter than Phase 1"],
+                        ["Local Network", "LAN subnet", "What to encrypt"],
+                        [
+                            "Remote Network",
+                            "Remote LAN subnet",
+                            "Peer's protected network",
+                        ],
+                    ],
+                    col_widths=[100, 130, 210],
+                ),
+                Spacer(15),
+                Callout(
+                    "Both sides must have matching Phase 1 and Phase 2 settings. Mismatched "
+                    "encryption, hash, or DH groups are the most common cause of tunnel failures.",
+                    "warning",
+                ),
+            ]
+        ),
+        Spacer(20),
+        Heading("IPsec Site-to-Site Setup Checklist", level=2),
+        BulletList(
+            [
+                "1. VPN → IPsec → Connections → Add new connection",
+                "2. Configure local and remote endpoints (IPs or FQDNs)",
+                "3. Set authentication (PSK or certificates)",
+                "4. Define local and remote networks (Children/Phase 2)",
+                "5. Create firewall rule: WAN, UDP 500 and 4500, to WAN address",
+                "6. Create firewall rule: IPsec interface, permit traffic to/from remote nets",
+                "7. Enable connection and check Status → IPsec → Overview",
+            ],
+        ),
+        PageBreak(),
+        Heading("OpenVPN"),
+        Paragraph(
+            "OpenVPN is an SSL/TLS-based VPN ideal for remote access (road warrior) "
+            "scenarios. It works well through restrictive firewalls and NAT, making it "
+            "reliable for mobile users. OPNsense uses the Instances model for OpenVPN "
+            "configuration."
+        ),
+        Spacer(15),
+        Heading("OpenVPN Modes", level=2),
+        Table(
+            id="ovpn_modes",
+            rows=[
+                ["Mode", "Authentication", "Use Case"],
+                [
+                    "SSL/TLS",
+                    "Certificates + optional user auth",
+                    "Standard, most secure",
+                ],
+                [
+                    "SSL/TLS + User Auth",
+                    "Cert + username/password",
+                    "Road warriors with MFA",
+                ],
+                [
+                    "Shared Key",
+                    "Static pre-shared key",
+                    "Simple site-to-site (not recommended)",
+                ],
+            ],
+            col_widths=[120, 150, 170],
+        ),
+        Spacer(15),
+        Heading("Topology Options", level=2),
+        Table(
+            id="topo_opts",
+            rows=[
+                ["Topology", "IP Assignment", "Best For"],
+                [
+                    "subnet",
+                    "Unique IP per client from pool",
+                    "Most common, recommended",
+                ],
+                ["net30", "/30 subnet per client", "Legacy compatibility"],
+                ["p2p", "Point-to-point (no pool)", "Site-to-site only"],
+            ],
+            col_widths=[80, 160, 200],
+        ),
+        Spacer(15),
+        Heading("OpenVPN Server Setup", level=2),
+        BulletList(
+            [
+                "1. System → Trust → Authorities: Create or import CA certificate",
+                "2. System → Trust → Certificates: Create server certificate signed by CA",
+                "3. VPN → OpenVPN → Instances: Add new server instance",
+                "4. Configure: Role=Server, Protocol=UDP, Port=1194, Topology=subnet",
+                "5. Set tunnel network (e.g., 10.10.0.0/24) and local networks to push",
+                "6. Select server certificate and CA",
+                "7. Firewall: Allow UDP 1194 on WAN",
+                "8. Firewall: Allow traffic on OpenVPN interface",
+                "9. VPN → OpenVPN → Client Export: Generate client configs",
+            ],
+        ),
+        Spacer(15),
+        Callout(
+            "Use the Client Export plugin (os-openvpn-client-export) to generate "
+            "ready-to-use configuration files and installers for Windows, macOS, Linux, "
+            "iOS, and Android.",
+            "tip",
+        ),
+        Spacer(20),
+        Heading("WireGuard VPN"),
+        Paragraph(
+            "WireGuard is a modern VPN protocol designed for simplicity and performance. "
+            "It uses state-of-the-art cryptography (Curve25519, ChaCha20, Poly1305) and "
+            "has a minimal attack surface with ~4,000 lines of code vs 100,000+ for "
+            "OpenVPN/IPsec."
+        ),
+        Spacer(15),
+        Heading("WireGuard Concepts", level=2),
+        Table(
+            id="wg_concepts",
+            rows=[
+                ["Term", "Description"],
+                ["Instance", "Local WireGuard interface with keypair and listen port"],
+                ["Peer", "Remote endpoint with public key and allowed IPs"],
+                ["Allowed IPs", "What traffic to send through this peer (routing)"],
+                ["Endpoint", "Public IP:port of peer (optional for server)"],
+                ["Keepalive", "Periodic packets to maintain NAT mappings"],
+            ],
+            col_widths=[100, 340],
+        ),
+        Spacer(15),
+        Heading("WireGuard Server Setup", level=2),
+        BulletList(
+            [
+                "1. VPN → WireGuard → Instances: Create new instance",
+                "2. Generate keypair (or paste existing public/private keys)",
+                "3. Set listen port (default 51820) and tunnel address (e.g., 10.10.10.1/24)",
+                "4. Optionally add DNS servers to push to clients",
+                "5. Save and note the public key for peer configuration",
+                "6. VPN → WireGuard → Peers: Add each client as a peer",
+                "7. Enter client's public key and Allowed IPs (client's tunnel IP/32)",
+                "8. Firewall → Rules → WAN: Allow UDP 51820 to WAN address",
+                "9. Firewall → Rules → WireGuard: Allow traffic from tunnel network",
+                "10. Interfaces → Assignments: Optionally assign WG interface for advanced rules",
+            ],
+        ),
+        Spacer(15),
+        Callout(
+            "WireGuard is 'silent' - it won't respond to unauthenticated packets. If a "
+            "peer can't connect, it appears as if nothing is listening. This is a "
+            "security feature.",
+            "info",
+        ),
+        Spacer(20),
+        Heading("VPN Firewall Rules"),
+        Paragraph("All VPN types require firewall rules to permit traffic. Remember:"),
+        BulletList(
+            [
+                "<b>WAN rules</b>: Allow VPN protocol inbound (UDP 500/4500, 1194, 51820)",
+                "<b>VPN interface rules</b>: Control what VPN clients can access",
+                "<b>IPsec uses its own tab</b>: Firewall → Rules → IPsec (not an interface)",
+                "<b>NAT bypass</b>: VPN traffic typically bypasses outbound NAT",
+            ],
+        ),
+    ],
+)
+
+
+# ============================================================================
+# CHAPTER 7: DNS SERVICES (UNBOUND) - NEW
+# ============================================================================
+
+CHAPTER_7 = Chapter(
+    key="7",
+    title="DNS Services (Unbound)",
+    summary="Resolver, DNSSEC, blocklists, and DoT/DoH",
+    blocks=[
+        Paragraph(
+            "Unbound is OPNsense's default DNS resolver, providing recursive DNS "
+            "resolution with DNSSEC validation, caching, and advanced features like "
+            "DNS-over-TLS (DoT). It replaces the older Dnsmasq and can function as both "
+            "a resolver and forwarder."
+        ),
+        Spacer(15),
+        KeepTogether(
+            [
+                Heading("DNS Resolution Modes"),
+                Table(
+                    id="dns_modes",
+                    rows=[
+                        ["Mode", "Behavior", "Privacy", "Speed"],
+                        [
+                            "Recursive",
+                            "Query root servers directly",
+                            "Best (no third party)",
+                            "Slower initial",
+                        ],
+                        [
+                            "Forwarding",
+                            "Forward to upstream DNS",
+                            "Depends on upstream",
+                            "Faster",
+                        ],
+                        [
+                            "DoT Forwarding",
+                            "Encrypted forwarding",
+                            "Good (encrypted)",
+                            "Moderate",
+                        ],
+                    ],
+                    col_widths=[90, 150, 110, 90],
+                ),
+                Spacer(15),
+                Callout(
+                    "Recursive mode queries authoritative servers directly, eliminating reliance "
+                    "on third-party DNS providers. Enable DNSSEC to validate responses "
+                    "cryptographically.",
+                    "info",
+                ),
+            ]
+        ),
+        Spacer(20),
+        KeepTogether(
+            [
+                Heading("General Settings"),
+                Table(
+                    id="unbound_settings",
+                    rows=[
+                        ["Setting", "Recommended", "Notes"],
+                        ["Enable", "Checked", "Activate Unbound service"],
+                        ["Listen Port", "53", "Standard DNS port"],
+                        ["Network Interfaces", "LAN, VLANs", "Where to accept queries"],
+                        ["DNSSEC", "Enabled", "Validate signed responses"],
+                        ["DNS64", "Disabled", "Only for IPv6-only networks"],
+                        ["Register DHCP Leases", "Enabled", "Resolve local hostnames"],
+                        [
+                            "Register Static Mappings",
+                            "Enabled",
+                            "Include DHCP static entries",
+                        ],
+                        [
+                            "Local Zone Type",
+                            "Transparent",
+                            "Allow upstream for unknown local",
+                        ],
+                    ],
+                    col_widths=[130, 100, 210],
+                ),
+            ]
+        ),
+        Spacer(20),
+        KeepTogether(
+            [
+                Heading("DNS-over-TLS (DoT) Configuration"),
+                Paragraph(
+                    "DoT encrypts DNS queries to upstream servers, preventing eavesdropping and "
+                    "manipulation. Configure under Services → Unbound DNS → DNS over TLS."
+                ),
+                Spacer(10),
+                Table(
+                    id="dot_providers",
+                    rows=[
+                        ["Provider", "Server", "Port", "Hostname Verification"],
+                        ["Cloudflare", "1.1.1.1", "853", "cloudflare-dns.com"],
+                        ["Google", "8.8.8.8", "853", "dns.google"],
+                        ["Quad9", "9.9.9.9", "853", "dns.quad9.net"],
+                        ["Mullvad", "194.242.2.2", "853", "dns.mullvad.net"],
+                    ],
+                    col_widths=[90, 90, 50, 210],
+                ),
+                Spacer(15),
+                Callout(
+                    "Enable 'Use System Nameservers' under Query Forwarding and add DoT servers "
+                    "above. The hostname verification ensures you're connecting to the "
+                    "legitimate server.",
+                    "tip",
+                ),
+            ]
+        ),
+        Spacer(20),
+        BulletList(
+            [
+                "<b>Ads/Tracking</b>: Block advertising and analytics domains",
+                "<b>Malware</b>: Block known malicious domains",
+                "<b>Adult Content</b>: Family-safe filtering",
+                "<b>Custom</b>: Your own domain blacklist",
+            ],
+        ),
+        Spacer(15),
+        Heading("Popular Blocklist Sources", level=2),
+        BulletList(
+            [
+                "<b>Steven Black Unified</b>: Ads, malware, fakenews, gambling, social",
+                "<b>OISD</b>: Optimized comprehensive blocklist",
+                "<b>AdGuard DNS Filter</b>: Curated ad blocking",
+                "<b>Energized Protection</b>: Multiple protection levels",
+            ],
+        ),
+        Spacer(15),
+        Heading("Host and Domain Overrides", level=2),
+        Paragraph(
+            "Override DNS responses for specific hosts or entire domains. Useful for:"
+        ),
+        BulletList(
+            [
+                "Split-horizon DNS (internal vs external resolution)",
+                "Redirect internal services to local IPs",
+                "Block specific domains by pointing to 0.0.0.0",
+                "Override public DNS for local resources",
+            ],
+        ),
+    ],
+)
+
+
+# ============================================================================
+# CHAPTER 8: INTRUSION DETECTION (SURICATA) - NEW
+# ============================================================================
+
+CHAPTER_8 = Chapter(
+    key="8",
+    title="Intrusion Detection (Suricata)",
+    summary="IDS/IPS configuration and tuning",
+    blocks=[
+        Paragraph(
+            "Suricata is a high-performance Network IDS/IPS (Intrusion "
+            "Detection/Prevention System) integrated into OPNsense. It inspects traffic "
+            "for malicious patterns, exploits, and policy violations using "
+            "signature-based detection."
+        ),
+        Spacer(15),
+        Heading("IDS vs IPS Mode"),
+        Table(
+            id="ids_modes",
+            rows=[
+                ["Mode", "Action on Match", "Impact", "Use Case"],
+                ["IDS", "Alert only", "None", "Monitoring, tuning rules"],
+                [
+                    "IPS (Inline)",
+                    "Block traffic",
+                    "May block legitimate",
+                    "Active protection",
+                ],
+            ],
+            col_widths=[70, 110, 100, 160],
+        ),
+        Spacer(15),
+        Callout(
+            "Start with IDS mode to tune rules and eliminate false positives before "
+            "enabling IPS blocking. Aggressive IPS rules can break legitimate "
+            "applications.",
+            "warning",
+        ),
+        Spacer(20),
+        Heading("Ruleset Sources"),
+        Table(
+            id="rulesets",
+            rows=[
+                ["Ruleset", "Type", "Focus"],
+                ["ET Open", "Free", "Emerging threats, malware, exploits"],
+                ["ET Pro", "Commercial", "Enhanced ET with more coverage"],
+                ["Snort Community", "Free (registration)", "Traditional IDS rules"],
+                ["Snort Subscriber", "Commercial", "Latest Snort rules"],
+                ["Abuse.ch", "Free", "SSL certs, malware URLs, botnets"],
+                ["OPNsense App Detection", "Free", "Application identification"],
+            ],
+            col_widths=[120, 100, 220],
+        ),
+        Spacer(20),
+        Heading("Configuration Steps"),
+        BulletList(
+            [
+                "1. Services → Intrusion Detection → Administration",
+                "2. Enable IDS, select interface(s) to monitor",
+                "3. Set Pattern Matcher (Hyperscan if available, otherwise AC)",
+                "4. Download tab: Enable desired rulesets",
+                "5. Click 'Download & Update Rules'",
+                "6. Rules tab: Review and enable rule categories",
+                "7. Policy tab: Create policies for different interfaces",
+                "8. User Defined tab: Add custom rules if needed",
+                "9. Start with IDS mode, monitor alerts",
+                "10. After tuning, optionally enable IPS mode",
+            ],
+        ),
+        Spacer(20),
+        Heading("Rule Categories", level=2),
+        BulletList(
+            [
+                "<b>emerging-malware</b>: Known malware signatures",
+                "<b>emerging-exploit</b>: Exploit attempts",
+                "<b>emerging-scan</b>: Port scans and recon",
+                "<b>emerging-dos</b>: Denial of service patterns",
+                "<b>emerging-web_server</b>: Web application attacks",
+                "<b>emerging-policy</b>: Policy violations (P2P, etc.)",
+            ],
+        ),
+        Spacer(15),
+        Heading("Tuning and False Positives", level=2),
+        Paragraph(
+            "False positives are inevitable. Use these strategies to tune your "
+            "deployment:"
+        ),
+        BulletList(
+            [
+                "Disable overly broad rules generating excessive alerts",
+                "Use 'Disable SID' to suppress specific signatures",
+                "Create suppression rules for known-good traffic",
+                "Whitelist internal scanners and security tools",
+                "Review alerts regularly and adjust policies",
+            ],
+        ),
+        Spacer(15),
+        Callout(
+            "Suricata is CPU-intensive. On lower-powered hardware, enable only essential "
+            "rule categories or consider monitoring only WAN interface.",
+            "info",
+        ),
+    ],
+)
+
+
+# ============================================================================
+# CHAPTER 9: TRAFFIC SHAPING & QoS
+# ============================================================================
+
+CHAPTER_9 = Chapter(
+    key="9",
+    title="Traffic Shaping & QoS",
+    summary="Pipes, queues, and bandwidth management",
+    blocks=[
+        Paragraph(
+            "Traffic shaping (QoS - Quality of Service) manages bandwidth allocation and "
+            "prioritizes critical traffic. OPNsense provides two shaping systems: the "
+            "legacy ALTQ scheduler and the modern pipes/queues system based on dummynet."
+        ),
+        Spacer(15),
+        Heading("Key Concepts"),
+        Table(
+            id="qos_data",
+            rows=[
+                ["Component", "Function", "Location"],
+                ["Pipes", "Define maximum bandwidth", "Firewall → Shaper → Pipes"],
+                [
+                    "Queues",
+                    "Traffic classes within pipes",
+                    "Firewall → Shaper → Queues",
+                ],
+                ["Rules", "Match traffic to queues", "Firewall → Shaper → Rules"],
+            ],
+            col_widths=[80, 180, 180],
+        ),
+        Spacer(15),
+        Heading("Shaping Workflow", level=2),
+        BulletList(
+            [
+                "1. Create Pipes: Define bandwidth limits (download/upload)",
+                "2. Create Queues: Assign queues to pipes with weights/priorities",
+                "3. Create Rules: Match traffic to queues (by IP, port, DSCP, etc.)",
+                "4. Test: Verify traffic is being shaped correctly",
+            ],
+        ),
+        Spacer(20),
+        Heading("Common QoS Scenarios", level=2),
+        BulletList(
+            [
+                "<b>VoIP Priority</b>: Low latency queue for SIP/RTP traffic",
+                "<b>Bandwidth Caps</b>: Per-user or per-network limits",
+                "<b>Gaming</b>: Prioritize game traffic over bulk downloads",
+                "<b>Work Applications</b>: Prioritize VPN and business apps",
+                "<b>Guest Network</b>: Limit guest VLAN bandwidth",
+            ],
+        ),
+        Spacer(15),
+        Callout(
+            "Shape to 95% of actual bandwidth. This keeps queuing under YOUR control "
+            "rather than letting your ISP's equipment decide what gets dropped.",
+            "tip",
+        ),
+        Spacer(20),
+        Heading("FQ-CoDel for Bufferbloat", level=2),
+        Paragraph(
+            "FQ-CoDel (Fair Queuing with Controlled Delay) reduces bufferbloat - "
+            "excessive latency caused by large buffers. Enable CoDel on queues for "
+            "responsive connections even under heavy load."
+        ),
+    ],
+)
+
+
+# ============================================================================
+# CHAPTER 10: HIGH AVAILABILITY & CARP (EXPANDED)
+# ============================================================================
+
+CHAPTER_10 = Chapter(
+    key="10",
+    title="High Availability & CARP",
+    summary="Failover clustering and state sync",
+    blocks=[
+        Paragraph(
+            "OPNsense supports high availability through CARP (Common Address Redundancy "
+            "Protocol), enabling automatic failover between two firewalls. Combined with "
+            "pfsync for state synchronization and XMLRPC for configuration sync, this "
+            "provides seamless failover."
+        ),
+        Spacer(15),
+        Heading("HA Components"),
+        Table(
+            id="ha_data",
+            rows=[
+                ["Component", "Purpose", "Protocol"],
+                ["CARP", "Virtual IP failover", "IP Protocol 112"],
+                ["pfsync", "State table sync", "IP Protocol 240"],
+                ["XMLRPC", "Config synchronization", "TCP 443 (HTTPS)"],
+            ],
+            col_widths=[90, 200, 150],
+        ),
+        Spacer(15),
+        Heading("Prerequisites", level=2),
+        BulletList(
+            [
+                "Two identical OPNsense installations (same version)",
+                "Dedicated sync interface directly connected (crossover or switch)",
+                "Same interface assignments on both nodes",
+                "Unique real IPs + shared CARP VIPs on each interface",
+                "Licenses (if using commercial plugins) on both nodes",
+            ],
+        ),
+        Spacer(20),
+        Heading("Setup Procedure"),
+        BulletList(
+            [
+                "1. Configure dedicated SYNC interface on both nodes",
+                "2. Assign static IPs to SYNC interface (e.g., 172.16.0.1 and 172.16.0.2)",
+                "3. On PRIMARY: System → High Availability → Settings",
+                "4. Enable state synchronization, set SYNC interface",
+                "5. Add secondary node IP as synchronization peer",
+                "6. Configure XMLRPC sync settings (admin credentials for secondary)",
+                "7. Select items to synchronize (rules, aliases, NAT, etc.)",
+                "8. Create CARP VIPs on WAN and LAN interfaces",
+                "9. Update DHCP/services to use CARP VIPs, not real IPs",
+                "10. Test failover by stopping CARP on primary",
+            ],
+        ),
+        Spacer(15),
+        Heading("CARP VIP Configuration", level=2),
+        Table(
+            id="carp_fields",
+            rows=[
+                ["Field", "Description"],
+                ["Mode", "CARP"],
+                ["Interface", "WAN, LAN, or VLAN"],
+                ["Address", "Shared virtual IP"],
+                ["VHID", "Virtual Host ID (unique per VIP per broadcast domain)"],
+                ["Password", "Shared secret (same on both nodes)"],
+                [
+                    "Advertising Frequency",
+                    "Base=1, Skew=0 for primary, Skew=100 for secondary",
+                ],
+            ],
+            col_widths=[130, 310],
+        ),
+        Spacer(15),
+        Callout(
+            "The node with lower skew value becomes MASTER. Set primary to skew 0 and "
+            "secondary to skew 100. During maintenance, increase primary's skew to force "
+            "failover.",
+            "tip",
+        ),
+        Spacer(20),
+        Heading("Troubleshooting HA", level=2),
+        BulletList(
+            [
+                "<b>Both nodes MASTER</b>: VHID conflict or sync interface down",
+                "<b>State not syncing</b>: Check pfsync interface, firewall rules",
+                "<b>Config not syncing</b>: Verify XMLRPC credentials and connectivity",
+                "<b>VPN failover slow</b>: Enable DPD on VPN connections",
+            ],
+        ),
+    ],
+)
+
+
+# ============================================================================
+# CHAPTER 11: ADDITIONAL SERVICES
+# ============================================================================
+
+CHAPTER_11 = Chapter(
+    key="11",
+    title="Additional Services",
+    summary="DHCP, NTP, proxies, and plugins",
+    blocks=[
+        Paragraph(
+            "Beyond the core firewall and VPN functionality, OPNsense includes many "
+            "built-in services and supports extensive plugins for additional "
+            "functionality."
+        ),
+        Spacer(15),
+        Heading("Core Services Overview"),
+        Table(
+            id="services_data",
+            rows=[
+                ["Service", "Purpose", "Location"],
+                ["DHCPv4/v6", "IP address assignment", "Services → DHCPv4/v6"],
+                ["Router Adv.", "IPv6 SLAAC", "Services → Router Advertisements"],
+                ["NTP", "Time synchronization", "Services → Network Time"],
+                ["Syslog", "Remote logging", "Services → Syslog"],
+                ["SNMP", "Monitoring protocol", "Services → SNMP"],
+                ["Dynamic DNS", "Update DNS records", "Services → Dynamic DNS"],
+                ["Wake on LAN", "Remote power-on", "Services → Wake on LAN"],
+            ],
+            col_widths=[90, 150, 200],
+        ),
+        Spacer(20),
+        Heading("DHCP Configuration", level=2),
+        Paragraph(
+            "DHCP Server provides automatic IP configuration to clients. Key settings:"
+        ),
+        BulletList(
+            [
+                "<b>Range</b>: Pool of addresses to assign",
+                "<b>Gateway</b>: Default route (usually OPNsense LAN IP)",
+                "<b>DNS Servers</b>: Use OPNsense IP for local resolution",
+                "<b>Lease Time</b>: How long assignments are valid",
+                "<b>Static Mappings</b>: Fixed IPs for specific MAC addresses",
+            ],
+        ),
+        Spacer(20),
+        Heading("Popular Plugins"),
+        Table(
+            id="plugins",
+            rows=[
+                ["Plugin", "Function"],
+                ["os-acme-client", "Let's Encrypt certificate automation"],
+                ["os-haproxy", "Load balancer and reverse proxy"],
+                ["os-nginx", "Web server/reverse proxy"],
+                ["os-crowdsec", "Collaborative threat intelligence"],
+                ["os-wireguard", "WireGuard VPN"],
+                ["os-zerotier", "ZeroTier SD-WAN"],
+                ["os-tailscale", "Tailscale mesh VPN"],
+                ["os-zabbix-agent", "Zabbix monitoring"],
+                ["os-telegraf", "Metrics collection (InfluxDB)"],
+                ["os-theme-*", "UI themes"],
+            ],
+            col_widths=[120, 320],
+        ),
+        Spacer(10),
+        Paragraph(
+            "Install plugins via System → Firmware → Plugins. Search for 'os-' prefix."
+        ),
+    ],
+)
+
+
+# ============================================================================
+# CHAPTER 12: TROUBLESHOOTING & DIAGNOSTICS (EXPANDED)
+# ============================================================================
+
+CHAPTER_12 = Chapter(
+    key="12",
+    title="Troubleshooting & Diagnostics",
+    summary="Tools, commands, and common issues",
+    blocks=[
+        Paragraph(
+            "Effective troubleshooting requires familiarity with OPNsense's diagnostic "
+            "tools, log files, and command-line utilities. This chapter covers essential "
+            "techniques for diagnosing network and firewall issues."
+        ),
+        Spacer(15),
+        Heading("GUI Diagnostic Tools"),
+        Table(
+            id="tools_data",
+            rows=[
+                ["Tool", "Location", "Use Case"],
+                [
+                    "Live Log",
+                    "Firewall → Log Files → Live View",
+                    "Real-time rule matching",
+                ],
+                [
+                    "Packet Capture",
+                    "Interfaces → Diagnostics → Packet Capture",
+                    "Deep packet analysis",
+                ],
+                [
+                    "States",
+                    "Firewall → Diagnostics → States",
+                    "View active connections",
+                ],
+                ["pfTop", "Diagnostics → pfTop", "Real-time state viewer"],
+                ["Activity", "Diagnostics → Activity", "CPU/process monitoring"],
+                [
+                    "DNS Lookup",
+                    "Interfaces → Diagnostics → DNS Lookup",
+                    "Test DNS resolution",
+                ],
+                ["Ping", "Interfaces → Diagnostics → Ping", "ICMP connectivity test"],
+                [
+                    "Traceroute",
+                    "Interfaces → Diagnostics → Traceroute",
+                    "Path analysis",
+                ],
+                [
+                    "Port Probe",
+                    "Interfaces → Diagnostics → Port Probe",
+                    "TCP port test",
+                ],
+            ],
+            col_widths=[90, 200, 150],
+        ),
+        Spacer(20),
+        Heading("Essential CLI Commands"),
+        Table(
+            id="cli_commands",
+            rows=[
+                ["Command", "Purpose"],
+                ["pfctl -sr", "Show loaded firewall rules"],
+                ["pfctl -ss", "Show state table (active connections)"],
+                ["pfctl -si", "Show filter statistics"],
+                ["pfctl -vvsr", "Verbose rules with counters"],
+                ["pfctl -k host", "Kill states for specific host"],
+                ["netstat -rn", "Show routing table"],
+                ["netstat -an", "Show all connections"],
+                ["sockstat -l", "Show listening ports"],
+                ["tcpdump -i em0", "Capture traffic on interface"],
+                ["configctl filter reload", "Reload firewall rules"],
+                ["configctl interface reconfigure", "Reconfigure interfaces"],
+                ["tail -f /var/log/filter.log", "Live firewall log"],
+            ],
+            col_widths=[170, 270],
+        ),
+        Spacer(20),
+        Heading("Common Issues & Solutions"),
+        Spacer(8),
+        Paragraph("<b>Traffic blocked</b>"),
+        BulletList(
+            [
+                "Enable logging on rules, check Live Log, verify rule order",
+            ],
+            marker="→",
+        ),
+        Spacer(8),
+        Paragraph("<b>Cannot reach internet</b>"),
+        BulletList(
+            [
+                "Check WAN status, gateway, outbound NAT",
+            ],
+            marker="→",
+        ),
+        Spacer(8),
+        Paragraph("<b>DNS not resolving</b>"),
+        BulletList(
+            [
+                "Verify Unbound running, check forwarding settings",
+            ],
+            marker="→",
+        ),
+        Spacer(8),
+        Paragraph("<b>VPN won't connect</b>"),
+        BulletList(
+            [
+                "Verify ports open, matching phase settings, check logs",
+            ],
+            marker="→",
+        ),
+        Spacer(8),
+        Paragraph("<b>Slow performance</b>"),
+        BulletList(
+            [
+                "Check interface errors, CPU usage, disable SYN proxy",
+            ],
+            marker="→",
+        ),
+        Spacer(8),
+        Paragraph("<b>CARP not failing over</b>"),
+        BulletList(
+            [
+                "Check VHID uniqueness, sync interface, skew values",
+            ],
+            marker="→",
+        ),
+        Spacer(8),
+        Paragraph("<b>NAT not working</b>"),
+        BulletList(
+            [
+                "Verify mode, check associated filter rule",
+            ],
+            marker="→",
+        ),
+        Spacer(8),
+        Paragraph("<b>Can't access GUI</b>"),
+        BulletList(
+            [
+                "SSH in, check webconfigurator service, anti-lockout rule",
+            ],
+            marker="→",
+        ),
+        Spacer(20),
+        Heading("Important Log Files", level=2),
+        BulletList(
+            [
+                "<font face='Courier' size='9'>/var/log/filter.log</font> - Firewall blocks/passes",
+                "<font face='Courier' size='9'>/var/log/system.log</font> - General system messages",
+                "<font face='Courier' size='9'>/var/log/latest.log</font> - Most recent log entries",
+                "<font face='Courier' size='9'>/var/log/dhcpd.log</font> - DHCP server activity",
+                "<font face='Courier' size='9'>/var/log/suricata.log</font> - IDS/IPS messages",
+                "<font face='Courier' size='9'>/var/log/openvpn*.log</font> - OpenVPN connection logs",
+                "<font face='Courier' size='9'>/tmp/rules.debug</font> - Active pf ruleset",
+            ],
+            marker="",
+        ),
+        Spacer(15),
+        Callout(
+            "For persistent issues, enable debug logging under System → Settings → "
+            "Logging. Remember to disable after troubleshooting to avoid filling disk "
+            "space.",
+            "tip",
+        ),
+        Spacer(15),
+        Callout(
+            "Always check /tmp/rules.debug to see the actual pf ruleset loaded. This "
+            "file shows the complete firewall configuration as interpreted by the system.",
+            "tip",
+        ),
+    ],
+)
+
+
+# ============================================================================
+# CHAPTER 13: OPNSENSE MCP SERVER (AI/LLM INTEGRATION)
+# ============================================================================
+
+CHAPTER_13 = Chapter(
+    key="13",
+    title="OPNsense MCP Server",
+    toc_title="OPNsense MCP Server (AI/LLM)",
+    summary="Programmatic access for AI agents",
+    blocks=[
+        Callout(
+            "THIS CHAPTER IS FOR AI/LLM AGENTS. The OPNsense MCP Server provides "
+            "programmatic access to firewall management via Model Context Protocol. Use "
+            "these tools instead of SSH/CLI when available.",
+            "note",
+        ),
+        Spacer(15),
+        Paragraph(
+            "The opnsense-mcp-server (by vespo92) provides MCP tools for managing "
+            "OPNsense firewalls from AI agents like Claude. It supports both API and SSH "
+            "access methods, enabling firewall rule management, VLAN configuration, NAT "
+            "rules, and diagnostics."
+        ),
+        Spacer(15),
+        Heading("Available MCP Tool Categories"),
+        Table(
+            id="mcp_categories",
+            rows=[
+                ["Category", "Prefix", "Purpose"],
+                [
+                    "Connection",
+                    "opnsense_configure, _test_connection",
+                    "Setup and verify API access",
+                ],
+                [
+                    "VLANs",
+                    "opnsense_list_vlans, _get_vlan, _create_vlan",
+                    "VLAN management",
+                ],
+                [
+                    "Firewall Rules",
+                    "opnsense_list_firewall_rules, _create_*, _delete_*",
+                    "Rule CRUD operations",
+                ],
+                [
+                    "NAT",
+                    "opnsense_nat_list_*, _create_*, _fix_dmz",
+                    "NAT rule management",
+                ],
+                [
+                    "Interfaces",
+                    "opnsense_get_interfaces, _interface_*",
+                    "Interface config",
+                ],
+                [
+                    "DHCP/ARP",
+                    "opnsense_list_dhcp_leases, _list_arp_*",
+                    "Network discovery",
+                ],
+                [
+                    "DNS Blocking",
+                    "opnsense_block_domain, _unblock_*",
+                    "DNS blocklist management",
+                ],
+                ["HAProxy", "opnsense_haproxy_*", "Load balancer/reverse proxy"],
+                ["SSH Commands", "opnsense_ssh_execute, _ssh_*", "Direct CLI access"],
+                [
+                    "Routing",
+                    "opnsense_routing_diagnostics, _fix_*",
+                    "Inter-VLAN routing",
+                ],
+                [
+                    "Backups",
+                    "opnsense_create_backup, _list_backups",
+                    "Config backup/restore",
+                ],
+                [
+                    "Macros/IaC",
+                    "opnsense_macro_*, _iac_*",
+                    "Automation and infrastructure-as-code",
+                ],
+            ],
+            col_widths=[100, 180, 160],
+        ),
+        Spacer(20),
+        Heading("Core Tools Reference"),
+        Heading("Connection & Discovery", level=2),
+        Table(
+            id="conn_tools",
+            rows=[
+                ["Tool", "Parameters", "Returns"],
+                ["opnsense_test_connection", "(none)", "API connectivity status"],
+                ["opnsense_get_interfaces", "(none)", "All interfaces with status"],
+                ["opnsense_list_vlans", "(none)", "VLAN tag, interface, description"],
+                [
+                    "opnsense_list_dhcp_leases",
+                    "interface (optional)",
+                    "IP, MAC, hostname, lease time",
+                ],
+                ["opnsense_list_arp_entries", "(none)", "Full ARP table"],
+            ],
+            col_widths=[140, 120, 180],
+        ),
+        Spacer(15),
+        Heading("Firewall Rules", level=2),
+        Table(
+            id="fw_tools",
+            rows=[
+                ["Tool", "Key Parameters", "Notes"],
+                ["opnsense_list_firewall_rules", "(none)", "All rules with UUIDs"],
+                ["opnsense_get_firewall_rule", "uuid", "Single rule details"],
+                [
+                    "opnsense_create_firewall_rule",
+                    "action, interface, direction, protocol, source, destination",
+                    "Create new rule",
+                ],
+                [
+                    "opnsense_create_firewall_preset",
+                    "preset, interface",
+                    "Presets: allow-web, allow-ssh, block-all",
+                ],
+                [
+                    "opnsense_update_firewall_rule",
+                    "uuid, + fields to update",
+                    "Modify existing rule",
+                ],
+                ["opnsense_delete_firewall_rule", "uuid", "Remove rule"],
+                ["opnsense_toggle_firewall_rule", "uuid", "Enable/disable rule"],
+                [
+                    "opnsense_find_firewall_rules",
+                    "description",
+                    "Search by description",
+                ],
+            ],
+            col_widths=[150, 180, 110],
+        ),
+        Spacer(15),
+        Heading("NAT Management", level=2),
+        Table(
+            id="nat_tools",
+            rows=[
+                ["Tool", "Purpose"],
+                ["opnsense_nat_list_outbound", "List outbound NAT rules"],
+                ["opnsense_nat_list_port_forwards", "List port forward rules"],
+                ["opnsense_nat_get_mode", "Get NAT mode (auto/hybrid/manual)"],
+                ["opnsense_nat_set_mode", "Set NAT mode"],
+                ["opnsense_nat_create_outbound_rule", "Create outbound NAT rule"],
+                ["opnsense_nat_create_port_forward", "Create port forward"],
+                ["opnsense_nat_fix_dmz", "Add no-NAT rules for inter-VLAN"],
+                ["opnsense_nat_quick_fix_dmz", "Quick DMZ NAT fix"],
+                ["opnsense_nat_analyze_config", "Analyze NAT for issues"],
+            ],
+            col_widths=[180, 260],
+        ),
+        PageBreak(),
+        Heading("SSH/CLI Tools"),
+        Paragraph(
+            "When API tools are insufficient, use SSH tools for direct CLI access:"
+        ),
+        Table(
+            id="ssh_tools",
+            rows=[
+                ["Tool", "Purpose", "Example Use"],
+                ["opnsense_ssh_execute", "Run any command", "pfctl -sr, netstat -rn"],
+                [
+                    "opnsense_ssh_show_pf_rules",
+                    "Show packet filter rules",
+                    "Verify loaded ruleset",
+                ],
+                [
+                    "opnsense_ssh_show_routing",
+                    "Display routing table",
+                    "Check route paths",
+                ],
+                [
+                    "opnsense_ssh_reload_firewall",
+                    "Reload pf rules",
+                    "Apply config changes",
+                ],
+                [
+                    "opnsense_ssh_fix_dmz_routing",
+                    "Fix DMZ routing issues",
+                    "Inter-VLAN problems",
+                ],
+                [
+                    "opnsense_ssh_check_nfs_connectivity",
+                    "Test NFS from OPNsense",
+                    "Verify NFS access",
+                ],
+                ["opnsense_ssh_system_status", "Full system status", "Health check"],
+                [
+                    "opnsense_ssh_batch_execute",
+                    "Run multiple commands",
+                    "Complex diagnostics",
+                ],
+            ],
+            col_widths=[180, 120, 140],
+        ),
+        Spacer(20),
+        Heading("Common MCP Workflows"),
+        Heading("OPSEC Audit Workflow", level=2),
+        BulletList(
+            [
+                "1. opnsense_get_interfaces → Verify VPN tunnel (wg0) is UP",
+                "2. opnsense_nat_list_outbound → Confirm no WAN NAT for secure VLAN",
+                "3. opnsense_list_firewall_rules → Check VLAN isolation rules exist",
+                "4. opnsense_ssh_execute('pfctl -sr | grep vlan50') → Verify PF rules loaded",
+                "5. opnsense_ssh_execute('netstat -rn') → Check routing table",
+            ],
+        ),
+        Spacer(15),
+        Heading("Troubleshooting Connectivity", level=2),
+        BulletList(
+            [
+                "1. opnsense_list_arp_entries → Check if device is seen on network",
+                "2. opnsense_find_device_by_name('hostname') → Find device IP/MAC",
+                "3. opnsense_list_firewall_rules → Check for blocking rules",
+                "4. opnsense_ssh_execute('pfctl -ss | grep <ip>') → Check state table",
+                "5. opnsense_routing_diagnostics → Run inter-VLAN diagnostics",
+            ],
+        ),
+        Spacer(15),
+        Heading("Create Firewall Rule", level=2),
+        BulletList(
+            [
+                "1. opnsense_list_vlans → Get interface names",
+                "2. opnsense_create_firewall_rule(",
+                "action='pass',",
+                "interface='opt2', # DMZ interface",
+                "direction='in',",
+                "protocol='tcp',",
+                "source='172.16.10.0/24',",
+                "destination='192.168.1.50',",
+                "destinationPort='2049',",
+                "description='DMZ to NFS'",
+                ")",
+                "3. opnsense_ssh_reload_firewall → Apply changes",
+            ],
+            marker="",
+        ),
+        Spacer(15),
+        Heading("Initial Setup (Fresh Install)", level=2),
+        BulletList(
+            [
+                "1. opnsense_test_connection → Verify API access",
+                "2. opnsense_get_interfaces → Identify WAN/LAN interfaces",
+                "3. opnsense_list_firewall_rules → Review default rules",
+                "4. opnsense_create_backup → Backup before changes",
+            ],
+        ),
+        Spacer(15),
+        Heading("Create a VLAN Network", level=2),
+        BulletList(
+            [
+                "1. opnsense_create_vlan(",
+                "interface='igc3', # physical interface",
+                "tag='10', # VLAN ID",
+                "description='Guest Network'",
+                ")",
+                "2. Assign the interface in the web UI (API limitation):",
+                "Interfaces → Assignments → Add VLAN",
+                "3. opnsense_create_firewall_rule(",
+                "interface='opt1', # the new VLAN interface",
+                "action='block',",
+                "source='opt1 net',",
+                "destination='lan net',",
+                "description='Block Guest to LAN'",
+                ")",
+                "4. opnsense_create_firewall_rule(",
+                "interface='opt1',",
+                "action='pass',",
+                "source='opt1 net',",
+                "destination='any',",
+                "description='Allow Guest to Internet'",
+                ")",
+            ],
+            marker="",
+        ),
+        Callout(
+            "The block rule must come BEFORE the allow rule: the first matching rule "
+            "wins.",
+            "warning",
+        ),
+        Spacer(15),
+        Heading("Port Forward (Expose Internal Service)", level=2),
+        BulletList(
+            [
+                "1. opnsense_nat_create_port_forward(",
+                "interface='wan',",
+                "protocol='tcp',",
+                "destination_port='443',",
+                "target='192.168.1.50',",
+                "local_port='443',",
+                "description='HTTPS to webserver'",
+                ")",
+                "2. opnsense_nat_apply_changes",
+                "3. opnsense_list_firewall_rules → Verify the auto-created rule",
+            ],
+            marker="",
+        ),
+        Spacer(15),
+        Heading("Site-to-Site VPN (WireGuard)", level=2),
+        BulletList(
+            [
+                "1. Create the WireGuard instance in the web UI (key generation):",
+                "VPN → WireGuard → Instances",
+                "2. Add the peer configuration: VPN → WireGuard → Peers",
+                "3. opnsense_create_firewall_rule(",
+                "interface='wg0',",
+                "action='pass',",
+                "source='wg0 net',",
+                "destination='lan net',",
+                "description='Allow WireGuard to LAN'",
+                ")",
+                "4. Add a static route if needed: System → Routes → Configuration",
+            ],
+            marker="",
+        ),
+        Spacer(15),
+        Heading("Block Ads/Malware (DNS Blocklist)", level=2),
+        BulletList(
+            [
+                "opnsense_block_domain(domain='ads.example.com')",
+                "or a whole category:",
+                "opnsense_apply_blocklist_category(category='ads')",
+                "# categories: ads, malware, adult, social",
+            ],
+            marker="",
+        ),
+        Spacer(15),
+        Heading("Quick Diagnostics", level=2),
+        Paragraph("When something does not work, check in this order:"),
+        BulletList(
+            [
+                "1. opnsense_ssh_execute('pfctl -sr | grep &lt;interface&gt;') → Are the "
+                "rules actually loaded?",
+                "2. opnsense_ssh_execute('pfctl -ss | grep &lt;ip&gt;') → Is there a state "
+                "entry?",
+                "3. opnsense_ssh_execute('tcpdump -i &lt;interface&gt; host &lt;ip&gt;') → Is "
+                "traffic reaching the firewall?",
+                "4. opnsense_list_firewall_rules → Check rule order and enabled status",
+                "5. opnsense_ssh_execute('netstat -rn') → Is the routing correct?",
+            ],
+        ),
+        Spacer(20),
+        Heading("HAProxy Tools (Reverse Proxy)"),
+        Table(
+            id="haproxy_tools",
+            rows=[
+                ["Tool", "Purpose"],
+                [
+                    "opnsense_haproxy_service_control",
+                    "start/stop/restart/reload/status",
+                ],
+                ["opnsense_haproxy_backend_list", "List all backends"],
+                ["opnsense_haproxy_backend_create", "Create backend with servers"],
+                ["opnsense_haproxy_frontend_list", "List all frontends"],
+                ["opnsense_haproxy_frontend_create", "Create frontend (listener)"],
+                ["opnsense_haproxy_acl_create", "Create ACL for routing"],
+                ["opnsense_haproxy_action_create", "Create routing action"],
+                ["opnsense_haproxy_certificate_list", "List SSL certificates"],
+                ["opnsense_haproxy_stats", "Get HAProxy statistics"],
+            ],
+            col_widths=[180, 260],
+        ),
+        Spacer(15),
+        Callout(
+            "The MCP server is actively being extended. Check for new tools "
+            "periodically. Current repo: github.com/vespo92/opnsense-mcp-server (being "
+            "forked/enhanced).",
+            "info",
+        ),
+        PageBreak(),
+        Heading("Complete MCP Tool Reference"),
+        Paragraph(
+            "The following tables document ALL available MCP tools organized by "
+            "category. Use this as the authoritative reference for tool selection. "
+            "They are generated from the MCP server's own tool definitions, so they "
+            "always list exactly what the server offers. Parameters marked ? are "
+            "optional; [] marks a list."
+        ),
+        Spacer(15),
+        *tool_reference_blocks(),
+        Spacer(20),
+        Heading("Tool Selection Guidelines"),
+        Table(
+            id="selection_guide",
+            rows=[
+                ["Task", "Preferred Tool", "Avoid"],
+                ["List rules", "opnsense_list_firewall_rules", "SSH + pfctl"],
+                ["Check interface status", "opnsense_get_interfaces", "SSH + ifconfig"],
+                ["Find device by name", "opnsense_find_device_by_name", "SSH + grep"],
+                [
+                    "View raw pf rules",
+                    "opnsense_ssh_show_pf_rules",
+                    "Reading /tmp/rules.debug",
+                ],
+                [
+                    "Complex diagnostics",
+                    "opnsense_routing_diagnostics",
+                    "Manual SSH commands",
+                ],
+                ["Bulk operations", "opnsense_ssh_batch_execute", "Multiple SSH calls"],
+                ["Create rule", "opnsense_create_firewall_rule", "SSH + config edit"],
+            ],
+            col_widths=[130, 180, 130],
+        ),
+        Spacer(15),
+        Paragraph(
+            "<b>General Principle:</b> Use MCP API tools when available. Fall back to "
+            "SSH tools only for operations not covered by API tools or when you need raw "
+            "CLI output."
+        ),
+        Spacer(15),
+        Heading("Agent Guidelines"),
+        Heading("Common Mistakes", level=2),
+        BulletList(
+            [
+                "1. <b>Rule order wrong</b> - Block rules must come BEFORE allow rules",
+                "2. <b>Forgetting NAT</b> - Port forwards need corresponding firewall rules",
+                "3. <b>Interface confusion</b> - Rules apply to traffic ENTERING the interface",
+                "4. <b>VLAN not assigned</b> - Creating a VLAN doesn't assign it to an interface",
+                "5. <b>DNS not set</b> - Clients need a DNS server (usually the firewall IP)",
+                "6. <b>Gateway not set</b> - DHCP clients need a gateway (firewall IP on that "
+                "subnet)",
+            ]
+        ),
+        Heading("Security Best Practices", level=2),
+        BulletList(
+            [
+                "1. <b>Change the default password immediately</b>",
+                "2. <b>Disable SSH unless needed</b> - Use the API instead",
+                "3. <b>Enable HTTPS redirect</b> - System → Settings → Administration",
+                "4. <b>Create backups before changes</b> - opnsense_create_backup",
+                "5. <b>Use aliases for IP groups</b> - Easier rule management",
+                "6. <b>Log denied traffic</b> - Enable logging on block rules",
+                "7. <b>Keep firmware updated</b> - System → Firmware",
+            ]
+        ),
+        Heading("API Limitations (Require the Web UI)", level=2),
+        Paragraph(
+            "Some operations cannot be done through the API alone. For these, guide the "
+            "user to the specific UI location:"
+        ),
+        BulletList(
+            [
+                "Initial interface assignment",
+                "WireGuard key generation",
+                "Certificate creation/import",
+                "Some plugin configurations",
+                "System updates/firmware",
+            ]
+        ),
+    ],
+)
+
+
+# ============================================================================
+# CHAPTER 14: VLAN CONFIGURATION (NEW)
+# ============================================================================
+
+CHAPTER_14 = Chapter(
+    key="14",
+    title="VLAN Configuration",
+    summary="Creating VLANs, interface assignment, inter-VLAN routing",
+    blocks=[
+        Paragraph(
+            "VLANs (Virtual LANs) segment a physical network into isolated broadcast "
+            "domains. OPNsense supports 802.1Q VLAN tagging, allowing a single physical "
+            "interface to carry traffic for multiple logical networks. This is essential "
+            "for network segmentation, security zones, and efficient use of hardware."
+        ),
+        Spacer(15),
+        Heading("VLAN Concepts"),
+        Table(
+            id="vlan_concepts",
+            rows=[
+                ["Term", "Description"],
+                ["VLAN Tag", "Numeric ID (1-4094) added to Ethernet frames"],
+                ["Trunk Port", "Switch port carrying multiple VLANs (tagged)"],
+                ["Access Port", "Switch port for single VLAN (untagged)"],
+                ["Native VLAN", "Untagged VLAN on a trunk port"],
+                ["Parent Interface", "Physical NIC that carries VLAN traffic"],
+                ["VLAN Interface", "Virtual interface for specific VLAN tag"],
+            ],
+            col_widths=[110, 330],
+        ),
+        Spacer(15),
+        Callout(
+            "VLANs require a managed switch configured with matching VLAN tags. "
+            "Unmanaged switches cannot process VLAN tags and will drop tagged traffic.",
+            "warning",
+        ),
+        Spacer(20),
+        Heading("Creating VLANs in OPNsense"),
+        BulletList(
+            [
+                "1. Interfaces → Other Types → VLAN → Add",
+                "2. Select Parent Interface (physical NIC connected to trunk port)",
+                "3. Set VLAN Tag (must match switch configuration)",
+                "4. Set VLAN Priority (0-7, optional QoS)",
+                "5. Add Description (e.g., 'DMZ', 'Guest', 'IoT')",
+                "6. Save and Apply",
+                "7. Interfaces → Assignments → Assign the new VLAN",
+                "8. Configure the assigned interface (IP, DHCP, etc.)",
+                "9. Enable the interface",
+                "10. Add firewall rules for the new VLAN interface",
+            ],
+        ),
+        Spacer(20),
+        Heading("VLAN Configuration Fields", level=2),
+        Table(
+            id="vlan_fields",
+            rows=[
+                ["Field", "Value", "Notes"],
+                ["Parent", "igc0, em0, etc.", "Physical interface to trunk port"],
+                ["VLAN Tag", "1-4094", "Must match switch VLAN ID"],
+                ["VLAN Priority", "0-7", "802.1p QoS (0=best effort, 7=highest)"],
+                ["Description", "Text", "Identifies VLAN in UI"],
+            ],
+            col_widths=[100, 100, 240],
+        ),
+        Spacer(20),
+        Heading("Common VLAN Topologies"),
+        Table(
+            id="vlan_topologies",
+            rows=[
+                ["VLAN", "Tag", "Subnet", "Purpose", "Internet Access"],
+                ["LAN", "Native", "192.168.1.0/24", "Trusted devices", "Full + local"],
+                [
+                    "DMZ",
+                    "10",
+                    "172.16.10.0/24",
+                    "Servers/services",
+                    "Full, limited local",
+                ],
+                ["Guest", "20", "192.168.20.0/24", "Visitors", "Internet only"],
+                ["IoT", "30", "192.168.30.0/24", "Smart devices", "Internet only"],
+                ["Management", "99", "192.168.99.0/24", "Network gear", "No internet"],
+                ["Lab", "50", "192.168.50.0/24", "Testing/dev", "Isolated or VPN"],
+            ],
+            col_widths=[70, 45, 100, 95, 130],
+        ),
+        Spacer(15),
+        Topology(
+            title="VLANs on a Single Trunk",
+            nodes=[
+                ["internet", "Internet", "internet"],
+                ["opnsense", "OPNsense", "firewall"],
+                ["switch", "Managed Switch", "host"],
+                ["lan", "LAN", "network", "Native"],
+                ["dmz", "DMZ", "vlan", "Tag 10"],
+                ["guest", "Guest", "vlan", "Tag 20"],
+                ["iot", "IoT", "vlan", "Tag 30"],
+                ["lab", "Lab", "vlan", "Tag 50"],
+                ["mgmt", "Management", "vlan", "Tag 99"],
+            ],
+            links=[
+                ["internet", "opnsense", "WAN"],
+                ["opnsense", "switch", "igc1 (trunk)", "trunk"],
+                ["switch", "lan"],
+                ["switch", "dmz"],
+                ["switch", "guest"],
+                ["switch", "iot"],
+                ["switch", "lab"],
+                ["switch", "mgmt"],
+            ],
+        ),
+        Spacer(20),
+        Heading("Inter-VLAN Routing"),
+        Paragraph(
+            "By default, VLANs cannot communicate with each other. OPNsense acts as the "
+            "router between VLANs. To allow inter-VLAN traffic, create firewall rules on "
+            "each VLAN interface permitting traffic to other VLAN subnets."
+        ),
+        Spacer(10),
+        Heading("Inter-VLAN Rule Example (DMZ → LAN NFS)", level=2),
+        Table(
+            id="intervlan_rule",
+            rows=[
+                ["Field", "Value"],
+                ["Interface", "DMZ (opt2 or vlan10)"],
+                ["Direction", "In"],
+                ["Action", "Pass"],
+                ["Protocol", "TCP"],
+                ["Source", "DMZ net (172.16.10.0/24)"],
+                ["Destination", "192.168.1.50 (file server)"],
+                ["Destination Port", "2049 (NFS)"],
+                ["Description", "DMZ to LAN NFS access"],
+            ],
+            col_widths=[120, 320],
+        ),
+        Spacer(15),
+        Callout(
+            "For security, create specific allow rules rather than broad 'allow all' "
+            "between VLANs. Block RFC1918 by default, then add exceptions for required "
+            "services.",
+            "tip",
+        ),
+        Spacer(20),
+        Heading("VLAN Isolation Patterns", level=2),
+        Table(
+            id="isolation_patterns",
+            rows=[
+                ["Pattern", "Rule Strategy", "Use Case"],
+                ["Full Isolation", "Block RFC1918, allow internet", "Guest, IoT"],
+                ["Server Access", "Allow specific ports to LAN servers", "DMZ"],
+                ["Management", "Allow from admin VLAN only", "Network gear"],
+                ["VPN Only", "Block WAN, allow VPN gateway", "C2, pentest"],
+            ],
+            col_widths=[100, 180, 160],
+        ),
+        Spacer(20),
+        Heading("Switch Configuration (Example: UniFi)"),
+        Paragraph(
+            "The switch must be configured to trunk VLANs to OPNsense. Example UniFi "
+            "port config:"
+        ),
+        Spacer(10),
+        Table(
+            id="switch_config",
+            rows=[
+                ["Port", "Profile", "Native VLAN", "Tagged VLANs", "Connected To"],
+                ["1", "Trunk", "1 (LAN)", "6,10,40,50", "OPNsense"],
+                ["2", "Access", "40 (IoT)", "-", "IoT device"],
+                ["3", "Access", "10 (Guest)", "-", "WiFi AP"],
+                ["4", "Access", "50 (C2)", "-", "C2 server"],
+            ],
+            col_widths=[40, 60, 80, 90, 100],
+        ),
+        Spacer(15),
+        Heading("VLAN Troubleshooting", level=2),
+        BulletList(
+            [
+                "<b>No connectivity</b>: Check switch VLAN config matches OPNsense tags",
+                "<b>Can ping gateway but not internet</b>: Check outbound NAT includes VLAN subnet",
+                "<b>Inter-VLAN blocked</b>: Verify firewall rules on SOURCE interface",
+                "<b>DHCP not working</b>: Enable DHCP server on VLAN interface",
+                "<b>Asymmetric routing</b>: Ensure devices use OPNsense as gateway, not switch",
+            ],
+        ),
+        Spacer(15),
+        Heading("VLAN Verification Commands", level=2),
+        BulletList(
+            [
+                "<font face='Courier' size='9'>ifconfig vlan10</font> - Check VLAN interface status",
+                "<font face='Courier' size='9'>netstat -rn | grep 172.16</font> - Verify route to VLAN subnet",
+                "<font face='Courier' size='9'>tcpdump -i igc0 -e vlan</font> - Capture tagged traffic on parent",
+                "<font face='Courier' size='9'>pfctl -sr | grep opt2</font> - Check firewall rules for VLAN interface",
+            ],
+            marker="",
+        ),
+    ],
+)
+
+
+# ============================================================================
+# CHAPTER 15: CERTIFICATES & PKI
+# ============================================================================
+
+CHAPTER_15 = Chapter(
+    key="15",
+    title="Certificates & PKI",
+    summary="CA management, server/client certs, ACME/Let's Encrypt",
+    blocks=[
+        Callout(
+            "Certificates enable encrypted communications (HTTPS, VPN) and "
+            "authentication. OPNsense includes a full Certificate Authority (CA) for "
+            "generating and managing X.509 certificates without external tools.",
+            "note",
+        ),
+        Spacer(15),
+        Heading("Certificate Types Overview"),
+        Table(
+            id="cert_types",
+            rows=[
+                ["Type", "Purpose", "Location"],
+                [
+                    "Certificate Authority (CA)",
+                    "Signs other certificates, establishes trust chain",
+                    "System → Trust → Authorities",
+                ],
+                [
+                    "Server Certificate",
+                    "Authenticates server (HTTPS, VPN server)",
+                    "System → Trust → Certificates",
+                ],
+                [
+                    "Client Certificate",
+                    "Authenticates user/device to server",
+                    "System → Trust → Certificates",
+                ],
+                [
+                    "Intermediate CA",
+                    "Sub-CA signed by root CA",
+                    "System → Trust → Authorities",
+                ],
+                [
+                    "ACME/Let's Encrypt",
+                    "Free public TLS certificates",
+                    "Services → ACME → Certificates",
+                ],
+                [
+                    "CSR (Signing Request)",
+                    "Request external CA to sign",
+                    "System → Trust → Certificates",
+                ],
+            ],
+            col_widths=[120, 200, 120],
+        ),
+        Spacer(15),
+        Heading("Creating a Certificate Authority"),
+        Paragraph(
+            "A local CA allows you to sign your own server and client certificates. "
+            "Required for OpenVPN, IPsec with certificates, and internal HTTPS services."
+        ),
+        Spacer(10),
+        BulletList(
+            [
+                "1. Navigate to System → Trust → Authorities",
+                "2. Click + Add",
+                "3. Method: Create an internal Certificate Authority",
+                "4. Descriptive name: e.g., 'OPNsense-CA'",
+                "5. Key type: RSA (2048/4096) or ECDSA (prime256v1/secp384r1)",
+                "6. Digest Algorithm: SHA256 or SHA384",
+                "7. Lifetime: 3650 days (10 years) for CA",
+                "8. Common Name: e.g., 'OPNsense Internal CA'",
+                "9. Fill Country, State, City, Organization (optional but recommended)",
+                "10. Save",
+            ],
+        ),
+        Spacer(15),
+        Callout(
+            "KEY TYPE SELECTION: ECDSA (prime256v1) offers faster operations and smaller "
+            "keys with equivalent security to RSA-3072. Use ECDSA for new deployments "
+            "unless compatibility with legacy systems requires RSA.",
+            "tip",
+        ),
+        Spacer(15),
+        Heading("CA Configuration Options", level=2),
+        Table(
+            id="ca_options",
+            rows=[
+                ["Option", "Recommended", "Description"],
+                ["Key Type", "ECDSA prime256v1", "Fastest, modern security"],
+                ["Key Type (legacy)", "RSA 4096", "Maximum compatibility"],
+                ["Digest", "SHA256", "Standard, widely supported"],
+                ["Digest (high security)", "SHA384", "For sensitive environments"],
+                ["Lifetime (CA)", "3650 days", "10 years for root CA"],
+                ["Lifetime (server)", "397 days", "Max for browser trust"],
+                ["Lifetime (client)", "365 days", "Annual renewal recommended"],
+            ],
+            col_widths=[120, 100, 220],
+        ),
+        Spacer(15),
+        Heading("Creating Server Certificates"),
+        Paragraph(
+            "Server certificates authenticate OPNsense services (WebUI, OpenVPN server, "
+            "HAProxy)."
+        ),
+        Spacer(10),
+        BulletList(
+            [
+                "1. Navigate to System → Trust → Certificates",
+                "2. Click + Add",
+                "3. Method: Create an internal Certificate",
+                "4. Descriptive name: e.g., 'opnsense-webui' or 'vpn-server'",
+                "5. Certificate Authority: Select your CA",
+                "6. Type: Server Certificate",
+                "7. Key type: Match CA (ECDSA or RSA)",
+                "8. Digest: SHA256",
+                "9. Lifetime: 397 days (browser max) or 365 days",
+                "10. Common Name: FQDN or IP (e.g., 'fw.example.com')",
+                "11. Alternative Names: Add DNS/IP SANs for all access methods",
+                "12. Save",
+            ],
+        ),
+        Spacer(15),
+        Callout(
+            "SUBJECT ALTERNATIVE NAMES (SANs): Modern browsers require SANs for "
+            "certificate validation. Add all hostnames and IPs used to access the "
+            "service: DNS:fw.example.com, DNS:opnsense.local, IP:192.168.1.1",
+            "warning",
+        ),
+        Spacer(15),
+        Heading("Creating Client Certificates", level=2),
+        Paragraph(
+            "Client certificates authenticate users/devices to VPN or other services."
+        ),
+        Spacer(10),
+        BulletList(
+            [
+                "1. System → Trust → Certificates → Add",
+                "2. Method: Create an internal Certificate",
+                "3. Type: Client Certificate",
+                "4. Certificate Authority: Select your CA",
+                "5. Common Name: User identifier (e.g., 'john.doe@example.com')",
+                "6. Lifetime: 365 days (enforce annual renewal)",
+                "7. Save",
+                "8. Export: Download .p12 (PKCS#12) bundle for client import",
+            ],
+        ),
+        Spacer(15),
+        Heading("ACME / Let's Encrypt Integration"),
+        Paragraph(
+            "The ACME plugin (os-acme-client) automates free TLS certificate issuance "
+            "from Let's Encrypt or other ACME providers. Certificates auto-renew before "
+            "expiration."
+        ),
+        Spacer(10),
+        Heading("Plugin Installation", level=2),
+        BulletList(
+            [
+                "1. System → Firmware → Plugins",
+                "2. Search 'os-acme-client'",
+                "3. Click + to install",
+                "4. After install, find at Services → ACME Certificates",
+            ],
+        ),
+        Spacer(10),
+        Heading("ACME Configuration Steps", level=2),
+        BulletList(
+            [
+                "1. Services → ACME → Settings: Enable plugin",
+                "2. Services → ACME → Accounts: Add Let's Encrypt account (email required)",
+                "3. Services → ACME → Challenge Types: Configure DNS or HTTP challenge",
+                "4. Services → ACME → Certificates: Add certificate with domain(s)",
+                "5. Services → ACME → Automations: Link to services (HAProxy, WebUI)",
+            ],
+        ),
+        Spacer(15),
+        Heading("ACME Challenge Types", level=2),
+        Table(
+            id="challenge_types",
+            rows=[
+                ["Challenge", "Requirements", "Best For"],
+                [
+                    "HTTP-01",
+                    "Port 80 open to internet, web server",
+                    "Simple setups, HAProxy",
+                ],
+                [
+                    "DNS-01",
+                    "DNS API access (Cloudflare, Route53, etc.)",
+                    "Wildcards, no port 80",
+                ],
+                ["TLS-ALPN-01", "Port 443 open, ALPN support", "When port 80 blocked"],
+            ],
+            col_widths=[90, 180, 170],
+        ),
+        Spacer(15),
+        Callout(
+            "DNS-01 CHALLENGE: Required for wildcard certificates (*.example.com). "
+            "Supported DNS providers include Cloudflare, DigitalOcean, AWS Route53, "
+            "Azure DNS, Google Cloud DNS, and many others.",
+            "tip",
+        ),
+        Spacer(15),
+        Heading("Certificate Usage in Services"),
+        Table(
+            id="cert_usage",
+            rows=[
+                ["Service", "Certificate Setting Location", "Certificate Type"],
+                [
+                    "Web GUI",
+                    "System → Settings → Administration → SSL Certificate",
+                    "Server (internal or ACME)",
+                ],
+                [
+                    "OpenVPN Server",
+                    "VPN → OpenVPN → Servers → Server Certificate",
+                    "Server + CA",
+                ],
+                [
+                    "OpenVPN Client Auth",
+                    "VPN → OpenVPN → Servers → Client Certificate",
+                    "Client + CA",
+                ],
+                [
+                    "IPsec",
+                    "VPN → IPsec → Tunnel Settings → My Certificate",
+                    "Server + CA",
+                ],
+                [
+                    "HAProxy Frontend",
+                    "Services → HAProxy → Real Servers → SSL options",
+                    "Server (ACME recommended)",
+                ],
+                [
+                    "Captive Portal",
+                    "Services → Captive Portal → Zone → Certificate",
+                    "Server",
+                ],
+                [
+                    "FreeRADIUS",
+                    "Services → FreeRADIUS → EAP → Certificate",
+                    "Server + CA",
+                ],
+            ],
+            col_widths=[100, 220, 120],
+        ),
+        Spacer(15),
+        Heading("Certificate Renewal & Management"),
+        Table(
+            id="renewal_info",
+            rows=[
+                ["Certificate Type", "Renewal Method", "Notes"],
+                [
+                    "Internal CA",
+                    "Manual before expiry",
+                    "Re-sign all child certs when CA expires",
+                ],
+                [
+                    "Internal Server/Client",
+                    "Manual or script",
+                    "System → Trust → Certificates → Reissue",
+                ],
+                [
+                    "ACME (Let's Encrypt)",
+                    "Automatic (cron)",
+                    "Renews ~30 days before expiry",
+                ],
+                [
+                    "Imported External",
+                    "Manual replacement",
+                    "Upload new cert before expiry",
+                ],
+            ],
+            col_widths=[110, 130, 200],
+        ),
+        Spacer(15),
+        Callout(
+            "CERTIFICATE EXPIRY MONITORING: OPNsense Dashboard shows certificate "
+            "expiration. For ACME, check Services → ACME → Log for renewal status. "
+            "Consider external monitoring (Wazuh, Nagios) for critical certificates.",
+            "warning",
+        ),
+        Spacer(15),
+        Heading("Certificate Export & Import", level=2),
+        Table(
+            id="export_formats",
+            rows=[
+                ["Format", "Extension", "Use Case"],
+                ["PEM (Certificate)", ".crt, .pem", "Most services, OpenVPN, HAProxy"],
+                ["PEM (Private Key)", ".key", "Private key (keep secure!)"],
+                ["PKCS#12", ".p12, .pfx", "Windows, iOS, combined cert+key"],
+                ["DER", ".der, .cer", "Java keystores, some Windows apps"],
+                ["CA Bundle", ".crt", "Full chain for client verification"],
+            ],
+            col_widths=[110, 80, 250],
+        ),
+        Spacer(10),
+        BulletList(
+            [
+                "Export Certificate: System → Trust → Certificates → Click cert → Export (PEM or P12)",
+                "Export CA: System → Trust → Authorities → Click CA → Export",
+                "Import: System → Trust → Certificates → Add → Method: Import",
+                "P12 Password: Required when exporting PKCS#12, protects private key",
+            ],
+        ),
+        Spacer(15),
+        Heading("Certificate Revocation (CRL)", level=2),
+        Paragraph(
+            "Revoke compromised or decommissioned certificates to prevent unauthorized "
+            "access."
+        ),
+        Spacer(10),
+        BulletList(
+            [
+                "1. System → Trust → Revocation: Create CRL for your CA",
+                "2. Add revoked certificate serial numbers to CRL",
+                "3. Configure OpenVPN/services to check CRL",
+                "4. Distribute updated CRL to clients if needed",
+            ],
+        ),
+        Spacer(15),
+        Heading("MCP Tools for Certificate Management"),
+        Paragraph(
+            "The OPNsense MCP Server includes HAProxy certificate tools. For CA/Trust "
+            "management, use the REST API or SSH commands."
+        ),
+        Spacer(10),
+        Table(
+            id="cert_mcp_tools",
+            rows=[
+                ["Tool", "Purpose"],
+                [
+                    "opnsense_haproxy_certificate_list",
+                    "List available certificates for HAProxy",
+                ],
+                [
+                    "opnsense_haproxy_certificate_create",
+                    "Create/import certificate (selfsigned, import, acme)",
+                ],
+                ["opnsense_ssh_execute + configctl", "Trigger ACME renewal via SSH"],
+            ],
+            col_widths=[200, 240],
+        ),
+        Spacer(10),
+        Heading("Example: ACME Renewal via MCP SSH", level=2),
+        Paragraph(
+            "<font face='Courier' size='8'>opnsense_ssh_execute(command='configctl acme "
+            "renew')</font>"
+        ),
+        Spacer(15),
+        Heading("Certificate Quick Reference"),
+        Table(
+            id="cert_quick_ref",
+            rows=[
+                ["Task", "Location / Command"],
+                ["Create CA", "System → Trust → Authorities → Add"],
+                [
+                    "Create Server Cert",
+                    "System → Trust → Certificates → Add (Type: Server)",
+                ],
+                [
+                    "Create Client Cert",
+                    "System → Trust → Certificates → Add (Type: Client)",
+                ],
+                ["Install ACME Plugin", "System → Firmware → Plugins → os-acme-client"],
+                ["Configure ACME", "Services → ACME → Settings/Accounts/Certificates"],
+                [
+                    "Assign WebUI Cert",
+                    "System → Settings → Administration → SSL Certificate",
+                ],
+                ["Revoke Certificate", "System → Trust → Revocation → Add to CRL"],
+                ["Export P12", "System → Trust → Certificates → Export → PKCS#12"],
+                ["Check Expiry", "Dashboard widget or System → Trust → Certificates"],
+                ["Force ACME Renew", "configctl acme renew (via SSH)"],
+            ],
+            col_widths=[140, 300],
+        ),
+    ],
+)
+
+
+# ============================================================================
+# APPENDIX A: QUICK REFERENCE (LLM-OPTIMIZED)
+# ============================================================================
+
+APPENDIX_A = Chapter(
+    key="A",
+    title="Quick Reference",
+    summary="Commands, ports, and file locations",
+    blocks=[
+        Callout(
+            "STRUCTURED REFERENCE DATA for rapid LLM lookup. Use this section for quick "
+            "facts without reading full chapters.",
+            "note",
+        ),
+        Spacer(15),
+        Heading("Defaults & Credentials"),
+        Table(
+            id="defaults_data",
+            rows=[
+                ["Item", "Default", "Notes"],
+                ["Web UI URL", "https://192.168.1.1", "LAN IP, HTTPS required"],
+                ["Username", "root", "Create admin user, disable root"],
+                ["Password", "opnsense", "CHANGE IMMEDIATELY"],
+                ["SSH", "Disabled", "Enable at System → Settings → Administration"],
+                ["API", "Disabled", "Enable per-user at System → Access → Users"],
+            ],
+            col_widths=[100, 130, 210],
+        ),
+        Spacer(15),
+        Heading("Common Ports"),
+        Table(
+            id="ports_data",
+            rows=[
+                ["Service", "Port", "Protocol", "Notes"],
+                ["Web GUI", "443", "TCP/HTTPS", "Anti-lockout on LAN"],
+                ["SSH", "22", "TCP", "Disabled by default"],
+                ["DNS", "53", "TCP/UDP", "Unbound resolver"],
+                ["DHCP", "67-68", "UDP", "Server on 67, client on 68"],
+                ["IPsec IKE", "500", "UDP", "Key exchange"],
+                ["IPsec NAT-T", "4500", "UDP", "NAT traversal"],
+                ["OpenVPN", "1194", "UDP (or TCP)", "Configurable"],
+                ["WireGuard", "51820", "UDP", "Configurable"],
+                ["NTP", "123", "UDP", "Time sync"],
+                ["Syslog", "514", "UDP", "Remote logging"],
+                ["SNMP", "161", "UDP", "Monitoring"],
+            ],
+            col_widths=[85, 55, 75, 225],
+        ),
+        Spacer(15),
+        Heading("File Locations"),
+        Table(
+            id="files_data",
+            rows=[
+                ["Path", "Purpose", "Access"],
+                ["/conf/config.xml", "Master config (XML)", "READ ONLY - use API"],
+                ["/tmp/rules.debug", "Active pf ruleset", "pfctl -sr equivalent"],
+                ["/var/log/filter.log", "Firewall log", "tail -f for live view"],
+                ["/var/log/system.log", "System messages", "General diagnostics"],
+                ["/var/log/latest.log", "Recent entries", "Quick check"],
+                ["/var/log/suricata/", "IDS/IPS logs", "Alert analysis"],
+                ["/var/log/openvpn/", "VPN logs", "Connection issues"],
+                ["/usr/local/etc/", "Service configs", "Unbound, Suricata, etc."],
+            ],
+            col_widths=[140, 150, 150],
+        ),
+        Spacer(15),
+        Heading("Essential CLI Commands"),
+        Table(
+            id="cli_ref",
+            rows=[
+                ["Command", "Purpose"],
+                ["pfctl -sr", "Show firewall rules"],
+                ["pfctl -ss", "Show state table"],
+                ["pfctl -si", "Show statistics"],
+                ["pfctl -k <ip>", "Kill states for IP"],
+                ["pfctl -F states", "Flush ALL states (caution!)"],
+                ["netstat -rn", "Routing table"],
+                ["netstat -an", "All connections"],
+                ["sockstat -l", "Listening ports"],
+                ["configctl filter reload", "Reload firewall"],
+                ["configctl interface reconfigure", "Reconfigure interfaces"],
+                ["configctl webgui restart", "Restart web GUI"],
+                ["configctl service restart all", "Restart all services"],
+                ["opnsense-update -c", "Check for updates"],
+                ["opnsense-revert", "Revert to previous version"],
+            ],
+            col_widths=[200, 240],
+        ),
+        PageBreak(),
+        Heading("Interface Naming"),
+        Table(
+            id="intf_naming",
+            rows=[
+                ["Pattern", "Meaning", "Example"],
+                ["em0, em1", "Intel e1000 NICs", "em0 = WAN, em1 = LAN"],
+                ["igc0, igc1", "Intel I225/I226 2.5GbE", "Modern Intel NICs"],
+                ["igb0, igb1", "Intel I350/I210 GbE", "Server-class Intel"],
+                ["re0, re1", "Realtek NICs", "Consumer boards"],
+                ["ue0", "USB Ethernet", "RTL8153 adapter"],
+                ["vtnet0", "VirtIO (VM)", "Proxmox/KVM"],
+                ["vmx0", "VMware VMXNET3", "ESXi/VMware"],
+                ["vlanX", "VLAN interface", "vlan10 = VLAN 10"],
+                ["gif0", "GIF tunnel", "IPv6 tunneling"],
+                ["gre0", "GRE tunnel", "Generic encapsulation"],
+                ["wg0, wg1", "WireGuard", "VPN tunnel"],
+                ["ovpnc1", "OpenVPN client", "Client instance 1"],
+                ["ovpns1", "OpenVPN server", "Server instance 1"],
+                ["ipsec1000", "IPsec VTI", "Virtual tunnel interface"],
+            ],
+            col_widths=[90, 150, 200],
+        ),
+        Spacer(15),
+        Heading("Firewall Rule Quick Facts"),
+        Table(
+            id="rule_facts",
+            rows=[
+                ["Fact", "Value"],
+                ["Default action", "Block (implicit deny)"],
+                [
+                    "Rule direction",
+                    "Inbound to interface (where traffic enters firewall)",
+                ],
+                ["Quick flag", "Enabled by default (first match wins)"],
+                ["Floating priority", "Processed before interface rules"],
+                ["State tracking", "Enabled by default (stateful)"],
+                ["Log default", "Disabled (enable per-rule)"],
+                ["Anti-lockout", "Auto-created for LAN to GUI (443)"],
+                ["Bogon blocking", "Block RFC1918 on WAN by default"],
+            ],
+            col_widths=[120, 320],
+        ),
+        Spacer(15),
+        Heading("NAT Quick Facts"),
+        Table(
+            id="nat_facts",
+            rows=[
+                ["Fact", "Value"],
+                ["Processing order", "NAT rules before firewall rules"],
+                ["Default outbound", "Automatic mode (auto-generates rules)"],
+                ["Port forward", "Creates associated filter rule if enabled"],
+                ["1:1 NAT", "Bidirectional static mapping"],
+                ["NPTv6", "IPv6 prefix translation (not address)"],
+                ["Reflection", "Access internal services via external IP from LAN"],
+            ],
+            col_widths=[120, 320],
+        ),
+        Spacer(15),
+        Heading("VPN Quick Reference"),
+        Table(
+            id="vpn_ref",
+            rows=[
+                ["VPN Type", "Ports", "Key Config"],
+                [
+                    "IPsec IKEv2",
+                    "UDP 500, 4500",
+                    "Phase 1 + Phase 2 must match both sides",
+                ],
+                [
+                    "OpenVPN",
+                    "UDP 1194 (default)",
+                    "Cert + CA required, client export plugin",
+                ],
+                [
+                    "WireGuard",
+                    "UDP 51820 (default)",
+                    "Public key exchange, AllowedIPs = routing",
+                ],
+            ],
+            col_widths=[90, 110, 240],
+        ),
+        Spacer(20),
+        Heading("Troubleshooting Decision Tree"),
+        BulletList(
+            [
+                "Traffic blocked? → Check rule order, enable logging, verify states",
+                "No internet? → Check WAN status, gateway, outbound NAT mode",
+                "DNS failing? → Verify Unbound running, check forwarding/DoT",
+                "VPN down? → Match phase settings, check ports, review logs",
+                "Slow? → Check CPU, interface errors, traffic shaper",
+                "CARP split-brain? → Check VHID uniqueness, sync interface",
+                "Can't access GUI? → SSH in, check webconfigurator, anti-lockout",
+            ],
+        ),
+    ],
+)
+
+
+# ============================================================================
+# APPENDIX B: pf RULE SYNTAX REFERENCE
+# ============================================================================
+
+APPENDIX_B = Chapter(
+    key="B",
+    title="pf Rule Syntax Reference",
+    summary="Native packet filter syntax for /tmp/rules.debug",
+    blocks=[
+        Callout(
+            "This appendix explains native pf (packet filter) syntax for interpreting "
+            "/tmp/rules.debug and pfctl -sr output. Essential for debugging firewall "
+            "issues.",
+            "note",
+        ),
+        Spacer(15),
+        Heading("Basic Rule Structure"),
+        Paragraph(
+            "pf rules follow a specific syntax. Understanding this helps interpret the "
+            "actual loaded ruleset versus the GUI representation:"
+        ),
+        Spacer(10),
+        Paragraph(
+            "<font face='Courier' size='9'>action [direction] [log] [quick] on interface "
+            "[inet|inet6] proto protocol from source to destination [flags] "
+            "[state]</font>"
+        ),
+        Spacer(15),
+        Heading("Rule Keywords"),
+        Table(
+            id="pf_keywords",
+            rows=[
+                ["Keyword", "Values", "Description"],
+                ["pass", "-", "Allow traffic through"],
+                [
+                    "block",
+                    "drop, return, return-rst, return-icmp",
+                    "Deny traffic (default: drop)",
+                ],
+                ["match", "-", "Match for NAT/QoS without pass/block"],
+                ["in", "-", "Inbound traffic (entering interface)"],
+                ["out", "-", "Outbound traffic (leaving interface)"],
+                ["log", "-", "Log matching packets"],
+                ["quick", "-", "Stop processing on match (first match wins)"],
+                ["on", "interface name", "Apply to specific interface"],
+                ["inet", "-", "IPv4 traffic"],
+                ["inet6", "-", "IPv6 traffic"],
+                ["proto", "tcp, udp, icmp, etc.", "Layer 4 protocol"],
+                ["from", "address/mask", "Source address"],
+                ["to", "address/mask", "Destination address"],
+                ["port", "number or range", "TCP/UDP port"],
+                ["flags", "S/SA, etc.", "TCP flags to match"],
+                ["keep state", "-", "Track connection state"],
+            ],
+            col_widths=[80, 140, 220],
+        ),
+        Spacer(20),
+        Heading("Example Rules Explained"),
+        Heading("Allow LAN to Internet:", level=2),
+        Paragraph(
+            "<font face='Courier' size='9'>pass in quick on em1 inet from 192.168.1.0/24 "
+            "to any keep state</font>"
+        ),
+        Spacer(5),
+        Table(
+            id="pf_example1",
+            rows=[
+                ["Component", "Meaning"],
+                ["pass", "Allow traffic"],
+                ["in", "Traffic entering the firewall on this interface"],
+                ["quick", "Stop processing if matched"],
+                ["on em1", "LAN interface"],
+                ["inet", "IPv4 only"],
+                ["from 192.168.1.0/24", "Source: LAN subnet"],
+                ["to any", "Destination: anywhere"],
+                ["keep state", "Track connection, allow return traffic"],
+            ],
+            col_widths=[150, 290],
+        ),
+        Spacer(15),
+        Heading("Block with TCP RST:", level=2),
+        Paragraph(
+            "<font face='Courier' size='9'>block return-rst in quick on em1 inet proto "
+            "tcp from any to em1 port 22</font>"
+        ),
+        Spacer(5),
+        Table(
+            id="pf_example2",
+            rows=[
+                ["Component", "Meaning"],
+                ["block return-rst", "Block and send TCP RST to client"],
+                ["proto tcp", "TCP protocol only"],
+                ["to em1 port 22", "To interface's IP, SSH port"],
+            ],
+            col_widths=[150, 290],
+        ),
+        Spacer(15),
+        Heading("Port Forward (NAT + Filter):", level=2),
+        Paragraph(
+            "<font face='Courier' size='9'>rdr on em0 inet proto tcp from any to (em0) "
+            "port 443 -> 192.168.1.10 port 443</font>"
+        ),
+        Spacer(5),
+        Table(
+            id="pf_example3",
+            rows=[
+                ["Component", "Meaning"],
+                ["rdr", "Redirect (destination NAT)"],
+                ["on em0", "WAN interface"],
+                ["(em0)", "WAN interface's current IP"],
+                ["-> 192.168.1.10", "Redirect to internal server"],
+            ],
+            col_widths=[150, 290],
+        ),
+        Spacer(20),
+        Heading("Address Specifications"),
+        Table(
+            id="addr_specs",
+            rows=[
+                ["Syntax", "Meaning", "Example"],
+                ["any", "Any address", "from any"],
+                ["IP/mask", "CIDR notation", "192.168.1.0/24"],
+                ["(interface)", "Interface's current IP", "(em0)"],
+                ["<table>", "Address table/alias", "<lan_servers>"],
+                ["! address", "NOT this address", "from ! 10.0.0.1"],
+                ["self", "All firewall IPs", "to self"],
+                ["IP - IP", "Range (tables only)", "10.0.0.1 - 10.0.0.50"],
+            ],
+            col_widths=[100, 150, 190],
+        ),
+        Spacer(20),
+        Heading("Port Specifications"),
+        Table(
+            id="port_specs",
+            rows=[
+                ["Syntax", "Meaning", "Example"],
+                ["port 80", "Single port", "to any port 80"],
+                ["port 80:443", "Port range", "to any port 80:443"],
+                ["port { 80 443 }", "Port list", "port { 22 80 443 }"],
+                ["port > 1023", "Greater than", "from any port > 1023"],
+                ["port 1:1023", "Privileged ports", "port 1:1023"],
+            ],
+            col_widths=[120, 140, 180],
+        ),
+        Spacer(20),
+        Heading("State Options"),
+        Table(
+            id="state_opts_b",
+            rows=[
+                ["Option", "Effect"],
+                ["keep state", "Normal stateful tracking (default)"],
+                ["modulate state", "Randomize TCP sequence numbers"],
+                ["synproxy state", "Proxy TCP handshake (DDoS protection)"],
+                ["no state", "Stateless rule (no tracking)"],
+                ["sloppy state", "Relaxed state tracking (asymmetric routing)"],
+                ["max 100", "Maximum states from this rule"],
+                ["max-src-nodes 10", "Max unique source IPs"],
+                ["max-src-states 3", "Max states per source IP"],
+            ],
+            col_widths=[140, 300],
+        ),
+        Spacer(20),
+        Heading("Reading pfctl Output"),
+        Paragraph("Use these commands to view the active ruleset and diagnose issues:"),
+        Table(
+            id="pfctl_cmds",
+            rows=[
+                ["Command", "Output"],
+                ["pfctl -sr", "Show all loaded rules"],
+                ["pfctl -sr -v", "Verbose with rule numbers"],
+                ["pfctl -sr -vv", "Very verbose with counters"],
+                ["pfctl -ss", "Show state table"],
+                ["pfctl -ss | grep 172.16", "States for specific subnet"],
+                ["pfctl -si", "Statistics (packets, states)"],
+                ["pfctl -sa", "Everything (rules + states + info)"],
+                ["pfctl -t tablename -T show", "Show table contents"],
+            ],
+            col_widths=[180, 260],
+        ),
+        Spacer(15),
+        Callout(
+            "The file /tmp/rules.debug contains the ruleset BEFORE loading. Compare with "
+            "'pfctl -sr' to verify rules loaded correctly. Syntax errors prevent loading.",
+            "tip",
+        ),
+        Spacer(20),
+        Heading("OPNsense Rule Anchors"),
+        Paragraph(
+            "OPNsense organizes rules into anchors (named rule groups). Key anchors:"
+        ),
+        Table(
+            id="anchors",
+            rows=[
+                ["Anchor", "Purpose"],
+                ["opnsense/*", "Main OPNsense rules"],
+                ["opnsense/floating", "Floating rules"],
+                ["opnsense/interface/lan", "LAN interface rules"],
+                ["opnsense/nat/rdr", "Port forward rules"],
+                ["opnsense/nat/out", "Outbound NAT rules"],
+                ["opnsense/suricata", "IDS/IPS inline rules"],
+            ],
+            col_widths=[160, 280],
+        ),
+    ],
+)
+
+
+# ============================================================================
+# APPENDIX C: REST API REFERENCE
+# ============================================================================
+
+APPENDIX_C = Chapter(
+    key="C",
+    title="REST API Reference",
+    summary="Authentication, endpoints, and examples",
+    blocks=[
+        Callout(
+            "The OPNsense REST API enables programmatic firewall management. Use this "
+            "for automation, integration with other tools, or when MCP tools are "
+            "unavailable.",
+            "note",
+        ),
+        Spacer(15),
+        Heading("API Authentication"),
+        Paragraph(
+            "OPNsense uses API key + secret authentication. Generate credentials at "
+            "System → Access → Users → [user] → API Keys."
+        ),
+        Spacer(10),
+        Table(
+            id="auth_info",
+            rows=[
+                ["Component", "Details"],
+                ["Auth Type", "HTTP Basic Authentication"],
+                ["Username", "API Key (long alphanumeric string)"],
+                ["Password", "API Secret (long alphanumeric string)"],
+                ["Protocol", "HTTPS only (port 443)"],
+                ["Content-Type", "application/json"],
+            ],
+            col_widths=[120, 320],
+        ),
+        Spacer(15),
+        Heading("Example curl Request", level=2),
+        Paragraph(
+            "<font face='Courier' size='8'>curl -k -u 'API_KEY:API_SECRET' "
+            "https://192.168.1.1/api/core/system/status</font>"
+        ),
+        Spacer(20),
+        Heading("Common API Endpoints"),
+        Table(
+            id="api_endpoints",
+            rows=[
+                ["Endpoint", "Method", "Description"],
+                ["/api/core/system/status", "GET", "System status and version"],
+                ["/api/core/firmware/status", "GET", "Firmware update status"],
+                [
+                    "/api/diagnostics/interface/getInterfaceStatistics",
+                    "GET",
+                    "Interface stats",
+                ],
+                ["/api/firewall/filter/searchRule", "GET", "List firewall rules"],
+                ["/api/firewall/filter/getRule/{uuid}", "GET", "Get specific rule"],
+                ["/api/firewall/filter/addRule", "POST", "Create firewall rule"],
+                ["/api/firewall/filter/setRule/{uuid}", "POST", "Update rule"],
+                ["/api/firewall/filter/delRule/{uuid}", "POST", "Delete rule"],
+                ["/api/firewall/filter/apply", "POST", "Apply pending changes"],
+                ["/api/firewall/alias/searchItem", "GET", "List aliases"],
+                ["/api/firewall/alias/addItem", "POST", "Create alias"],
+            ],
+            col_widths=[210, 60, 170],
+        ),
+        Spacer(15),
+        Heading("NAT API Endpoints", level=2),
+        Table(
+            id="nat_endpoints",
+            rows=[
+                ["Endpoint", "Method", "Description"],
+                ["/api/firewall/source_nat/searchRule", "GET", "List outbound NAT"],
+                ["/api/firewall/source_nat/addRule", "POST", "Create outbound rule"],
+                ["/api/firewall/source_nat/apply", "POST", "Apply NAT changes"],
+                [
+                    "/api/firewall/destination_nat/searchRule",
+                    "GET",
+                    "List port forwards",
+                ],
+                [
+                    "/api/firewall/destination_nat/addRule",
+                    "POST",
+                    "Create port forward",
+                ],
+            ],
+            col_widths=[210, 60, 170],
+        ),
+        Spacer(15),
+        Heading("Interface API Endpoints", level=2),
+        Table(
+            id="intf_endpoints",
+            rows=[
+                ["Endpoint", "Method", "Description"],
+                ["/api/interfaces/overview/export", "GET", "All interfaces overview"],
+                ["/api/interfaces/vlan_settings/searchItem", "GET", "List VLANs"],
+                ["/api/interfaces/vlan_settings/addItem", "POST", "Create VLAN"],
+                ["/api/diagnostics/interface/getArp", "GET", "ARP table"],
+                ["/api/dhcpv4/leases/searchLease", "GET", "DHCP leases"],
+            ],
+            col_widths=[210, 60, 170],
+        ),
+        Spacer(20),
+        Heading("API Workflow: Create Firewall Rule"),
+        BulletList(
+            [
+                "1. Generate API credentials (System → Access → Users → API Keys)",
+                "2. GET /api/firewall/filter/searchRule to list existing rules",
+                "3. POST /api/firewall/filter/addRule with rule JSON body",
+                "4. POST /api/firewall/filter/apply to activate changes",
+                "5. GET /api/firewall/filter/searchRule to verify",
+            ],
+        ),
+        Spacer(15),
+        Heading("Rule JSON Structure", level=2),
+        Paragraph("Example POST body for /api/firewall/filter/addRule:"),
+        Spacer(5),
+        Table(
+            id="rule_json",
+            rows=[
+                ["Field", "Type", "Example Value"],
+                ["enabled", "string", "1"],
+                ["action", "string", "pass"],
+                ["interface", "string", "lan"],
+                ["direction", "string", "in"],
+                ["ipprotocol", "string", "inet"],
+                ["protocol", "string", "tcp"],
+                ["source_net", "string", "192.168.1.0/24"],
+                ["destination_net", "string", "any"],
+                ["destination_port", "string", "443"],
+                ["description", "string", "Allow HTTPS"],
+            ],
+            col_widths=[120, 80, 240],
+        ),
+        Spacer(15),
+        Callout(
+            "Always call /apply endpoint after making changes. Changes are staged until "
+            "applied. This allows batching multiple changes before activation.",
+            "warning",
+        ),
+        Spacer(20),
+        Heading("API Response Codes"),
+        Table(
+            id="response_codes",
+            rows=[
+                ["Code", "Meaning", "Action"],
+                ["200", "Success", "Parse response JSON"],
+                ["400", "Bad Request", "Check request format/parameters"],
+                ["401", "Unauthorized", "Verify API key/secret"],
+                ["403", "Forbidden", "User lacks permission"],
+                ["404", "Not Found", "Check endpoint URL"],
+                ["500", "Server Error", "Check OPNsense logs"],
+            ],
+            col_widths=[60, 120, 260],
+        ),
+        Spacer(20),
+        Heading("API Best Practices", level=2),
+        BulletList(
+            [
+                "Always use HTTPS (-k flag for self-signed certs)",
+                "Store credentials securely (environment variables, not code)",
+                "Check response status before parsing JSON",
+                "Call /apply after modifications",
+                "Use UUIDs from search responses for updates/deletes",
+                "Rate limit requests to avoid overwhelming the firewall",
+                "Test in non-production environment first",
+            ],
+        ),
+        Spacer(15),
+        Paragraph(
+            "<b>API Documentation:</b> Full API reference available at "
+            "https://docs.opnsense.org/development/api.html"
+        ),
+        Spacer(30),
+        Rule(),
+        Spacer(15),
+        Paragraph(
+            "<i>This guide is optimized for LLM/AI agent reference. Based on OPNsense "
+            "24.x documentation. For latest info: docs.opnsense.org | MCP Server: "
+            "github.com/vespo92/opnsense-mcp-server</i>"
+        ),
+    ],
+)
+
+
+# ============================================================================
+# THE GUIDE
+# ============================================================================
+
+GUIDE = Guide(
+    title="OPNsense User Guide",
+    chapters=[
+        CHAPTER_1,
+        CHAPTER_2,
+        CHAPTER_3,
+        CHAPTER_4,
+        CHAPTER_5,
+        CHAPTER_6,
+        CHAPTER_7,
+        CHAPTER_8,
+        CHAPTER_9,
+        CHAPTER_10,
+        CHAPTER_11,
+        CHAPTER_12,
+        CHAPTER_13,
+        CHAPTER_14,
+        CHAPTER_15,
+        APPENDIX_A,
+        APPENDIX_B,
+        APPENDIX_C,
+    ],
+)
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+OPNsense User Guide - Exporters
+Writes the guide content in machine-readable formats without going through ReportLab
+"""
+
+import html
+import json
+import re
+
+import guide_model as model
+
+# ============================================================================
+# TEXT
+# ============================================================================
+
+# Inline paragraph markup used in the content. Anything else in angle
+# brackets ("grep <ip>") is literal text and is kept.
+_MARKUP_TAG = re.compile(r"</?(?:b|i|u|strike|super|sub|font|a|span)(?:\s[^>]*)?>")
+_LINE_BREAK = re.compile(r"<br\s*/?>")
+
+
+def plain_text(markup):
+    """Strip inline paragraph markup and resolve entities"""
+    text = _LINE_BREAK.sub("\n", markup)
+    text = _MARKUP_TAG.sub("", text)
+    return html.unescape(text).strip()
+
+
+# ============================================================================
+# SECTIONS
+# ============================================================================
+
+
+def _new_section(chapter, index, title):
+    return {
+        "id": f"{chapter.key}.{index}",
+        "chapter": chapter.key,
+        "chapter_title": chapter.title,
+        "appendix": chapter.is_appendix,
+        "section": title,
+        "subsections": [],
+        "paragraphs": [],
+        "bullets": [],
+        "tables": [],
+        "callouts": [],
+        "diagrams": [],
+    }
+
+
+def _has_content(section):
+    return any(
+        section[name]
+        for name in (
+            "subsections",
+            "paragraphs",
+            "bullets",
+            "tables",
+            "callouts",
+            "diagrams",
+        )
+    )
+
+
+def iter_sections(guide):
+    """Yield one record per section of the guide.
+
+    A chapter is split at its level 1 headings; text before the first
+    heading forms section 0, titled after the chapter. Subsection headings
+    stay inside their section and are listed under "subsections".
+    """
+    for chapter in guide.chapters:
+        index = 0
+        section = _new_section(chapter, index, chapter.title)
+        for block in model.iter_blocks(chapter.blocks):
+            if isinstance(block, model.Heading) and block.level == 1:
+                if _has_content(section):
+                    yield section
+                index += 1
+                section = _new_section(chapter, index, plain_text(block.text))
+            elif isinstance(block, model.Heading):
+                section["subsections"].append(plain_text(block.text))
+            elif isinstance(block, model.Paragraph):
+                section["paragraphs"].append(plain_text(block.text))
+            elif isinstance(block, model.BulletList):
+                section["bullets"].extend(plain_text(item) for item in block.items)
+            elif isinstance(block, model.Table):
+                header, *rows = block.rows
+                section["tables"].append(
+                    {"id": block.id, "header": header, "rows": rows}
+                )
+            elif isinstance(block, model.Callout):
+                section["callouts"].append(
+                    {"type": block.kind, "text": plain_text(block.text)}
+                )
+            elif isinstance(block, model.Diagram):
+                section["diagrams"].append(block.kind)
+            elif isinstance(block, model.Topology):
+                section["diagrams"].append("topology")
+        if _has_content(section):
+            yield section
+
+
+def write_jsonl(guide, out):
+    """Write the guide to a text stream as JSON Lines, one section per line"""
+    count = 0
+    for section in iter_sections(guide):
+        out.write(json.dumps(section, ensure_ascii=False))
+        out.write("\n")
+        count += 1
+    return count
+
+
+# ============================================================================
+# MARKDOWN
+# ============================================================================
+
+KNOWLEDGE_TITLE = "OPNsense Configuration Knowledge Base"
+KNOWLEDGE_INTRO = (
+    "> **Purpose:** LLM-optimized reference for configuring OPNsense firewalls "
+    "via MCP tools.\n"
+    "> **Usage:** Include this file in your LLM's context alongside the OPNsense "
+    "MCP server.\n"
+    ">\n"
+    "> Generated from `src/guide_content.py` together with the PDF guide; edit the "
+    "guide content and rebuild instead of editing this file."
+)
+LEAN_INTRO = (
+    "OPNsense reference for LLM agents using the OPNsense MCP server: its "
+    "tools, workflows and quick-reference tables from the PDF guide."
+)
+
+_CALLOUT_LABELS = {
+    "info": "Info",
+    "warning": "Warning",
+    "tip": "Tip",
+    "danger": "Danger",
+    "note": "Note",
+}
+_MARKDOWN_TAGS = (
+    (re.compile(r"</?b>"), "**"),
+    (re.compile(r"</?i>"), "_"),
+    (re.compile(r"<font face='Courier'[^>]*>|</font>"), "`"),
+)
+
+
+def markdown_text(markup):
+    """Translate inline paragraph markup to Markdown"""
+    text = markup
+    for pattern, replacement in _MARKDOWN_TAGS:
+        text = pattern.sub(replacement, text)
+    return plain_text(text)
+
+
+def _table_row(cells):
+    cells = [str(cell).replace("|", "\\|").replace("\n", " ") for cell in cells]
+    return "| " + " | ".join(cells) + " |"
+
+
+def _lean_table_row(cells):
+    cells = [str(cell).replace("|", "\\|").replace("\n", " ") for cell in cells]
+    return "|".join(cells)
+
+
+def _bullet_lines(block, text):
+    if not block.marker:
+        # Hard line breaks keep unmarked lines apart in rendered Markdown
+        return [text(item) + "  " for item in block.items]
+    prefix = {"•": "- ", "☐": "- [ ] "}.get(block.marker, f"- {block.marker} ")
+    return [prefix + text(item) for item in block.items]
+
+
+def _heading(block, text):
+    return ("###" if block.level == 1 else "####") + " " + text(block.text)
+
+
+# What the lean variant keeps: the tables of the quick-reference appendix,
+# the tool reference tables and the lists under workflow headings that call
+# MCP tools
+LEAN_QUICK_REFERENCE = "Quick Reference"
+LEAN_TOOL_HEADER = ("Tool", "Parameters", "Description")
+LEAN_WORKFLOW = "Workflow"
+MCP_TOOL_PREFIX = "opnsense_"
+# Upper bound on the size of the lean file, near the hand-written knowledge
+# base it replaced (10,099 bytes, with about half of today's tools)
+LEAN_BUDGET_BYTES = 17 * 1024
+
+
+def _lean_blocks(chapter, tools):
+    """A chapter's tool reference tables as one "tool - description" line
+    per tool, its workflow lists and, in the quick-reference appendix, its
+    tables, each under the headings it appears under.
+
+    `tools` holds the tool names already written; a tool listed in several
+    tables is only written the first time.
+    """
+    chunks = []
+    headings = []
+    written = 0  # how many of `headings` are already in chunks
+    for block in model.iter_blocks(chapter.blocks):
+        if isinstance(block, model.Heading):
+            # A heading replaces the previous one of its level and any below it
+            kept = [h for h in headings if h.level < block.level]
+            headings = kept + [block]
+            written = min(written, len(kept))
+            continue
+        if isinstance(block, model.Table) and tuple(block.rows[0]) == LEAN_TOOL_HEADER:
+            lines = []
+            for cells in block.rows[1:]:
+                name = plain_text(str(cells[0]))
+                if name.startswith(MCP_TOOL_PREFIX) and name not in tools:
+                    tools.add(name)
+                    lines.append(f"{name} - {plain_text(str(cells[-1]))}")
+            chunk = "\n".join(lines)
+        elif isinstance(block, model.Table) and chapter.title == LEAN_QUICK_REFERENCE:
+            header, *rows = block.rows
+            lines = [_lean_table_row(header), _lean_table_row(["-"] * len(header))]
+            lines.extend(_lean_table_row(cells) for cells in rows)
+            chunk = "\n".join(lines)
+        elif (
+            isinstance(block, model.BulletList)
+            and any(LEAN_WORKFLOW in heading.text for heading in headings)
+            and any(MCP_TOOL_PREFIX in item for item in block.items)
+        ):
+            chunk = "\n".join(plain_text(item) for item in block.items)
+        else:
+            continue
+        if not chunk:
+            continue
+        # Headings are only written once something follows them
+        chunks.extend(_heading(heading, plain_text) for heading in headings[written:])
+        written = len(headings)
+        chunks.append(chunk)
+    return chunks
+
+
+def _markdown_blocks(blocks):
+    """Markdown chunks for a chapter's blocks; chunks are separated by blank lines"""
+    text = markdown_text
+    chunks = []
+    for block in model.iter_blocks(blocks):
+        if isinstance(block, model.Heading):
+            chunks.append(_heading(block, text))
+        elif isinstance(block, model.Paragraph):
+            chunks.append(text(block.text))
+        elif isinstance(block, model.BulletList):
+            chunks.append("\n".join(_bullet_lines(block, text)))
+        elif isinstance(block, model.Table):
+            header, *rows = block.rows
+            lines = [_table_row(header), _table_row(["---"] * len(header))]
+            lines.extend(_table_row(cells) for cells in rows)
+            chunks.append("\n".join(lines))
+        elif isinstance(block, model.Callout):
+            label = _CALLOUT_LABELS.get(block.kind, block.kind.title())
+            chunks.append(f"> **{label}:** {text(block.text)}")
+        elif isinstance(block, model.Rule):
+            chunks.append("---")
+        # Diagrams, spacing and page breaks only matter on paper
+    return chunks
+
+
+def _chapter_heading(chapter):
+    if chapter.is_appendix:
+        return f"## Appendix {chapter.key}: {chapter.title}"
+    return f"## {chapter.key}. {chapter.title}"
+
+
+def write_markdown(guide, out, lean=False):
+    """Write the guide to a text stream as Markdown.
+
+    The full variant keeps emphasis, inline code, callout boxes as block
+    quotes and the chapter summaries. The lean variant is for small context
+    windows: only the MCP tools, the workflows and the quick-reference
+    tables (see _lean_blocks()), within LEAN_BUDGET_BYTES. Chapters without
+    any are left out.
+    """
+    chunks = [f"# {KNOWLEDGE_TITLE}", LEAN_INTRO if lean else KNOWLEDGE_INTRO]
+    if not lean:
+        chunks.append("## Contents")
+        chunks.append(
+            "\n".join(
+                f"- {_chapter_heading(chapter)[3:]} - {chapter.summary}"
+                for chapter in guide.chapters
+            )
+        )
+    tools = set()
+    for chapter in guide.chapters:
+        if lean:
+            blocks = _lean_blocks(chapter, tools)
+            if blocks:
+                chunks.append(_chapter_heading(chapter))
+                chunks.extend(blocks)
+            continue
+        chunks.append("---")
+        chunks.append(_chapter_heading(chapter))
+        chunks.append(f"_{chapter.summary}_")
+        chunks.extend(_markdown_blocks(chapter.blocks))
+    out.write("\n\n".join(chunks))
+    out.write("\n")
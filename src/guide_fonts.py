@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+OPNsense User Guide - Embedded Fonts
+Registers the bundled DejaVu Sans TrueType family for the characters the PDF
+standard fonts lack (callout icons, symbols, non-Latin scripts) and caches the
+font subsets that ReportLab embeds in every PDF
+"""
+
+import functools
+import hashlib
+from itertools import groupby
+import os
+import re
+import struct
+import threading
+
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont, TTFontFace, TTFontFile
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+FONT_DIR = os.path.join(PROJECT_ROOT, "assets", "fonts")
+
+# The embedded family; italics fall back to the upright faces
+FALLBACK_FONT = "DejaVuSans"
+FALLBACK_BOLD_FONT = "DejaVuSans-Bold"
+FONT_FILES = {
+    FALLBACK_FONT: "DejaVuSans.ttf",
+    FALLBACK_BOLD_FONT: "DejaVuSans-Bold.ttf",
+}
+
+# Font subsets embedded in earlier builds, one file per font and glyph set
+SUBSET_CACHE_DIR = os.path.join(PROJECT_ROOT, ".cache", "user-guide", "fonts")
+
+# Bump when subset_font() produces different bytes for the same glyphs
+SUBSET_CACHE_VERSION = 1
+
+# name table records kept in a subset: copyright, family, style, unique
+# id, full name, version and PostScript name. DejaVu's license text alone
+# is 15 KB, which would otherwise be embedded with every subset.
+SUBSET_NAME_IDS = frozenset(range(7))
+
+# ============================================================================
+# SUBSETS
+# ============================================================================
+
+
+def _trim_name_table(data):
+    """A copy of a format 0 name table with only the SUBSET_NAME_IDS records"""
+    _, count, storage = struct.unpack(">HHH", data[:6])
+    records = []
+    strings = b""
+    for index in range(count):
+        platform, encoding, language, name_id, length, offset = struct.unpack(
+            ">6H", data[6 + 12 * index : 18 + 12 * index]
+        )
+        if name_id in SUBSET_NAME_IDS:
+            text = data[storage + offset : storage + offset + length]
+            records.append(
+                (platform, encoding, language, name_id, length, len(strings))
+            )
+            strings += text
+    header = struct.pack(">HHH", 0, len(records), 6 + 12 * len(records))
+    return (
+        header + b"".join(struct.pack(">6H", *record) for record in records) + strings
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _font_digest(path):
+    with open(path, "rb") as fh:
+        return hashlib.sha256(fh.read()).hexdigest()
+
+
+@functools.lru_cache(maxsize=256)
+def subset_font(face, subset):
+    """TrueType subset of `face` with the characters `subset` (codes in order).
+
+    The subset is read from SUBSET_CACHE_DIR when an earlier build made the
+    same one, and written there otherwise; identical glyph sets give
+    identical bytes, so repeated subsets can be shared in a stitched PDF.
+    """
+    key = hashlib.sha256(
+        repr((SUBSET_CACHE_VERSION, _font_digest(face.filename), subset)).encode()
+    ).hexdigest()
+    path = os.path.join(SUBSET_CACHE_DIR, f"{key}.ttf")
+    try:
+        with open(path, "rb") as fh:
+            return fh.read()
+    except OSError:
+        pass
+
+    data = TTFontFile.makeSubset(face, list(subset))
+    os.makedirs(SUBSET_CACHE_DIR, exist_ok=True)
+    temp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp, "wb") as fh:
+        fh.write(data)
+    os.replace(temp, path)
+    return data
+
+
+class _SubsetFace(TTFontFace):
+    """TTFontFace whose subsets come from subset_font() and carry a short name table"""
+
+    def makeSubset(self, subset):
+        return subset_font(self, tuple(subset))
+
+    def get_table(self, tag):
+        data = TTFontFace.get_table(self, tag)
+        return _trim_name_table(data) if tag == "name" else data
+
+
+class EmbeddedFont(TTFont):
+    """TrueType font embedded as subsets of only the characters a PDF uses.
+
+    Codes are assigned from 1 upwards in order of first use instead of
+    reserving the ASCII range, so a font used for a handful of symbols
+    embeds just those glyphs.
+    """
+
+    def __init__(self, name, filename):
+        TTFont.__init__(self, name, filename, asciiReadable=False)
+        # TTFont always builds a plain TTFontFace
+        self.face.__class__ = _SubsetFace
+
+
+@functools.lru_cache(maxsize=None)
+def register_fonts():
+    """Register the embedded family with ReportLab (once per process).
+
+    Paragraph markup can then use <font name="DejaVuSans">, with <b>
+    selecting the bold face.
+    """
+    for name, filename in FONT_FILES.items():
+        pdfmetrics.registerFont(EmbeddedFont(name, os.path.join(FONT_DIR, filename)))
+    pdfmetrics.registerFontFamily(
+        FALLBACK_FONT,
+        normal=FALLBACK_FONT,
+        bold=FALLBACK_BOLD_FONT,
+        italic=FALLBACK_FONT,
+        boldItalic=FALLBACK_BOLD_FONT,
+    )
+
+
+def reserve_glyphs(font_name, text, canvas):
+    """Give the characters of `text` their codes in `font_name` for this PDF.
+
+    Called before a font's first use in a document, it fixes the order of
+    the subset, so every document using the same characters embeds the
+    same subset.
+    """
+    pdfmetrics.getFont(font_name).splitString(text, canvas._doc)
+
+
+# ============================================================================
+# FALLBACK FOR THE STANDARD FONTS
+# ============================================================================
+
+_NOT_LATIN1 = re.compile(r"[^\x00-\xff]+")
+
+
+@functools.lru_cache(maxsize=None)
+def standard_font_covers(char):
+    """Whether Helvetica or its standard substitutes (Symbol, ZapfDingbats) have `char`"""
+    helvetica = pdfmetrics.getFont("Helvetica")
+    for font in (helvetica, *helvetica.substitutionFonts):
+        try:
+            char.encode(font.encName)
+        except UnicodeEncodeError:
+            continue
+        return True
+    return False
+
+
+def with_fallback_font(markup):
+    """Paragraph markup with the characters no standard font has set in
+    the embedded family.
+
+    ReportLab otherwise draws them as ZapfDingbats' placeholder, a filled
+    square. Tags and entities are ASCII, so only text is ever wrapped.
+    """
+
+    def replace(match):
+        pieces = []
+        for covered, chars in groupby(match.group(), standard_font_covers):
+            run = "".join(chars)
+            pieces.append(
+                run if covered else f'<font name="{FALLBACK_FONT}">{run}</font>'
+            )
+        return "".join(pieces)
+
+    return _NOT_LATIN1.sub(replace, markup)
+
+
+def needs_fallback(text):
+    """Whether some character of `text` is in no standard font"""
+    if text.isascii():
+        return False
+    return any(
+        not standard_font_covers(char)
+        for run in _NOT_LATIN1.findall(text)
+        for char in run
+    )
+
+
+def fallback_runs(text, font_name):
+    """Split `text` into (font, run) pieces, setting the characters no
+    standard font has in the embedded family of matching weight"""
+    if not needs_fallback(text):
+        return [(font_name, text)]
+    fallback = FALLBACK_BOLD_FONT if "Bold" in font_name else FALLBACK_FONT
+    runs = []
+    for covered, chars in groupby(text, standard_font_covers):
+        runs.append((font_name if covered else fallback, "".join(chars)))
+    return runs
+
+
+def fallback_width(text, font_name, size):
+    """stringWidth() of `text` as draw_string() sets it"""
+    if not needs_fallback(text):
+        return pdfmetrics.stringWidth(text, font_name, size)
+    register_fonts()
+    return sum(
+        pdfmetrics.stringWidth(run, font, size)
+        for font, run in fallback_runs(text, font_name)
+    )
+
+
+def draw_string(canvas, x, y, text, font_name, size):
+    """canvas.drawString() with the fallback of with_fallback_font(), for
+    text drawn outside a Paragraph. The canvas font must be `font_name` at
+    `size`; it is again afterwards."""
+    if not needs_fallback(text):
+        canvas.drawString(x, y, text)
+        return
+    register_fonts()
+    for font, run in fallback_runs(text, font_name):
+        canvas.setFont(font, size)
+        canvas.drawString(x, y, run)
+        x += pdfmetrics.stringWidth(run, font, size)
+    canvas.setFont(font_name, size)
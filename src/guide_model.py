@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+OPNsense User Guide - Document Model
+Typed, serializable description of the guide's content, independent of ReportLab
+"""
+
+from dataclasses import dataclass, field, fields
+import functools
+import json
+from typing import List, Optional, Union
+
+# ============================================================================
+# BLOCK TYPES
+# ============================================================================
+# Text fields may carry ReportLab's inline paragraph markup (<b>, <i>,
+# <font face=...>); renderers and exporters are responsible for it.
+
+
+@dataclass
+class Paragraph:
+    """A paragraph of body text"""
+
+    text: str
+
+
+@dataclass
+class Heading:
+    """Section (level 1) or subsection (level 2) title"""
+
+    text: str
+    level: int = 1
+
+
+@dataclass
+class BulletList:
+    """Consecutive indented lines, each prefixed with `marker` unless it is empty"""
+
+    items: List[str]
+    marker: str = "•"
+
+
+@dataclass
+class Table:
+    """Table whose first row is the header.
+
+    `id` is a stable name for the table (unique within the guide) used by
+    exports and cross references; `col_widths` optionally pins the column
+    widths in points instead of sizing them from the contents.
+    """
+
+    rows: List[List[str]]
+    id: Optional[str] = None
+    col_widths: Optional[List[float]] = None
+
+
+@dataclass
+class Callout:
+    """Colored info/warning/tip/danger/note box"""
+
+    text: str
+    kind: str = "info"
+
+
+@dataclass
+class Diagram:
+    """One of the built-in illustrations: network, firewall_rules or vpn"""
+
+    kind: str
+
+
+@dataclass
+class Topology:
+    """Network diagram laid out automatically from its nodes and links.
+
+    Each node is [id, label, kind, detail] and each link [source, target,
+    label, kind]; everything after the first two fields may be left off.
+    Node kinds are internet, firewall, network, vlan, vpn and host; link
+    kinds are link, trunk and vpn. A link's target is drawn below its
+    source, so links should point away from the internet.
+    """
+
+    nodes: List[List[str]]
+    links: List[List[str]] = field(default_factory=list)
+    title: Optional[str] = None
+
+
+@dataclass
+class Spacer:
+    """Vertical whitespace in points"""
+
+    height: float
+
+
+@dataclass
+class PageBreak:
+    """Force the following content onto a new page"""
+
+
+@dataclass
+class Rule:
+    """Horizontal rule across the frame"""
+
+    thickness: float = 2
+
+
+@dataclass
+class KeepTogether:
+    """Blocks that should stay on the same page when possible"""
+
+    blocks: List["Block"]
+
+
+Block = Union[
+    Paragraph,
+    Heading,
+    BulletList,
+    Table,
+    Callout,
+    Diagram,
+    Topology,
+    Spacer,
+    PageBreak,
+    Rule,
+    KeepTogether,
+]
+
+# ============================================================================
+# DOCUMENT STRUCTURE
+# ============================================================================
+
+
+@dataclass
+class Chapter:
+    """A chapter or appendix; `key` is its number ("4") or letter ("A")"""
+
+    key: str
+    title: str
+    summary: str
+    blocks: List[Block] = field(default_factory=list)
+    # Title shown in the table of contents when it differs from the header
+    toc_title: Optional[str] = None
+
+    @property
+    def is_appendix(self):
+        return not self.key.isdigit()
+
+
+@dataclass
+class Guide:
+    """The complete guide"""
+
+    title: str
+    chapters: List[Chapter]
+
+    def chapter(self, key):
+        """Look up a chapter by key"""
+        for chapter in self.chapters:
+            if chapter.key == key:
+                return chapter
+        raise KeyError(f"no chapter {key!r}")
+
+    def select(self, keys):
+        """A guide with only the given chapters, kept in document order"""
+        wanted = set(keys)
+        for key in wanted:
+            self.chapter(key)  # unknown keys raise KeyError
+        return Guide(self.title, [c for c in self.chapters if c.key in wanted])
+
+    def to_dict(self):
+        return to_dict(self)
+
+    @classmethod
+    def from_dict(cls, data):
+        return from_dict(data)
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.to_dict(), ensure_ascii=False, **kwargs)
+
+    @classmethod
+    def from_json(cls, text):
+        return from_dict(json.loads(text))
+
+
+def iter_blocks(blocks):
+    """Yield blocks depth-first, descending into KeepTogether groups"""
+    for block in blocks:
+        if isinstance(block, KeepTogether):
+            yield from iter_blocks(block.blocks)
+        else:
+            yield block
+
+
+# ============================================================================
+# SERIALIZATION
+# ============================================================================
+
+NODE_TYPES = {
+    cls.__name__: cls
+    for cls in (
+        Paragraph,
+        Heading,
+        BulletList,
+        Table,
+        Callout,
+        Diagram,
+        Topology,
+        Spacer,
+        PageBreak,
+        Rule,
+        KeepTogether,
+        Chapter,
+        Guide,
+    )
+}
+
+
+def to_dict(node):
+    """Convert a model object to plain JSON-compatible data, tagged with its type"""
+    data = {"type": type(node).__name__}
+    for f in fields(node):
+        value = getattr(node, f.name)
+        if f.name in ("blocks", "chapters"):
+            value = [to_dict(child) for child in value]
+        data[f.name] = value
+    return data
+
+
+def from_dict(data):
+    """Inverse of to_dict()"""
+    data = dict(data)
+    cls = NODE_TYPES[data.pop("type")]
+    for name in ("blocks", "chapters"):
+        if name in data:
+            data[name] = [from_dict(child) for child in data[name]]
+    return cls(**data)
+
+
+@functools.lru_cache(maxsize=None)
+def load_guide(path=None):
+    """Load the guide content once per process.
+
+    By default the content comes from guide_content.py; a JSON file written
+    by Guide.to_json() can be given instead.
+    """
+    if path is None:
+        from guide_content import GUIDE
+
+        return GUIDE
+    with open(path, encoding="utf-8") as fh:
+        return Guide.from_json(fh.read())
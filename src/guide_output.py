@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+OPNsense User Guide - Output Profiles
+Rewrites the finished PDF for where it is going: compressed, packed into
+object streams and linearized ("fast web view") for browsers and the wiki,
+or compressed with a plain cross-reference table for print shops
+"""
+
+from dataclasses import dataclass, field
+import functools
+import io
+import re
+import time
+from typing import List
+
+try:
+    from pypdf import PdfReader, PdfWriter
+    from pypdf.filters import ASCII85Decode
+    from pypdf.generic import (
+        ArrayObject,
+        DecodedStreamObject,
+        NameObject,
+        StreamObject,
+    )
+except ImportError:  # optional: the fallback when pikepdf is missing
+    PdfReader = PdfWriter = None
+
+# Link used for the time-to-first-page estimate: Lighthouse's simulated
+# mobile connection (1.6 Mbit/s down, 150 ms round trip)
+FIRST_PAGE_BANDWIDTH = 1_600_000
+FIRST_PAGE_RTT = 0.150
+
+# ============================================================================
+# PROFILES
+# ============================================================================
+
+
+@dataclass(frozen=True)
+class OutputProfile:
+    """How the rendered PDF is written out"""
+
+    name: str
+    description: str
+    # Flate-compress every stream, removing ReportLab's ASCII85 layer
+    compress: bool = False
+    # Keep one copy of identical objects (fonts, forms) from different chapters
+    deduplicate: bool = False
+    # Pack objects other than streams into compressed object streams (PDF 1.5)
+    object_streams: bool = False
+    # Put page 1 and what it needs first, with hint tables, so viewers can
+    # show it before the rest of the file has arrived
+    linearize: bool = False
+
+
+OUTPUT_PROFILES = {
+    "default": OutputProfile("default", "as rendered"),
+    "web": OutputProfile(
+        "web",
+        "compressed, deduplicated, object streams, linearized",
+        compress=True,
+        deduplicate=True,
+        object_streams=True,
+        linearize=True,
+    ),
+    # No object streams: some RIPs and preflight tools only read PDF 1.4
+    "print": OutputProfile(
+        "print",
+        "compressed, deduplicated, classic cross-reference table",
+        compress=True,
+        deduplicate=True,
+    ),
+}
+
+
+@dataclass
+class OutputReport:
+    """Size and time-to-first-page of one PDF written with a profile"""
+
+    profile: str
+    byte_size: int
+    # Bytes a viewer must download before it can draw page 1: the first
+    # page section of a linearized file, otherwise the whole file
+    first_page_bytes: int
+    # Size of the PDF before it was rewritten
+    rendered_size: int = 0
+    # Time spent applying the profile
+    seconds: float = 0.0
+    # Steps of the profile that could not be applied here
+    skipped: List[str] = field(default_factory=list)
+
+    @property
+    def first_page_seconds(self):
+        """Estimated time to first page on the FIRST_PAGE_BANDWIDTH link"""
+        return download_seconds(self.first_page_bytes)
+
+    def summary(self):
+        change = self.byte_size / self.rendered_size - 1 if self.rendered_size else 0
+        first_page = (
+            "the whole file"
+            if self.first_page_bytes >= self.byte_size
+            else f"{self.first_page_bytes / 1024:.1f} KB"
+        )
+        lines = [
+            f"Output profile {self.profile}: {self.rendered_size / 1024:.1f} KB -> "
+            f"{self.byte_size / 1024:.1f} KB ({change:+.0%}) in "
+            f"{self.seconds * 1000:.0f} ms",
+            f"  first page after {first_page}: ~{self.first_page_seconds:.2f} s "
+            f"at {FIRST_PAGE_BANDWIDTH / 1e6:g} Mbit/s "
+            f"(as rendered: ~{download_seconds(self.rendered_size):.2f} s)",
+        ]
+        if self.skipped:
+            lines.append(f"  skipped: {', '.join(self.skipped)}")
+        return "\n".join(lines)
+
+
+def download_seconds(size):
+    """Time to fetch `size` bytes over the FIRST_PAGE_BANDWIDTH link"""
+    return FIRST_PAGE_RTT + size * 8 / FIRST_PAGE_BANDWIDTH
+
+
+# ============================================================================
+# REWRITING
+# ============================================================================
+
+_LINEARIZED = re.compile(rb"<<[^>]*/Linearized\b[^>]*>>")
+_FIRST_PAGE_END = re.compile(rb"/E\s+(\d+)")
+
+
+def first_page_bytes(data):
+    """Bytes up to the end of the first page section of a linearized PDF,
+    or the whole size of any other"""
+    # The linearization dictionary is the first object, within 1 KB
+    match = _LINEARIZED.search(data[:1024])
+    end = _FIRST_PAGE_END.search(match.group()) if match else None
+    return int(end.group(1)) if end else len(data)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_pikepdf():
+    """pikepdf, or None when it is not installed.
+
+    Optional: only needed for object streams and linearization. Imported on
+    first use, as it adds about 100 ms to every build otherwise.
+    """
+    try:
+        import pikepdf
+    except ImportError:
+        return None
+    return pikepdf
+
+
+def _save_with_pikepdf(pikepdf, data, profile):
+    pdf = pikepdf.open(io.BytesIO(data))
+    out = io.BytesIO()
+    pdf.save(
+        out,
+        compress_streams=profile.compress,
+        # generalized also strips ASCII85 before recompressing
+        stream_decode_level=(
+            pikepdf.StreamDecodeLevel.generalized
+            if profile.compress
+            else pikepdf.StreamDecodeLevel.none
+        ),
+        object_stream_mode=(
+            pikepdf.ObjectStreamMode.generate
+            if profile.object_streams
+            else pikepdf.ObjectStreamMode.disable
+        ),
+        linearize=profile.linearize,
+    )
+    return out.getvalue()
+
+
+def _compress_with_pypdf(data):
+    """`data` with ASCII85 layers removed and plain streams Flate-compressed"""
+    writer = PdfWriter(clone_from=PdfReader(io.BytesIO(data)))
+    for index, obj in enumerate(writer._objects):
+        if not isinstance(obj, StreamObject):
+            continue
+        filters = obj.get("/Filter")
+        if filters is None:
+            if isinstance(obj, DecodedStreamObject):
+                encoded = obj.flate_encode()
+                encoded.indirect_reference = obj.indirect_reference
+                writer._objects[index] = encoded
+            continue
+        filters = list(filters) if isinstance(filters, ArrayObject) else [filters]
+        if filters[0] != "/ASCII85Decode":
+            continue
+        # The Flate data under the ASCII85 layer is kept as it is
+        obj._data = ASCII85Decode.decode(obj._data)
+        rest = filters[1:]
+        if not rest:
+            del obj["/Filter"]
+        else:
+            obj[NameObject("/Filter")] = (
+                rest[0] if len(rest) == 1 else ArrayObject(rest)
+            )
+    out = io.BytesIO()
+    writer.write(out)
+    return out.getvalue()
+
+
+def apply_output_profile(data, profile, rendered_size=None):
+    """Rewrite the PDF bytes `data` for `profile` (an OUTPUT_PROFILES key or
+    an OutputProfile); returns (bytes, OutputReport).
+
+    Object streams and linearization need pikepdf; without it the PDF is
+    only compressed, with pypdf, and the report lists what was skipped.
+    Deduplication happens earlier, in guide_pdf.stitch_chapters(): a
+    single-pass build has nothing to deduplicate. `rendered_size` is the
+    size before that deduplication, which the report compares against;
+    by default the size of `data`.
+    """
+    if isinstance(profile, str):
+        profile = OUTPUT_PROFILES[profile]
+    start = time.perf_counter()
+    rendered_size = rendered_size or len(data)
+    skipped = []
+    rewrite = profile.compress or profile.object_streams or profile.linearize
+    pikepdf = _load_pikepdf() if rewrite else None
+    if pikepdf is not None:
+        data = _save_with_pikepdf(pikepdf, data, profile)
+    else:
+        if profile.compress:
+            if PdfWriter is not None:
+                data = _compress_with_pypdf(data)
+            else:
+                skipped.append("compression (needs pikepdf or pypdf)")
+        if profile.object_streams:
+            skipped.append("object streams (needs pikepdf)")
+        if profile.linearize:
+            skipped.append("linearization (needs pikepdf)")
+    report = OutputReport(
+        profile=profile.name,
+        byte_size=len(data),
+        first_page_bytes=first_page_bytes(data),
+        rendered_size=rendered_size,
+        seconds=time.perf_counter() - start,
+        skipped=skipped,
+    )
+    return data, report
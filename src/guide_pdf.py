@@ -0,0 +1,2623 @@
+#!/usr/bin/env python3
+"""
+OPNsense User Guide - PDF Renderer
+Creates a comprehensive, production-ready PDF with colors, illustrations, and professional styling
+"""
+
+from reportlab.lib.pagesizes import letter, A4
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.colors import HexColor
+from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
+from reportlab.platypus import (
+    SimpleDocTemplate,
+    Paragraph,
+    Spacer,
+    Table,
+    LongTable,
+    TableStyle,
+    PageBreak,
+    KeepTogether,
+    Flowable,
+    HRFlowable,
+)
+from reportlab.platypus.doctemplate import _doNothing
+from reportlab.pdfgen import canvas
+from reportlab.pdfgen.canvas import FILL_NON_ZERO
+from reportlab.pdfbase.pdfdoc import PDFDictionary
+from reportlab.graphics import renderPDF, renderPM, renderSVG
+from reportlab.graphics.utils import RenderPMError
+from reportlab.graphics.shapes import Drawing, Ellipse, Group, Line, Rect, String
+from reportlab.graphics.svgpath import SvgPath
+from reportlab.pdfbase.pdfmetrics import stringWidth
+import reportlab
+import functools
+import contextlib
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+import guide_fonts as fonts
+import guide_model as model
+import guide_output
+import guide_topology as topology
+from guide_export import plain_text
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from pypdf import PdfReader, PdfWriter
+    from pypdf.annotations import Link
+    from pypdf.generic import (
+        ArrayObject,
+        DecodedStreamObject,
+        Destination,
+        DictionaryObject,
+        Fit,
+        IndirectObject,
+        NameObject,
+        TextStringObject,
+    )
+except ImportError:  # optional: only needed to stitch cached chapters together
+    PdfReader = PdfWriter = None
+
+# ============================================================================
+# COLOR PALETTE - OPNsense Brand Colors
+# ============================================================================
+OPNSENSE_ORANGE = HexColor("#FF6900")  # Official OPNsense brand orange
+OPNSENSE_DARK = HexColor("#2C3E50")
+OPNSENSE_BLUE = HexColor("#3498DB")
+OPNSENSE_GREEN = HexColor("#27AE60")
+OPNSENSE_RED = HexColor("#E74C3C")
+OPNSENSE_PURPLE = HexColor("#9B59B6")
+OPNSENSE_TEAL = HexColor("#1ABC9C")
+LIGHT_GREY = HexColor("#ECF0F1")
+DARK_GREY = HexColor("#7F8C8D")
+WHITE = HexColor("#FFFFFF")
+BLACK = HexColor("#000000")
+
+# ============================================================================
+# CUSTOM FLOWABLES FOR ILLUSTRATIONS
+# ============================================================================
+
+
+DIAGRAM_BACKGROUND = HexColor("#F8F9FA")
+
+
+def _panel(width, height):
+    """Drawing with the rounded light background every diagram sits on"""
+    drawing = Drawing(width, height)
+    drawing.add(_box(0, 0, width, height, 10, DIAGRAM_BACKGROUND))
+    return drawing
+
+
+def _box(x, y, width, height, radius, color):
+    return Rect(
+        x, y, width, height, rx=radius, ry=radius, fillColor=color, strokeColor=None
+    )
+
+
+def _oval(x1, y1, x2, y2, color):
+    return Ellipse(
+        (x1 + x2) / 2,
+        (y1 + y2) / 2,
+        (x2 - x1) / 2,
+        (y2 - y1) / 2,
+        fillColor=color,
+        strokeColor=None,
+    )
+
+
+def _label(x, y, text, font, size, color, anchor="middle"):
+    return String(
+        x, y, text, fontName=font, fontSize=size, fillColor=color, textAnchor=anchor
+    )
+
+
+def _stroke(x1, y1, x2, y2, color, width, dash=None):
+    return Line(
+        x1, y1, x2, y2, strokeColor=color, strokeWidth=width, strokeDashArray=dash
+    )
+
+
+def drawing_digest(drawing):
+    """Content hash of a Drawing: its size and every shape's properties"""
+    parts = [drawing.width, drawing.height]
+
+    def walk(node):
+        for shape in node.getContents():
+            props = shape.getProperties(recur=0)
+            props.pop("contents", None)
+            parts.append((type(shape).__name__, sorted(props.items())))
+            if isinstance(shape, Group):
+                walk(shape)
+
+    walk(drawing)
+    return _digest(*parts)
+
+
+# The renderers set and delete _parent on a Drawing's shapes while they
+# walk it, so the Drawings shared through load_svg() and _render_diagram()
+# are only rendered by one thread at a time
+_SHARED_DRAWING_LOCK = threading.Lock()
+
+
+@functools.lru_cache(maxsize=256)
+def _render_diagram(cls, params):
+    drawing = cls.make_drawing(*params)
+    return drawing, drawing_digest(drawing)
+
+
+_TEXT_ANCHORS = {"start": 0, "middle": 0.5, "end": 1}
+
+
+def _shape_canvas_ops(shape):
+    """Canvas calls that draw one shape the way renderPDF does, or None for
+    anything beyond the solid shapes built by _box(), _oval(), _stroke()
+    and _label()"""
+    if isinstance(shape, (Rect, Ellipse)):
+        if (
+            shape.fillColor is None
+            or shape.strokeColor is not None
+            or getattr(shape, "fillOpacity", None) is not None
+        ):
+            return None
+        if isinstance(shape, Ellipse):
+            corners = (
+                shape.cx - shape.rx,
+                shape.cy - shape.ry,
+                shape.cx + shape.rx,
+                shape.cy + shape.ry,
+            )
+            draw = ("ellipse", corners)
+        elif shape.rx == shape.ry == 0:
+            draw = ("rect", (shape.x, shape.y, shape.width, shape.height))
+        elif shape.rx == shape.ry:
+            rect = (shape.x, shape.y, shape.width, shape.height, shape.rx)
+            draw = ("roundRect", rect)
+        else:
+            return None
+        fill = {"stroke": 0, "fill": 1}
+        return [("setFillColor", (shape.fillColor,), {}), (*draw, fill)]
+    if isinstance(shape, Line):
+        if (
+            shape.strokeColor is None
+            or getattr(shape, "strokeOpacity", None) is not None
+            or shape.strokeLineCap
+            or shape.strokeLineJoin
+        ):
+            return None
+        dash = (shape.strokeDashArray,) if shape.strokeDashArray else ()
+        return [
+            ("setStrokeColor", (shape.strokeColor,), {}),
+            ("setLineWidth", (shape.strokeWidth,), {}),
+            ("setDash", dash, {}),
+            ("line", (shape.x1, shape.y1, shape.x2, shape.y2), {}),
+        ]
+    if isinstance(shape, String):
+        if (
+            shape.fillColor is None
+            or getattr(shape, "fillOpacity", None) is not None
+            or shape.textAnchor not in _TEXT_ANCHORS
+            or getattr(shape, "textRenderMode", 0)
+        ):
+            return None
+        width = stringWidth(shape.text, shape.fontName, shape.fontSize)
+        x = shape.x - width * _TEXT_ANCHORS[shape.textAnchor]
+        return [
+            ("setFillColor", (shape.fillColor,), {}),
+            ("setFont", (shape.fontName, shape.fontSize), {}),
+            ("drawString", (x, shape.y, shape.text), {}),
+        ]
+    return None
+
+
+@functools.lru_cache(maxsize=256)
+def _diagram_canvas_ops(cls, params):
+    """A diagram's Drawing as a list of (canvas method, args, kwargs), or
+    None when it needs the general renderer.
+
+    Replaying these calls draws a diagram in about half the time
+    renderPDF.draw() takes for the same shapes, and leaves the shared
+    Drawing untouched.
+    """
+    drawing, _ = _render_diagram(cls, params)
+    if tuple(drawing.transform) != (1, 0, 0, 1, 0, 0) or drawing.renderScale != 1:
+        return None
+    ops = []
+    for shape in drawing.getContents():
+        shape_ops = _shape_canvas_ops(shape)
+        if shape_ops is None:
+            return None
+        ops.extend(shape_ops)
+    return tuple(ops)
+
+
+class Diagram(Flowable):
+    """Illustration built as a reportlab Drawing.
+
+    Subclasses implement make_drawing(); params() are its arguments. The
+    Drawing is built once per distinct params in a process, along with the
+    canvas calls that draw it (see _diagram_canvas_ops()). Its first
+    placement in a document is drawn straight onto the page; only when the
+    same diagram is placed again is it recorded as a form XObject named
+    after its content hash, which every later placement reuses.
+    export_diagram() renders the same Drawing to SVG or PNG.
+    """
+
+    def __init__(self, width, height):
+        Flowable.__init__(self)
+        self.width = width
+        self.height = height
+
+    def params(self):
+        return (self.width, self.height)
+
+    @classmethod
+    def make_drawing(cls, width, height):
+        raise NotImplementedError
+
+    def rendered(self):
+        """(Drawing, content hash), shared by all equal diagrams"""
+        return _render_diagram(type(self), self.params())
+
+    def draw_drawing(self, drawing):
+        """Draw the Drawing at the origin of the canvas"""
+        ops = _diagram_canvas_ops(type(self), self.params())
+        if ops is None:
+            with _SHARED_DRAWING_LOCK:
+                renderPDF.draw(drawing, self.canv, 0, 0)
+            return
+        self.canv.saveState()
+        for method, args, kwargs in ops:
+            getattr(self.canv, method)(*args, **kwargs)
+        self.canv.restoreState()
+
+    def draw(self):
+        drawing, digest = self.rendered()
+        name = f"Diagram{digest[:16]}"
+        # Recording a form costs about as much again as drawing, and the
+        # guide places each diagram once
+        placed = self.canv.__dict__.setdefault("_guide_diagrams", set())
+        if name not in placed:
+            placed.add(name)
+            self.draw_drawing(drawing)
+            return
+        if not self.canv.hasForm(name):
+            self.canv.beginForm(name, 0, 0, drawing.width, drawing.height)
+            self.draw_drawing(drawing)
+            self.canv.endForm()
+        self.canv.doForm(name)
+
+
+class NetworkDiagram(Diagram):
+    """Custom flowable for network architecture diagrams"""
+
+    def __init__(self, width=450, height=200):
+        Diagram.__init__(self, width, height)
+
+    @classmethod
+    def make_drawing(cls, width, height):
+        d = _panel(width, height)
+
+        # Internet Cloud
+        d.add(_oval(180, 150, 270, 190, OPNSENSE_BLUE))
+        d.add(_label(225, 165, "INTERNET", "Helvetica-Bold", 10, WHITE))
+
+        # OPNsense Firewall Box
+        d.add(_box(175, 80, 100, 50, 5, OPNSENSE_ORANGE))
+        d.add(_label(225, 100, "OPNsense", "Helvetica-Bold", 11, WHITE))
+
+        # WAN Arrow
+        d.add(_stroke(225, 150, 225, 130, OPNSENSE_DARK, 2))
+        d.add(_label(240, 138, "WAN", "Helvetica", 8, OPNSENSE_DARK))
+
+        # LAN, DMZ and Guest Networks
+        for x, name, color in (
+            (50, "LAN", OPNSENSE_GREEN),
+            (185, "DMZ", OPNSENSE_PURPLE),
+            (320, "GUEST", OPNSENSE_TEAL),
+        ):
+            d.add(_box(x, 10, 80, 40, 5, color))
+            d.add(_label(x + 40, 25, name, "Helvetica-Bold", 9, WHITE))
+
+        # Connection Lines
+        for x in (90, 225, 360):
+            d.add(_stroke(225, 80, x, 50, DARK_GREY, 1.5))
+        return d
+
+
+class FirewallRulesDiagram(Diagram):
+    """Diagram showing firewall rule processing order"""
+
+    def __init__(self, width=450, height=180):
+        Diagram.__init__(self, width, height)
+
+    @classmethod
+    def make_drawing(cls, width, height):
+        d = _panel(width, height)
+
+        # Title
+        d.add(
+            _label(
+                225,
+                160,
+                "Firewall Rule Processing Order",
+                "Helvetica-Bold",
+                12,
+                OPNSENSE_DARK,
+            )
+        )
+
+        # Boxes for each stage
+        stages = [
+            ("Floating Rules", OPNSENSE_ORANGE, 30),
+            ("Group Rules", OPNSENSE_BLUE, 130),
+            ("Interface Rules", OPNSENSE_GREEN, 230),
+            ("Default Deny", OPNSENSE_RED, 330),
+        ]
+        for name, color, x in stages:
+            d.add(_box(x, 60, 90, 50, 5, color))
+            # Handle multi-line text
+            words = name.split()
+            if len(words) > 1:
+                d.add(_label(x + 45, 90, words[0], "Helvetica-Bold", 9, WHITE))
+                d.add(_label(x + 45, 78, words[1], "Helvetica-Bold", 9, WHITE))
+            else:
+                d.add(_label(x + 45, 82, name, "Helvetica-Bold", 9, WHITE))
+
+        # Arrows between stages
+        for x in [120, 220, 320]:
+            d.add(_stroke(x, 85, x + 10, 85, OPNSENSE_DARK, 2))
+            # Arrow head
+            d.add(_stroke(x + 10, 85, x + 5, 90, OPNSENSE_DARK, 2))
+            d.add(_stroke(x + 10, 85, x + 5, 80, OPNSENSE_DARK, 2))
+
+        # Labels
+        for x, text in (
+            (75, "Priority: 200000"),
+            (175, "Priority: 300000"),
+            (275, "Priority: 400000"),
+            (375, "Last Match"),
+        ):
+            d.add(_label(x, 45, text, "Helvetica", 8, DARK_GREY))
+        return d
+
+
+class VPNDiagram(Diagram):
+    """VPN tunnel illustration"""
+
+    def __init__(self, width=450, height=150):
+        Diagram.__init__(self, width, height)
+
+    @classmethod
+    def make_drawing(cls, width, height):
+        d = _panel(width, height)
+
+        # Site A and Site B
+        for x, name, subnet, color in (
+            (20, "Site A", "192.168.1.0/24", OPNSENSE_BLUE),
+            (330, "Site B", "192.168.2.0/24", OPNSENSE_GREEN),
+        ):
+            d.add(_box(x, 50, 100, 60, 5, color))
+            d.add(_label(x + 50, 85, name, "Helvetica-Bold", 10, WHITE))
+            d.add(_label(x + 50, 70, subnet, "Helvetica", 8, WHITE))
+
+        # VPN Tunnel (dashed line with lock)
+        d.add(_stroke(120, 80, 330, 80, OPNSENSE_ORANGE, 3, dash=[6, 3]))
+
+        # Lock icon (simplified)
+        d.add(_box(210, 70, 30, 25, 3, OPNSENSE_ORANGE))
+        d.add(_label(225, 77, "VPN", "Helvetica-Bold", 12, WHITE))
+
+        # Internet cloud above
+        d.add(_oval(180, 110, 270, 140, HexColor("#BDC3C7")))
+        d.add(_label(225, 120, "Internet", "Helvetica", 9, OPNSENSE_DARK))
+
+        # Title
+        d.add(
+            _label(
+                225, 20, "Site-to-Site VPN Tunnel", "Helvetica-Bold", 11, OPNSENSE_DARK
+            )
+        )
+        return d
+
+
+# Topology diagram geometry, in points
+TOPOLOGY_WIDTH = 450
+TOPOLOGY_MARGIN = 10
+TOPOLOGY_TITLE_HEIGHT = 30
+TOPOLOGY_NODE_HEIGHT = 40
+TOPOLOGY_NODE_MIN_WIDTH = 48
+TOPOLOGY_NODE_MAX_WIDTH = 100
+TOPOLOGY_NODE_GAP = 12
+TOPOLOGY_ROW_GAP = 30
+# Taller layouts are scaled down to this height so they fit on a page,
+# after first being laid out up to this many times wider than the diagram
+TOPOLOGY_MAX_HEIGHT = 600
+TOPOLOGY_MAX_SHRINK = 4
+TOPOLOGY_LABEL_SIZE = 9
+TOPOLOGY_MIN_LABEL_SIZE = 6
+
+# Fill color of each node kind; internet nodes are drawn as a cloud
+TOPOLOGY_NODE_COLORS = {
+    "internet": OPNSENSE_BLUE,
+    "firewall": OPNSENSE_ORANGE,
+    "network": OPNSENSE_GREEN,
+    "vlan": OPNSENSE_PURPLE,
+    "vpn": OPNSENSE_TEAL,
+    "host": DARK_GREY,
+}
+
+# Line color, width and dash pattern of each link kind
+TOPOLOGY_LINK_STYLES = {
+    "link": (DARK_GREY, 1.5, None),
+    "trunk": (OPNSENSE_DARK, 2.5, None),
+    "vpn": (OPNSENSE_ORANGE, 2, (6, 3)),
+}
+
+
+def _fit_label(text, font, width):
+    """Largest font size from TOPOLOGY_LABEL_SIZE down that fits `text` in
+    `width`, and the text, shortened with an ellipsis if even the smallest
+    size is too wide"""
+    for size in range(TOPOLOGY_LABEL_SIZE, TOPOLOGY_MIN_LABEL_SIZE - 1, -1):
+        if stringWidth(text, font, size) <= width:
+            return text, size
+    size = TOPOLOGY_MIN_LABEL_SIZE
+    while text and stringWidth(text + "…", font, size) > width:
+        text = text[:-1]
+    return text + "…", size
+
+
+class TopologyDiagram(Diagram):
+    """Network topology drawn from nodes and links with an automatic layout.
+
+    guide_topology.layer_graph() puts the nodes in layers, drawn as rows
+    that wrap when they are too long. The height follows from the layout;
+    graphs that would grow taller than TOPOLOGY_MAX_HEIGHT are laid out
+    wider and scaled down. `nodes` and `links` are as in guide_model.Topology.
+    """
+
+    def __init__(self, nodes, links=(), title=None, width=TOPOLOGY_WIDTH):
+        self.graph = topology.topology_graph(nodes, links)
+        for node in self.graph[0]:
+            if node.kind not in TOPOLOGY_NODE_COLORS:
+                raise ValueError(f"unknown topology node kind {node.kind!r}")
+        for link in self.graph[1]:
+            if link.kind not in TOPOLOGY_LINK_STYLES:
+                raise ValueError(f"unknown topology link kind {link.kind!r}")
+        self.title = title
+        self.layout_width = width
+        drawing, _ = self.rendered()
+        Diagram.__init__(self, drawing.width, drawing.height)
+
+    def params(self):
+        return (self.layout_width, *self.graph, self.title)
+
+    @staticmethod
+    def node_boxes(layers, width, top):
+        """(x, y, width, height) of every node, for a layout `top` points
+        below the upper edge; returns the boxes and the total height"""
+        usable = width - 2 * TOPOLOGY_MARGIN
+        per_row = max(
+            1,
+            int(
+                (usable + TOPOLOGY_NODE_GAP)
+                // (TOPOLOGY_NODE_MIN_WIDTH + TOPOLOGY_NODE_GAP)
+            ),
+        )
+        rows = [
+            layer[start : start + per_row]
+            for layer in layers
+            for start in range(0, len(layer), per_row)
+        ]
+        pitch = TOPOLOGY_NODE_HEIGHT + TOPOLOGY_ROW_GAP
+        height = top + len(rows) * pitch - TOPOLOGY_ROW_GAP + TOPOLOGY_MARGIN
+
+        boxes = {}
+        for number, row in enumerate(rows):
+            slot = usable / len(row)
+            box_width = min(TOPOLOGY_NODE_MAX_WIDTH, slot - TOPOLOGY_NODE_GAP)
+            y = height - top - number * pitch - TOPOLOGY_NODE_HEIGHT
+            for index, node in enumerate(row):
+                x = TOPOLOGY_MARGIN + (index + 0.5) * slot - box_width / 2
+                boxes[node] = (x, y, box_width, TOPOLOGY_NODE_HEIGHT)
+        return boxes, height
+
+    @classmethod
+    def make_drawing(cls, width, nodes, links, title):
+        layers = topology.layer_graph(nodes, links)
+        top = TOPOLOGY_TITLE_HEIGHT if title else TOPOLOGY_MARGIN
+        # Large graphs are laid out wider than the page and scaled down,
+        # which keeps more of each layer on one row than wrapping would
+        layout_width = width
+        boxes, height = cls.node_boxes(layers, layout_width, top)
+        while (
+            height * width / layout_width > TOPOLOGY_MAX_HEIGHT
+            and layout_width < width * TOPOLOGY_MAX_SHRINK
+        ):
+            layout_width += width / 2
+            boxes, height = cls.node_boxes(layers, layout_width, top)
+
+        d = _panel(layout_width, height)
+        if title:
+            d.add(
+                _label(
+                    layout_width / 2,
+                    height - 20,
+                    title,
+                    "Helvetica-Bold",
+                    11,
+                    OPNSENSE_DARK,
+                )
+            )
+
+        # Links first, so the nodes cover their ends
+        for link in links:
+            upper, lower = boxes[link.source], boxes[link.target]
+            if upper[1] < lower[1]:
+                upper, lower = lower, upper
+            color, line_width, dash = TOPOLOGY_LINK_STYLES[link.kind]
+            x1, y1 = upper[0] + upper[2] / 2, upper[1]
+            x2, y2 = lower[0] + lower[2] / 2, lower[1] + lower[3]
+            d.add(_stroke(x1, y1, x2, y2, color, line_width, dash and list(dash)))
+            if link.label:
+                d.add(
+                    _label(
+                        (x1 + x2) / 2 + 5,
+                        (y1 + y2) / 2 - 3,
+                        link.label,
+                        "Helvetica",
+                        8,
+                        OPNSENSE_DARK,
+                        anchor="start",
+                    )
+                )
+
+        for node in nodes:
+            x, y, box_width, box_height = boxes[node.id]
+            color = TOPOLOGY_NODE_COLORS[node.kind]
+            if node.kind == "internet":
+                d.add(_oval(x, y, x + box_width, y + box_height, color))
+            else:
+                d.add(_box(x, y, box_width, box_height, 5, color))
+            text, size = _fit_label(node.label, "Helvetica-Bold", box_width - 6)
+            middle = y + box_height / 2
+            if node.detail:
+                detail, detail_size = _fit_label(
+                    node.detail, "Helvetica", box_width - 6
+                )
+                detail_size = min(detail_size, size - 1)
+                d.add(
+                    _label(
+                        x + box_width / 2,
+                        middle + 1,
+                        text,
+                        "Helvetica-Bold",
+                        size,
+                        WHITE,
+                    )
+                )
+                d.add(
+                    _label(
+                        x + box_width / 2,
+                        middle - detail_size - 2,
+                        detail,
+                        "Helvetica",
+                        detail_size,
+                        WHITE,
+                    )
+                )
+            else:
+                d.add(
+                    _label(
+                        x + box_width / 2,
+                        middle - size * 0.35,
+                        text,
+                        "Helvetica-Bold",
+                        size,
+                        WHITE,
+                    )
+                )
+
+        scale = min(width / layout_width, TOPOLOGY_MAX_HEIGHT / height)
+        if scale < 1:
+            d.scale(scale, scale)
+            d.width, d.height = layout_width * scale, height * scale
+        return d
+
+
+# IconBox text metrics
+ICONBOX_FONT = "Helvetica"
+ICONBOX_FONT_SIZE = 10
+ICONBOX_TEXT_X = 45
+ICONBOX_RIGHT_PADDING = 15
+ICONBOX_LEADING = 14
+# Icons come from the embedded family: Helvetica has no check mark, cross
+# or star, and ZapfDingbats would not be embedded
+ICONBOX_ICON_FONT = fonts.FALLBACK_BOLD_FONT
+ICONBOX_ICON_SIZE = 12
+ICONBOX_ICONS = {
+    "info": (OPNSENSE_BLUE, "i"),
+    "warning": (OPNSENSE_ORANGE, "!"),
+    "tip": (OPNSENSE_GREEN, "\u2713"),
+    "danger": (OPNSENSE_RED, "\u2717"),
+    "note": (OPNSENSE_PURPLE, "\u2605"),
+}
+
+
+@functools.lru_cache(maxsize=4096)
+def _callout_text_width(text):
+    """Width of a word (or space) in the IconBox font, memoized across all boxes"""
+    return fonts.fallback_width(text, ICONBOX_FONT, ICONBOX_FONT_SIZE)
+
+
+@functools.lru_cache(maxsize=4096)
+def wrap_callout_text(text, max_width):
+    """Greedy width-based line wrapping for IconBox text.
+
+    Words wider than a whole line are broken between characters.
+    Returns a tuple of lines.
+    """
+    space = _callout_text_width(" ")
+    lines = []
+    current, current_width = [], 0.0
+    for word in text.split():
+        word_width = _callout_text_width(word)
+        if word_width > max_width:
+            # Break an over-long token (URLs, paths) across lines
+            if current:
+                lines.append(" ".join(current))
+                current, current_width = [], 0.0
+            piece = ""
+            for char in word:
+                if (
+                    piece
+                    and fonts.fallback_width(
+                        piece + char, ICONBOX_FONT, ICONBOX_FONT_SIZE
+                    )
+                    > max_width
+                ):
+                    lines.append(piece)
+                    piece = ""
+                piece += char
+            current, current_width = [piece], _callout_text_width(piece)
+        elif current and current_width + space + word_width > max_width:
+            lines.append(" ".join(current))
+            current, current_width = [word], word_width
+        else:
+            current_width += word_width + (space if current else 0)
+            current.append(word)
+    if current:
+        lines.append(" ".join(current))
+    return tuple(lines)
+
+
+class IconBox(Flowable):
+    """Colored info/warning/tip box with icon"""
+
+    def __init__(self, text, box_type="info", width=450, lines=None, continued=False):
+        Flowable.__init__(self)
+        self.text = text
+        self.box_type = box_type
+        self.box_width = width
+        self.box_height = 50
+        # Set on the pieces produced by split(): pre-wrapped lines, and
+        # whether this piece continues a box begun on an earlier page
+        self._lines = lines
+        self.continued = continued
+
+    def _wrap_lines(self, availWidth):
+        if self._lines is not None:
+            return self._lines
+        width = min(self.box_width, availWidth)
+        return wrap_callout_text(
+            self.text, width - ICONBOX_TEXT_X - ICONBOX_RIGHT_PADDING
+        )
+
+    def _height_for(self, num_lines):
+        height = 25 + num_lines * ICONBOX_LEADING
+        # The icon circle needs a little more room than one line of text
+        return height if self.continued else max(50, height)
+
+    def wrap(self, availWidth, availHeight):
+        self._wrapped_lines = self._wrap_lines(availWidth)
+        self.box_height = self._height_for(len(self._wrapped_lines))
+        return (self.box_width, self.box_height)
+
+    def split(self, availWidth, availHeight):
+        lines = self._wrap_lines(availWidth)
+        fits = int((availHeight - 25) // ICONBOX_LEADING)
+        # Leave at least two lines on each side of the break
+        if fits < 2 or len(lines) - fits < 2:
+            return []
+        return [
+            IconBox(
+                self.text, self.box_type, self.box_width, lines[:fits], self.continued
+            ),
+            IconBox(
+                self.text, self.box_type, self.box_width, lines[fits:], continued=True
+            ),
+        ]
+
+    def draw(self):
+        color, icon = ICONBOX_ICONS.get(self.box_type, ICONBOX_ICONS["info"])
+
+        # Background
+        self.canv.setFillColor(color)
+        self.canv.setFillAlpha(0.1)
+        self.canv.roundRect(0, 0, self.box_width, self.box_height, 5, fill=1, stroke=0)
+        self.canv.setFillAlpha(1)
+
+        # Left border
+        self.canv.setFillColor(color)
+        self.canv.rect(0, 0, 5, self.box_height, fill=1, stroke=0)
+
+        # Icon circle - only on the first piece of a split box
+        if not self.continued:
+            self.canv.circle(25, self.box_height - 20, 10, fill=1, stroke=0)
+            self.canv.setFillColor(WHITE)
+            fonts.register_fonts()
+            # All icons in a fixed order, so every chapter embeds one subset
+            fonts.reserve_glyphs(
+                ICONBOX_ICON_FONT,
+                "".join(icon for _, icon in ICONBOX_ICONS.values()),
+                self.canv,
+            )
+            self.canv.setFont(ICONBOX_ICON_FONT, ICONBOX_ICON_SIZE)
+            self.canv.drawCentredString(25, self.box_height - 24, icon)
+
+        # Text
+        self.canv.setFillColor(OPNSENSE_DARK)
+        self.canv.setFont(ICONBOX_FONT, ICONBOX_FONT_SIZE)
+
+        # Use pre-wrapped lines from wrap() method
+        lines = getattr(self, "_wrapped_lines", [self.text])
+
+        y_pos = self.box_height - 20
+        for line in lines:
+            fonts.draw_string(
+                self.canv, ICONBOX_TEXT_X, y_pos, line, ICONBOX_FONT, ICONBOX_FONT_SIZE
+            )
+            y_pos -= ICONBOX_LEADING
+
+
+class ChapterHeader(Flowable):
+    """Styled chapter header with number and decorative elements"""
+
+    def __init__(self, number, title, width=450, anchor=None):
+        Flowable.__init__(self)
+        self.number = number
+        self.title = title
+        self.width = width
+        self.height = 60
+        self.anchor = anchor
+
+    def draw(self):
+        if self.anchor:
+            title = f"{self.number}. {plain_text(self.title)}"
+            register_anchor(self.canv, self.anchor, self.height, title, 0)
+
+        # Number circle
+        self.canv.setFillColor(OPNSENSE_ORANGE)
+        self.canv.circle(30, 30, 25, fill=1, stroke=0)
+        self.canv.setFillColor(WHITE)
+        self.canv.setFont("Helvetica-Bold", 20)
+        self.canv.drawCentredString(30, 23, str(self.number))
+
+        # Title
+        self.canv.setFillColor(OPNSENSE_DARK)
+        self.canv.setFont("Helvetica-Bold", 22)
+        fonts.draw_string(self.canv, 65, 22, self.title, "Helvetica-Bold", 22)
+
+        # Decorative line
+        self.canv.setStrokeColor(OPNSENSE_ORANGE)
+        self.canv.setLineWidth(3)
+        self.canv.line(65, 10, self.width, 10)
+
+
+def register_anchor(canv, name, top, title=None, level=0):
+    """Make `name` a destination at height `top` of the flowable being drawn.
+
+    With a title the anchor also gets an entry at `level` in the document
+    outline (the viewer's bookmark panel). A GuideDocTemplate records the
+    page and position of every anchor; the table of contents, the named
+    destinations and the links between stitched chapters come from there.
+    """
+    canv.bookmarkHorizontal(name, 0, top)
+    if title is not None:
+        canv.addOutlineEntry(title, name, level, closed=level == 0)
+    doc = getattr(canv, "_doctemplate", None)
+    if hasattr(doc, "add_anchor"):
+        doc.add_anchor(name, canv.absolutePosition(0, top)[1])
+
+
+class AnchoredHeading(Paragraph):
+    """Heading paragraph that is a destination and an outline entry"""
+
+    def __init__(self, text, style, anchor=None, outline_level=1, **kwargs):
+        Paragraph.__init__(self, text, style, **kwargs)
+        self.anchor = anchor
+        self.outline_level = outline_level
+
+    def draw(self):
+        if self.anchor:
+            title = plain_text(self.text)
+            register_anchor(
+                self.canv, self.anchor, self.height, title, self.outline_level
+            )
+        Paragraph.draw(self)
+
+
+# Width kept free for the page numbers on the right of the TOC
+TOC_NUMBER_WIDTH = 36
+TOC_LEADER_GAP = 6
+
+
+class TOCLine(Flowable):
+    """Table of contents line: linked title, dot leader and page number.
+
+    The page number is looked up when the line is drawn, in the document's
+    page_numbers, so the TOC can be laid out before the page numbers are
+    known and drawn again with different numbers without changing layout.
+    """
+
+    def __init__(self, text, style, anchor):
+        Flowable.__init__(self)
+        self.para = Paragraph(text, style)
+        self.style = style
+        self.anchor = anchor
+
+    def wrap(self, availWidth, availHeight):
+        self.width = availWidth
+        _, self.height = self.para.wrap(availWidth - TOC_NUMBER_WIDTH, availHeight)
+        return self.width, self.height
+
+    def getSpaceBefore(self):
+        return self.para.getSpaceBefore()
+
+    def getSpaceAfter(self):
+        return self.para.getSpaceAfter()
+
+    def _text_end(self):
+        """x where the text of the last line ends"""
+        last = self.para.blPara.lines[-1]
+        extra = last[0] if isinstance(last, tuple) else last.extraSpace
+        return self.para.width - self.para.style.rightIndent - extra
+
+    def draw(self):
+        canv = self.canv
+        doc = getattr(canv, "_doctemplate", None)
+        self.para.drawOn(canv, 0, 0)
+
+        page = getattr(doc, "page_numbers", {}).get(self.anchor)
+        if page is not None:
+            lines = len(self.para.blPara.lines)
+            baseline = self.height - self.style.fontSize
+            baseline -= (lines - 1) * self.style.leading
+            label = str(page)
+            canv.setFillColor(self.style.textColor)
+            canv.setFont(self.style.fontName, self.style.fontSize)
+            canv.drawRightString(self.width, baseline, label)
+
+            label_x = self.width - stringWidth(
+                label, self.style.fontName, self.style.fontSize
+            )
+            start = self._text_end() + TOC_LEADER_GAP
+            end = label_x - TOC_LEADER_GAP
+            if end > start:
+                canv.saveState()
+                canv.setStrokeColor(DARK_GREY)
+                canv.setLineWidth(0.6)
+                canv.setDash(0.6, 2.4)
+                canv.line(start, baseline, end, baseline)
+                canv.restoreState()
+
+        canv.linkRect("", self.anchor, (0, 0, self.width, self.height), relative=1)
+
+
+# ============================================================================
+# CUSTOM PAGE TEMPLATES
+# ============================================================================
+
+
+# Logo path - relative to project root (official SVG, 262.7x77.6)
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+OPNSENSE_LOGO_PATH = os.path.join(PROJECT_ROOT, "assets", "opnsense-logo.svg")
+# Files read while rendering, besides the fonts; part of the build fingerprint
+RENDER_ASSETS = (OPNSENSE_LOGO_PATH,)
+
+# Name of the form XObject holding the logo
+LOGO_FORM = "OPNsenseLogo"
+
+_SVG_TRANSFORM = re.compile(r"(translate|scale|matrix)\s*\(([^)]*)\)")
+
+
+def _svg_transform(text):
+    """Affine matrix of an SVG transform attribute (translate, scale, matrix)"""
+    matrix = (1, 0, 0, 1, 0, 0)
+    for name, args in _SVG_TRANSFORM.findall(text or ""):
+        values = [float(value) for value in re.split(r"[\s,]+", args.strip())]
+        if name == "translate":
+            step = (1, 0, 0, 1, values[0], values[1] if len(values) > 1 else 0)
+        elif name == "scale":
+            step = (values[0], 0, 0, values[-1], 0, 0)
+        else:
+            step = tuple(values)
+        a, b, c, d, e, f = matrix
+        a2, b2, c2, d2, e2, f2 = step
+        matrix = (
+            a * a2 + c * b2,
+            b * a2 + d * b2,
+            a * c2 + c * d2,
+            b * c2 + d * d2,
+            a * e2 + c * f2 + e,
+            b * e2 + d * f2 + f,
+        )
+    return matrix
+
+
+def _svg_group(element, fill):
+    """Group for an SVG <g> or <svg> element; `fill` is the inherited fill"""
+    group = Group(transform=_svg_transform(element.get("transform")))
+    fill = element.get("fill", fill)
+    for child in element:
+        tag = child.tag.rpartition("}")[2]
+        if tag == "g":
+            group.add(_svg_group(child, fill))
+        elif tag == "path":
+            color = child.get("fill", fill)
+            path = SvgPath(
+                child.get("d"),
+                fillColor=None if color == "none" else HexColor(color),
+                strokeColor=None,
+                fillMode=FILL_NON_ZERO,
+            )
+            transform = child.get("transform")
+            group.add(Group(path, transform=_svg_transform(transform)))
+        elif tag not in ("title", "desc", "metadata"):
+            raise ValueError(f"unsupported SVG element <{tag}>")
+    return group
+
+
+@functools.lru_cache(maxsize=None)
+def load_svg(path):
+    """Drawing of an SVG file, read once per process and shared: render it
+    under _SHARED_DRAWING_LOCK.
+
+    Only what the logo assets use is understood: <g> and <path> elements
+    with solid fills and translate/scale/matrix transforms.
+    """
+    root = ElementTree.parse(path).getroot()
+    width, height = float(root.get("width")), float(root.get("height"))
+    left, top, box_width, box_height = (
+        float(value) for value in root.get("viewBox").replace(",", " ").split()
+    )
+    scale_x, scale_y = width / box_width, height / box_height
+    drawing = Drawing(width, height)
+    content = _svg_group(root, "#000000")
+    # SVG's y axis points down
+    content.transform = _svg_transform(
+        f"matrix({scale_x} 0 0 {-scale_y} {-left * scale_x} {height + top * scale_y})"
+        f" {root.get('transform', '')}"
+    )
+    drawing.add(content)
+    return drawing
+
+
+def draw_logo(canvas, x, y, width):
+    """Draw the OPNsense logo `width` points wide with its lower left corner at (x, y).
+
+    The logo is recorded as a form XObject the first time a document uses
+    it; every later placement, at any size, reuses that form.
+    """
+    logo = load_svg(OPNSENSE_LOGO_PATH)
+    if not canvas.hasForm(LOGO_FORM):
+        canvas.beginForm(LOGO_FORM, 0, 0, logo.width, logo.height)
+        with _SHARED_DRAWING_LOCK:
+            renderPDF.draw(logo, canvas, 0, 0)
+        canvas.endForm()
+    canvas.saveState()
+    canvas.translate(x, y)
+    canvas.scale(width / logo.width, width / logo.width)
+    canvas.doForm(LOGO_FORM)
+    canvas.restoreState()
+
+
+def create_cover_page(canvas, doc):
+    """Create a minimal, professional cover page"""
+    canvas.saveState()
+    width, height = canvas._pagesize
+    center_x = width / 2
+    # Title block is laid out for letter and kept centered on other sizes
+    shift = (height - letter[1]) / 2
+
+    # White background
+    canvas.setFillColor(WHITE)
+    canvas.rect(0, 0, width, height, fill=1, stroke=0)
+
+    # OPNsense Logo - centered in upper third
+    logo_width = 280
+    draw_logo(canvas, (width - logo_width) / 2, 520 + shift, logo_width)
+
+    # Title
+    canvas.setFillColor(OPNSENSE_DARK)
+    canvas.setFont("Helvetica-Bold", 28)
+    canvas.drawCentredString(center_x, 450 + shift, "User Guide")
+
+    # Thin orange line
+    canvas.setStrokeColor(OPNSENSE_ORANGE)
+    canvas.setLineWidth(2)
+    canvas.line(center_x - 76, 430 + shift, center_x + 76, 430 + shift)
+
+    # Subtitle
+    canvas.setFillColor(DARK_GREY)
+    canvas.setFont("Helvetica", 12)
+    canvas.drawCentredString(center_x, 400 + shift, "LLM-Optimized Reference")
+
+    # Version info at bottom
+    canvas.setFillColor(DARK_GREY)
+    canvas.setFont("Helvetica", 10)
+    canvas.drawCentredString(center_x, 120, "OPNsense 24.x")
+    canvas.drawCentredString(center_x, 105, "February 2026")
+
+    canvas.restoreState()
+
+
+def page_decorations(canvas, doc):
+    """Draw the static header and footer (everything but the page number)"""
+    canvas.saveState()
+    width, height = canvas._pagesize
+    right = width - 50
+
+    # Header - logo on left
+    draw_logo(canvas, 50, height - 22, 90)
+
+    # "User Guide" on right
+    canvas.setFillColor(OPNSENSE_DARK)
+    canvas.setFont("Helvetica", 10)
+    canvas.drawRightString(right, height - 14, "User Guide")
+
+    # Header line
+    canvas.setStrokeColor(OPNSENSE_ORANGE)
+    canvas.setLineWidth(2)
+    canvas.line(50, height - 27, right, height - 27)
+
+    # Footer line
+    canvas.setStrokeColor(LIGHT_GREY)
+    canvas.setLineWidth(1)
+    canvas.line(50, 40, right, 40)
+
+    # Footer text
+    canvas.setFillColor(DARK_GREY)
+    canvas.setFont("Helvetica", 9)
+    canvas.drawString(50, 25, "docs.opnsense.org")
+
+    canvas.restoreState()
+
+
+# Footer page number placement, shared with the stamping done by stitch_chapters()
+PAGE_NUMBER_FONT = "Helvetica"
+PAGE_NUMBER_SIZE = 9
+PAGE_NUMBER_RIGHT_MARGIN = 50
+PAGE_NUMBER_Y = 25
+
+
+def draw_page_number(canvas, page):
+    """Draw the footer page number"""
+    canvas.saveState()
+    canvas.setFillColor(OPNSENSE_DARK)
+    canvas.setFont(PAGE_NUMBER_FONT, PAGE_NUMBER_SIZE)
+    right = canvas._pagesize[0] - PAGE_NUMBER_RIGHT_MARGIN
+    canvas.drawRightString(right, PAGE_NUMBER_Y, f"Page {page}")
+    canvas.restoreState()
+
+
+# Name of the form XObject holding the static header/footer
+PAGE_CHROME_FORM = "PageChrome"
+
+
+def header_footer(canvas, doc):
+    """Add header and footer to each page.
+
+    The static part is recorded once per document as a form XObject and
+    reused by every page; only the page number is drawn per page.
+    """
+    if not canvas.hasForm(PAGE_CHROME_FORM):
+        canvas.beginForm(PAGE_CHROME_FORM)
+        page_decorations(canvas, doc)
+        canvas.endForm()
+    canvas.doForm(PAGE_CHROME_FORM)
+    draw_page_number(canvas, doc.page)
+
+
+# ============================================================================
+# STYLE DEFINITIONS
+# ============================================================================
+
+
+def get_styles():
+    """Create custom paragraph styles"""
+    # Paragraph markup from with_fallback_font() names the embedded family
+    fonts.register_fonts()
+    styles = getSampleStyleSheet()
+
+    styles.add(
+        ParagraphStyle(
+            name="CoverTitle",
+            fontName="Helvetica-Bold",
+            fontSize=36,
+            textColor=OPNSENSE_DARK,
+            alignment=TA_CENTER,
+            spaceAfter=20,
+        )
+    )
+
+    styles.add(
+        ParagraphStyle(
+            name="ChapterTitle",
+            fontName="Helvetica-Bold",
+            fontSize=24,
+            textColor=OPNSENSE_DARK,
+            spaceBefore=30,
+            spaceAfter=20,
+        )
+    )
+
+    styles.add(
+        ParagraphStyle(
+            name="SectionTitle",
+            fontName="Helvetica-Bold",
+            fontSize=16,
+            textColor=OPNSENSE_ORANGE,
+            spaceBefore=20,
+            spaceAfter=10,
+        )
+    )
+
+    styles.add(
+        ParagraphStyle(
+            name="SubSection",
+            fontName="Helvetica-Bold",
+            fontSize=13,
+            textColor=OPNSENSE_BLUE,
+            spaceBefore=15,
+            spaceAfter=8,
+        )
+    )
+
+    # Override existing BodyText style
+    styles["BodyText"].fontName = "Helvetica"
+    styles["BodyText"].fontSize = 11
+    styles["BodyText"].textColor = OPNSENSE_DARK
+    styles["BodyText"].alignment = TA_JUSTIFY
+    styles["BodyText"].spaceBefore = 6
+    styles["BodyText"].spaceAfter = 6
+    styles["BodyText"].leading = 14
+
+    styles.add(
+        ParagraphStyle(
+            name="BulletText",
+            fontName="Helvetica",
+            fontSize=10,
+            textColor=OPNSENSE_DARK,
+            leftIndent=20,
+            spaceBefore=3,
+            spaceAfter=3,
+        )
+    )
+
+    styles.add(
+        ParagraphStyle(
+            name="CodeText",
+            fontName="Courier",
+            fontSize=9,
+            textColor=HexColor("#2C3E50"),
+            backColor=HexColor("#F4F4F4"),
+            leftIndent=10,
+            spaceBefore=5,
+            spaceAfter=5,
+        )
+    )
+
+    styles.add(
+        ParagraphStyle(
+            name="TableHeader",
+            fontName="Helvetica-Bold",
+            fontSize=10,
+            textColor=WHITE,
+            alignment=TA_CENTER,
+        )
+    )
+
+    styles.add(
+        ParagraphStyle(
+            name="TableCell",
+            fontName="Helvetica",
+            fontSize=9,
+            textColor=OPNSENSE_DARK,
+            alignment=TA_LEFT,
+        )
+    )
+
+    styles.add(
+        ParagraphStyle(
+            name="TOCEntry",
+            fontName="Helvetica",
+            fontSize=12,
+            textColor=OPNSENSE_DARK,
+            leftIndent=20,
+            spaceBefore=8,
+            spaceAfter=4,
+        )
+    )
+
+    styles.add(
+        ParagraphStyle(
+            name="TOCChapter",
+            fontName="Helvetica-Bold",
+            fontSize=14,
+            textColor=OPNSENSE_ORANGE,
+            spaceBefore=15,
+            spaceAfter=5,
+        )
+    )
+
+    styles.add(
+        ParagraphStyle(
+            name="TOCSection",
+            fontName="Helvetica",
+            fontSize=10,
+            leading=13,
+            textColor=OPNSENSE_DARK,
+            leftIndent=36,
+            spaceBefore=2,
+        )
+    )
+
+    return styles
+
+
+# ============================================================================
+# CONTENT BUILDING FUNCTIONS
+# ============================================================================
+
+
+class _SharedTableStyle(TableStyle):
+    """A TableStyle shared by many tables, so it must never change in place"""
+
+    def add(self, *cmd):
+        raise TypeError(
+            "the house table style is shared by every table; "
+            "use TableStyle(extra_commands, parent=HOUSE_TABLE_STYLE) instead"
+        )
+
+
+# Built once and applied to every table in the guide
+HOUSE_TABLE_STYLE = _SharedTableStyle(
+    [
+        # Header row
+        ("BACKGROUND", (0, 0), (-1, 0), OPNSENSE_ORANGE),
+        ("TEXTCOLOR", (0, 0), (-1, 0), WHITE),
+        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("FONTSIZE", (0, 0), (-1, 0), 10),
+        ("ALIGN", (0, 0), (-1, 0), "CENTER"),
+        ("BOTTOMPADDING", (0, 0), (-1, 0), 10),
+        ("TOPPADDING", (0, 0), (-1, 0), 10),
+        # Data rows
+        ("BACKGROUND", (0, 1), (-1, -1), WHITE),
+        ("TEXTCOLOR", (0, 1), (-1, -1), OPNSENSE_DARK),
+        ("FONTNAME", (0, 1), (-1, -1), "Helvetica"),
+        ("FONTSIZE", (0, 1), (-1, -1), 9),
+        ("ALIGN", (0, 1), (-1, -1), "LEFT"),
+        ("BOTTOMPADDING", (0, 1), (-1, -1), 8),
+        ("TOPPADDING", (0, 1), (-1, -1), 8),
+        # Alternating row colors
+        ("ROWBACKGROUNDS", (0, 1), (-1, -1), [WHITE, HexColor("#F8F9FA")]),
+        # Grid
+        ("GRID", (0, 0), (-1, -1), 0.5, HexColor("#BDC3C7")),
+        ("BOX", (0, 0), (-1, -1), 1.5, OPNSENSE_ORANGE),
+        # Padding
+        ("LEFTPADDING", (0, 0), (-1, -1), 8),
+        ("RIGHTPADDING", (0, 0), (-1, -1), 8),
+        # Keep short cells level with neighbours that wrap
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+    ]
+)
+
+# Tables with more rows than this (header included) are laid out as a
+# LongTable, which splits across pages in linear time
+LONG_TABLE_ROWS = 20
+
+# Width given to tables without explicit col_widths - the house table width
+TABLE_WIDTH = 440
+# LEFTPADDING + RIGHTPADDING from HOUSE_TABLE_STYLE
+TABLE_CELL_PADDING = 16
+TABLE_HEADER_FONT = ("Helvetica-Bold", 10)
+TABLE_BODY_FONT = ("Helvetica", 9)
+
+
+# Bounded so that long generated documents do not keep every cell's text
+# alive; the guide itself has about 1,500 distinct cells
+@functools.lru_cache(maxsize=4096)
+def measure_cell_text(text, font_name, font_size):
+    """Return (natural width, widest word) of a table cell's text, cached by text"""
+    natural = 0.0
+    widest_word = 0.0
+    for line in text.split("\n"):
+        natural = max(natural, fonts.fallback_width(line, font_name, font_size))
+        for word in line.split():
+            widest_word = max(
+                widest_word, fonts.fallback_width(word, font_name, font_size)
+            )
+    return natural, widest_word
+
+
+@functools.lru_cache(maxsize=None)
+def _table_paragraph_styles():
+    """(header, body) paragraph styles used for cells that need wrapping"""
+    styles = get_styles()
+    return styles["TableHeader"], styles["TableCell"]
+
+
+def fit_column_widths(data, max_width=TABLE_WIDTH):
+    """Compute column widths from the cell contents.
+
+    Columns get their natural width when everything fits in max_width.
+    Otherwise each column keeps room for its widest word, and the remaining
+    space is shared in proportion to how much more each column would like.
+    Flowables cannot be measured before layout, so columns holding any
+    (or no cells at all) get an even share of max_width, and the text
+    columns are fitted into the rest.
+    """
+    num_cols = max((len(row) for row in data), default=0)
+    natural = [0.0] * num_cols
+    minimum = [0.0] * num_cols
+    measured = [False] * num_cols
+    flowables = [False] * num_cols
+    for row_index, row in enumerate(data):
+        font = TABLE_HEADER_FONT if row_index == 0 else TABLE_BODY_FONT
+        for col, cell in enumerate(row):
+            if not isinstance(cell, (str, int, float)):
+                flowables[col] = True
+                continue
+            text_width, word_width = measure_cell_text(str(cell), *font)
+            natural[col] = max(natural[col], text_width + TABLE_CELL_PADDING)
+            minimum[col] = max(minimum[col], word_width + TABLE_CELL_PADDING)
+            measured[col] = True
+
+    even = max_width / num_cols if num_cols else 0.0
+    cols = [col for col in range(num_cols) if measured[col] and not flowables[col]]
+    fitted = _fit_widths(
+        [natural[col] for col in cols],
+        [minimum[col] for col in cols],
+        max_width - even * (num_cols - len(cols)),
+    )
+    widths = [even] * num_cols
+    for col, width in zip(cols, fitted):
+        widths[col] = width
+    return widths
+
+
+def _fit_widths(natural, minimum, max_width):
+    """Natural widths when they fit in max_width, else the minimum widths
+    plus a share of the remaining space"""
+    if sum(natural) <= max_width:
+        return natural
+    if sum(minimum) >= max_width:
+        scale = max_width / sum(minimum)
+        return [width * scale for width in minimum]
+
+    slack = max_width - sum(minimum)
+    wanted = [n - m for n, m in zip(natural, minimum)]
+    total_wanted = sum(wanted)
+    return [m + slack * w / total_wanted for m, w in zip(minimum, wanted)]
+
+
+def _wrap_long_cells(data, col_widths):
+    """Replace text cells wider than their column, or with characters no
+    standard font has, with wrapping Paragraphs"""
+    header_style, body_style = _table_paragraph_styles()
+    wrapped = []
+    for row_index, row in enumerate(data):
+        font, style = (
+            (TABLE_HEADER_FONT, header_style)
+            if row_index == 0
+            else (TABLE_BODY_FONT, body_style)
+        )
+        new_row = []
+        for col, cell in enumerate(row):
+            if isinstance(cell, (str, int, float)):
+                text = str(cell)
+                if measure_cell_text(text, *font)[0] + TABLE_CELL_PADDING > col_widths[
+                    col
+                ] or fonts.needs_fallback(text):
+                    paragraph = Paragraph(
+                        fonts.with_fallback_font(escape(text).replace("\n", "<br/>")),
+                        style,
+                    )
+                    # Keep the destination or link of a CellText
+                    paragraph.anchor = getattr(cell, "anchor", None)
+                    paragraph.link = getattr(cell, "link", None)
+                    cell = paragraph
+            new_row.append(cell)
+        wrapped.append(new_row)
+    return wrapped
+
+
+class CellText(str):
+    """Table cell text that is a destination (`anchor`) or links to one (`link`)"""
+
+    anchor = None
+    link = None
+
+
+class _CellAnchors:
+    """Table mixin that makes CellText cells destinations and links.
+
+    Anchors ride along in the cell values, so they survive when ReportLab
+    splits the table across pages.
+    """
+
+    def _drawCell(self, cellval, cellstyle, pos, size):
+        x, y = pos
+        width, height = size
+        # Wrapped cells arrive as a tuple of flowables (see _wrap_long_cells())
+        cell = cellval[0] if isinstance(cellval, (tuple, list)) else cellval
+        if getattr(cell, "anchor", None):
+            register_anchor(self.canv, cell.anchor, y + height)
+        if getattr(cell, "link", None):
+            rect = (x, y, x + width, y + height)
+            self.canv.linkRect("", cell.link, rect, relative=1)
+        super()._drawCell(cellval, cellstyle, pos, size)
+
+
+class GuideTable(_CellAnchors, Table):
+    pass
+
+
+class GuideLongTable(_CellAnchors, LongTable):
+    pass
+
+
+def create_styled_table(data, col_widths=None):
+    """Create a professionally styled table.
+
+    Without col_widths the columns are sized to their contents (see
+    fit_column_widths()). Cells too wide for their column wrap onto several
+    lines, and the header row is repeated whenever the table splits across
+    pages.
+    """
+    if col_widths is None:
+        col_widths = fit_column_widths(data)
+
+    table_class = GuideLongTable if len(data) > LONG_TABLE_ROWS else GuideTable
+    return table_class(
+        _wrap_long_cells(data, col_widths),
+        colWidths=col_widths,
+        style=HOUSE_TABLE_STYLE,
+        repeatRows=1,
+    )
+
+
+# ============================================================================
+# RENDERER - DOCUMENT MODEL TO FLOWABLES
+# ============================================================================
+
+# Key of the build unit holding the cover page and table of contents
+FRONT_MATTER = "front"
+
+DIAGRAMS = {
+    "network": NetworkDiagram,
+    "firewall_rules": FirewallRulesDiagram,
+    "vpn": VPNDiagram,
+}
+
+# PNG exports are rendered at this resolution
+DIAGRAM_PNG_DPI = 144
+
+
+def export_diagram(diagram, fmt="svg", cache_dir=None):
+    """Path of an SVG or PNG file of a Diagram, for HTML and preview outputs.
+
+    Files are named after the diagram's content hash in `cache_dir` (by
+    default .cache/user-guide/diagrams), so each distinct diagram is
+    rendered once and identical ones share a file. PNG needs ReportLab's
+    rlPyCairo backend.
+    """
+    if fmt not in ("svg", "png"):
+        raise ValueError(f"unknown diagram format {fmt!r}")
+    drawing, digest = diagram.rendered()
+    cache_dir = cache_dir or DIAGRAM_CACHE_DIR
+    path = os.path.join(cache_dir, f"{digest}.{fmt}")
+    if os.path.exists(path):
+        return path
+
+    with _SHARED_DRAWING_LOCK:
+        if fmt == "svg":
+            data = renderSVG.drawToString(drawing).encode("utf-8")
+        else:
+            try:
+                data = renderPM.drawToString(drawing, fmt="PNG", dpi=DIAGRAM_PNG_DPI)
+            except RenderPMError as e:
+                raise RuntimeError("PNG export needs the rlPyCairo package") from e
+    os.makedirs(cache_dir, exist_ok=True)
+    temp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp, "wb") as fh:
+        fh.write(data)
+    os.replace(temp, path)
+    return path
+
+
+def export_diagrams(guide, directory, fmt="svg"):
+    """Write every diagram of the guide to `directory` as SVG or PNG files.
+
+    Files are named after the JSONL section the diagram is in and its kind,
+    e.g. 4.2-firewall_rules.svg; returns their paths.
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for chapter in guide.chapters:
+        index = 0
+        for block in model.iter_blocks(chapter.blocks):
+            if isinstance(block, model.Heading) and block.level == 1:
+                index += 1
+                continue
+            if isinstance(block, model.Diagram):
+                diagram, kind = DIAGRAMS[block.kind](), block.kind
+            elif isinstance(block, model.Topology):
+                diagram = TopologyDiagram(block.nodes, block.links, block.title)
+                kind = "topology"
+            else:
+                continue
+            stem = f"{chapter.key}.{index}-{kind}"
+            path = os.path.join(directory, f"{stem}.{fmt}")
+            number = 1
+            while path in paths:
+                number += 1
+                path = os.path.join(directory, f"{stem}-{number}.{fmt}")
+            shutil.copyfile(export_diagram(diagram, fmt), path)
+            paths.append(path)
+    return paths
+
+
+def chapter_anchor(key):
+    """Destination name of a chapter header"""
+    return f"chapter-{key}"
+
+
+def section_anchor(key, index):
+    """Destination name of a chapter's index-th section (numbered from 1 like
+    the section ids of the JSONL export)"""
+    return f"section-{key}.{index}"
+
+
+def reference_anchor(term):
+    """Destination name of a tool or API endpoint row in a reference table"""
+    if term.startswith("/"):
+        return "endpoint" + re.sub(r"[^A-Za-z0-9_.]+", "-", term).rstrip("-")
+    return f"tool-{term}"
+
+
+# Reference tables are recognised by the heading of their first column;
+# only MCP tool names and API paths in it are link targets (Chapter 12's
+# "Tool" table lists GUI pages)
+REFERENCE_COLUMNS = ("Tool", "Endpoint")
+_REFERENCE_TERM = re.compile(r"opnsense_\w+|/api(?:/[\w{}]+)+")
+_MENTION = re.compile(rf"(?<![\w/])(?:{_REFERENCE_TERM.pattern})(?![\w/])")
+
+
+def reference_targets(guide):
+    """Map every tool name and API endpoint with a reference table row to the
+    id of that table. When a tool is listed in several tables, the last one
+    wins: the complete reference at the end of Chapter 13."""
+    targets = {}
+    for chapter in guide.chapters:
+        for block in model.iter_blocks(chapter.blocks):
+            if (
+                isinstance(block, model.Table)
+                and block.id
+                and block.rows[0][0] in REFERENCE_COLUMNS
+            ):
+                for row in block.rows[1:]:
+                    if _REFERENCE_TERM.fullmatch(row[0]):
+                        targets[row[0]] = block.id
+    return targets
+
+
+_MARKUP = re.compile(r"(<[^>]*>)")
+
+
+class AnchorPlan:
+    """Hands out destinations and links while one chapter is compiled.
+
+    Section and subsection titles get anchors in order; mentions of tools
+    and API endpoints from `references` (see reference_targets()) link to
+    their reference table row.
+    """
+
+    def __init__(self, key, references=None):
+        self.key = key
+        self.references = references or {}
+        self.section = 0
+        self.subsection = 0
+
+    def heading(self, level):
+        """(anchor name, outline level) for the next heading of this level"""
+        if level == 1:
+            self.section += 1
+            self.subsection = 0
+            return section_anchor(self.key, self.section), 1
+        self.subsection += 1
+        name = f"{section_anchor(self.key, self.section)}.{self.subsection}"
+        return name, 2 if self.section else 1
+
+    def link_mentions(self, markup):
+        """Wrap mentions of reference terms in paragraph markup in links"""
+        if not self.references:
+            return markup
+
+        def link(match):
+            term = match.group(0)
+            if term not in self.references:
+                return term
+            return f'<a href="#{reference_anchor(term)}">{term}</a>'
+
+        parts = _MARKUP.split(markup)
+        parts[::2] = [_MENTION.sub(link, text) for text in parts[::2]]
+        return "".join(parts)
+
+    def table_rows(self, table):
+        """The table's rows with reference cells turned into CellText"""
+        rows = [table.rows[0]]
+        is_reference = table.rows[0][0] in REFERENCE_COLUMNS
+        for row in table.rows[1:]:
+            cells = []
+            for col, text in enumerate(row):
+                target = self.references.get(text)
+                if target is not None:
+                    text = CellText(text)
+                    if col == 0 and is_reference and target == table.id:
+                        text.anchor = reference_anchor(text)
+                    else:
+                        text.link = reference_anchor(text)
+                cells.append(text)
+            rows.append(cells)
+        return rows
+
+
+def compile_blocks(blocks, styles, anchors=None):
+    """Compile guide_model blocks into ReportLab flowables.
+
+    With an AnchorPlan, headings become destinations and outline entries,
+    and tools and endpoints mentioned in the text link to their reference.
+    """
+    link = anchors.link_mentions if anchors is not None else str
+    text = fonts.with_fallback_font
+    flowables = []
+    for block in blocks:
+        if isinstance(block, model.Paragraph):
+            flowables.append(Paragraph(text(link(block.text)), styles["BodyText"]))
+        elif isinstance(block, model.Heading):
+            style = styles["SectionTitle" if block.level == 1 else "SubSection"]
+            if anchors is None:
+                flowables.append(Paragraph(text(block.text), style))
+            else:
+                name, level = anchors.heading(block.level)
+                flowables.append(AnchoredHeading(text(block.text), style, name, level))
+        elif isinstance(block, model.BulletList):
+            for item in block.items:
+                item = link(item)
+                item = f"{block.marker} {item}" if block.marker else item
+                flowables.append(Paragraph(text(item), styles["BulletText"]))
+        elif isinstance(block, model.Table):
+            rows = anchors.table_rows(block) if anchors is not None else block.rows
+            flowables.append(create_styled_table(rows, block.col_widths))
+        elif isinstance(block, model.Callout):
+            flowables.append(IconBox(block.text, block.kind))
+        elif isinstance(block, model.Diagram):
+            flowables.append(DIAGRAMS[block.kind]())
+        elif isinstance(block, model.Topology):
+            flowables.append(TopologyDiagram(block.nodes, block.links, block.title))
+        elif isinstance(block, model.Spacer):
+            flowables.append(Spacer(1, block.height))
+        elif isinstance(block, model.PageBreak):
+            flowables.append(PageBreak())
+        elif isinstance(block, model.Rule):
+            flowables.append(
+                HRFlowable(
+                    width="100%", thickness=block.thickness, color=OPNSENSE_ORANGE
+                )
+            )
+        elif isinstance(block, model.KeepTogether):
+            flowables.append(
+                KeepTogether(compile_blocks(block.blocks, styles, anchors))
+            )
+        else:
+            raise TypeError(f"unsupported block: {block!r}")
+    return flowables
+
+
+def compile_chapter(chapter, styles, references=None):
+    """Flowables for one chapter or appendix, starting with its header.
+
+    `references` are the link targets from reference_targets().
+    """
+    header = ChapterHeader(
+        chapter.key, chapter.title, anchor=chapter_anchor(chapter.key)
+    )
+    story = [header, Spacer(1, 20)]
+    anchors = AnchorPlan(chapter.key, references)
+    story.extend(compile_blocks(chapter.blocks, styles, anchors))
+    return story
+
+
+def toc_entries(guide):
+    """(level, anchor, title, summary) for every line of the table of contents.
+
+    Level 0 lines are chapters, with their summary; level 1 lines are their
+    sections, with a summary of None.
+    """
+    entries = []
+    for chapter in guide.chapters:
+        title = f"<b>{chapter.key}.</b> {chapter.toc_title or chapter.title}"
+        entries.append((0, chapter_anchor(chapter.key), title, chapter.summary))
+        index = 0
+        for block in model.iter_blocks(chapter.blocks):
+            if isinstance(block, model.Heading) and block.level == 1:
+                index += 1
+                anchor = section_anchor(chapter.key, index)
+                entries.append((1, anchor, block.text, None))
+    return entries
+
+
+CONTENTS_ANCHOR = "contents"
+
+
+def compile_front_matter(guide, styles):
+    """Cover page placeholder and table of contents"""
+    # Cover page - drawn separately with canvas by create_cover_page()
+    story = [PageBreak()]
+
+    story.append(
+        AnchoredHeading("Table of Contents", styles["ChapterTitle"], CONTENTS_ANCHOR, 0)
+    )
+    story.append(Spacer(1, 20))
+    for level, anchor, title, summary in toc_entries(guide):
+        if level == 0:
+            story.append(TOCLine(title, styles["TOCChapter"], anchor))
+            story.append(Paragraph(f"     {summary}", styles["TOCEntry"]))
+        else:
+            story.append(TOCLine(title, styles["TOCSection"], anchor))
+
+    return story
+
+
+def unit_keys(guide, front_matter=True):
+    """Build units in document order. Every unit starts on a fresh page, so
+    each one can be laid out and rendered without knowing about the others."""
+    keys = [chapter.key for chapter in guide.chapters]
+    return [FRONT_MATTER] + keys if front_matter else keys
+
+
+def compile_unit(guide, key, styles):
+    """Flowables for one build unit"""
+    if key == FRONT_MATTER:
+        return compile_front_matter(guide, styles)
+    return compile_chapter(guide.chapter(key), styles, reference_targets(guide))
+
+
+def iter_story(styles, guide=None, front_matter=True):
+    """Yield the flowables of the whole guide one build unit at a time.
+
+    Each unit is compiled only when the previous one has been consumed.
+    """
+    guide = guide or model.load_guide()
+    for index, key in enumerate(unit_keys(guide, front_matter)):
+        flowables = compile_unit(guide, key, styles)
+        if index:
+            flowables.insert(0, PageBreak())
+        yield flowables
+
+
+def build_story(styles, guide=None, front_matter=True):
+    """Assemble the flowables for the whole guide"""
+    return [
+        flowable
+        for flowables in iter_story(styles, guide, front_matter)
+        for flowable in flowables
+    ]
+
+
+class StoryStream(list):
+    """Story list for doc.build() that is filled from an iterator of chunks.
+
+    doc.build() takes flowables off the front of its list and checks the
+    length before each one, so the next chunk is only pulled in once the
+    previous chunk has been laid out and drawn, and drawn flowables are
+    released as their pages are emitted. Peak memory then holds one chunk
+    (a chapter) instead of the whole story.
+    """
+
+    def __init__(self, chunks):
+        super().__init__()
+        self._chunks = iter(chunks)
+
+    def __len__(self):
+        while not list.__len__(self):
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self.extend(chunk)
+        return list.__len__(self)
+
+
+# ============================================================================
+# DOCUMENT ASSEMBLY & INCREMENTAL BUILD CACHE
+# ============================================================================
+
+PAGE_SIZES = {"letter": letter, "a4": A4}
+PAGE_SIZE = letter
+PAGE_MARGINS = {
+    "rightMargin": 50,
+    "leftMargin": 50,
+    "topMargin": 60,
+    "bottomMargin": 60,
+}
+
+# Rendered chapters live here between builds (ignored by git)
+BUILD_CACHE_DIR = os.path.join(PROJECT_ROOT, ".cache", "user-guide")
+BUILD_CACHE_MAX_ENTRIES = 200
+
+# SVG/PNG renderings of the diagrams, see export_diagram()
+DIAGRAM_CACHE_DIR = os.path.join(BUILD_CACHE_DIR, "diagrams")
+
+# Bump when the cache layout or the stitching logic changes
+BUILD_CACHE_VERSION = 4
+
+# Modules whose code decides how a chapter renders. Their whole source is
+# hashed, so a change anywhere in them (comments included) invalidates the
+# cache rather than risking a stale chapter
+RENDERER_MODULES = (
+    "guide_pdf",
+    "guide_fonts",
+    "guide_topology",
+    "guide_export",
+    "guide_model",
+)
+
+
+def _digest(*parts):
+    """SHA-256 over the repr of each part"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(repr(part).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _module_source(name):
+    """Source bytes of the imported module `name`"""
+    with open(sys.modules[name].__file__, "rb") as fh:
+        return fh.read()
+
+
+def _file_digest(path):
+    """SHA-256 of a file's bytes, read afresh on every call"""
+    with open(path, "rb") as fh:
+        return hashlib.sha256(fh.read()).hexdigest()
+
+
+def build_fingerprint(styles, pagesize=PAGE_SIZE):
+    """Hash of everything shared by all chapters: styles, renderer source,
+    fonts, the other assets drawn and page geometry"""
+    style_attrs = [
+        (name, [(attr, getattr(style, attr, None)) for attr in sorted(style.defaults)])
+        for name, style in sorted(styles.byName.items())
+    ]
+    return _digest(
+        BUILD_CACHE_VERSION,
+        reportlab.Version,
+        sys.version_info[:2],
+        style_attrs,
+        HOUSE_TABLE_STYLE.getCommands(),
+        [
+            (name, fonts._font_digest(os.path.join(fonts.FONT_DIR, filename)))
+            for name, filename in sorted(fonts.FONT_FILES.items())
+        ],
+        [hashlib.sha256(_module_source(name)).hexdigest() for name in RENDERER_MODULES],
+        [_file_digest(path) for path in RENDER_ASSETS],
+        tuple(pagesize),
+        sorted(PAGE_MARGINS.items()),
+    )
+
+
+def chapter_key(guide, key, fingerprint):
+    """Cache key for one build unit: its content plus the shared build fingerprint"""
+    if key == FRONT_MATTER:
+        content = toc_entries(guide)
+    else:
+        # Links to reference tables depend on which chapters are built
+        targets = sorted(reference_targets(guide).items())
+        content = (model.to_dict(guide.chapter(key)), targets)
+    return _digest(fingerprint, key, content)
+
+
+class ChapterCache:
+    """On-disk store of rendered build units, keyed by content hash.
+
+    Each entry is the unit's PDF plus a JSON file with its page count,
+    anchor positions and links (see RenderedUnit); entries holding only
+    JSON are layout hints.
+    """
+
+    def __init__(self, directory=BUILD_CACHE_DIR, max_entries=BUILD_CACHE_MAX_ENTRIES):
+        self.directory = directory
+        self.max_entries = max_entries
+
+    def _path(self, key, ext):
+        return os.path.join(self.directory, f"{key}{ext}")
+
+    def _read(self, key, ext):
+        path = self._path(key, ext)
+        with open(path, "rb") as fh:
+            data = fh.read()
+        os.utime(path)  # keep recently used entries when pruning
+        return data
+
+    def _write(self, key, ext, data):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key, ext)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp_path, path)
+
+    def load_meta(self, key):
+        """Return the JSON data stored for key, or None on a miss"""
+        try:
+            return json.loads(self._read(key, ".json"))
+        except (OSError, ValueError):
+            return None
+
+    def store_meta(self, key, meta):
+        self._write(key, ".json", json.dumps(meta).encode("utf-8"))
+
+    def load(self, key):
+        """Return the cached RenderedUnit for key, or None on a miss"""
+        meta = self.load_meta(key)
+        if meta is None:
+            return None
+        try:
+            return RenderedUnit.from_meta(self._read(key, ".pdf"), meta)
+        except OSError:
+            return None
+
+    def store(self, key, unit):
+        self._write(key, ".pdf", unit.pdf)
+        self.store_meta(key, unit.meta())
+
+    def prune(self):
+        """Drop the least recently used entries beyond max_entries"""
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        used = {}
+        for name in names:
+            key, ext = os.path.splitext(name)
+            if ext in (".pdf", ".json"):
+                mtime = os.path.getmtime(os.path.join(self.directory, name))
+                used[key] = max(used.get(key, 0), mtime)
+        stale = sorted(used, key=used.get, reverse=True)[self.max_entries :]
+        for key in stale:
+            for ext in (".pdf", ".json"):
+                with contextlib.suppress(OSError):
+                    os.remove(self._path(key, ext))
+
+
+@dataclass
+class RenderedUnit:
+    """A build unit rendered as a PDF of its own"""
+
+    pdf: bytes
+    pages: int
+    # Anchor name -> (page within the unit, counted from 1; y of its top)
+    anchors: Dict[str, Tuple[int, float]] = field(default_factory=dict)
+    # Table of contents links to other units: (page, rect, anchor name)
+    links: List[Tuple[int, Tuple[float, ...], str]] = field(default_factory=list)
+    # Page numbers the unit's table of contents was drawn with
+    page_numbers: Dict[str, int] = field(default_factory=dict)
+
+    def meta(self):
+        return {
+            "pages": self.pages,
+            "anchors": self.anchors,
+            "links": self.links,
+            "page_numbers": self.page_numbers,
+        }
+
+    @classmethod
+    def from_meta(cls, pdf, meta):
+        return cls(
+            pdf=pdf,
+            pages=meta["pages"],
+            anchors={name: tuple(place) for name, place in meta["anchors"].items()},
+            links=[(page, tuple(rect), name) for page, rect, name in meta["links"]],
+            page_numbers=meta["page_numbers"],
+        )
+
+
+class GuideDocTemplate(SimpleDocTemplate):
+    """SimpleDocTemplate that keeps track of anchors and table of contents links.
+
+    `page_numbers` maps anchor names to the page numbers printed in the
+    table of contents. With local_links the TOC links to its targets
+    directly; otherwise the targets are in other build units and the links
+    are collected in `links` for stitch_chapters().
+    """
+
+    def __init__(self, filename, page_numbers=None, local_links=True, **kwargs):
+        SimpleDocTemplate.__init__(self, filename, **kwargs)
+        self.page_numbers = page_numbers or {}
+        self.local_links = local_links
+        self.anchors = {}
+        self.links = []
+        self._dests = None
+
+    def beforeDocument(self):
+        # The outline opens in the viewer's side panel
+        self.canv.showOutline()
+        if self.local_links:
+            # ReportLab resolves destinations only for its own links; list
+            # them in the catalog so other documents can link to them by name
+            self._dests = PDFDictionary()
+            self.canv._doc._catalog.Dests = self._dests
+
+    def add_anchor(self, name, top):
+        """Record the page and absolute height of a destination"""
+        self.anchors[name] = (self.canv.getPageNumber(), top)
+        if self._dests is not None:
+            self._dests[name] = self.canv._bookmarkReference(name)
+
+    def build(self, flowables, onFirstPage=_doNothing, onLaterPages=_doNothing):
+        canvasmaker = canvas.Canvas if self.local_links else _LinkRecorder
+        SimpleDocTemplate.build(
+            self, flowables, onFirstPage, onLaterPages, canvasmaker=canvasmaker
+        )
+
+
+class _LinkRecorder(canvas.Canvas):
+    """Canvas that collects internal links instead of annotating them.
+
+    Used when the link targets are in other build units: the links are
+    added by stitch_chapters() once every unit's pages are in place.
+    """
+
+    def linkRect(self, contents, destinationname, Rect=None, relative=1, **kwargs):
+        self._doctemplate.links.append(
+            (self.getPageNumber(), self._absRect(Rect, relative), destinationname)
+        )
+
+
+def render_chapter(guide, key, styles, pagesize=PAGE_SIZE, page_numbers=None):
+    """Lay out and render a single build unit, returning a RenderedUnit.
+
+    The header, footer and page number are left off; stitch_chapters() adds
+    them once the final position of every page is known. `page_numbers`
+    is only used by the front matter, for its table of contents.
+    """
+    buffer = io.BytesIO()
+    doc = GuideDocTemplate(
+        buffer,
+        page_numbers=page_numbers,
+        local_links=False,
+        pagesize=pagesize,
+        **PAGE_MARGINS,
+    )
+    flowables = compile_unit(guide, key, styles)
+    if key == FRONT_MATTER:
+        doc.build(flowables, onFirstPage=create_cover_page)
+    else:
+        doc.build(flowables)
+    return RenderedUnit(
+        pdf=buffer.getvalue(),
+        pages=doc.page,
+        anchors=doc.anchors,
+        links=doc.links,
+        page_numbers=dict(page_numbers or {}),
+    )
+
+
+def page_numbers(units, front_pages=0):
+    """Printed page number of every anchor in the chapter units, in order.
+
+    Pages are numbered from the cover, so the front matter's page count
+    shifts every chapter.
+    """
+    numbers = {}
+    offset = front_pages
+    for unit in units:
+        for name, (page, _top) in unit.anchors.items():
+            numbers[name] = offset + page
+        offset += unit.pages
+    return numbers
+
+
+def render_front_matter(guide, styles, chapters, pagesize=PAGE_SIZE, hint=None):
+    """Render the cover and table of contents once the chapters are rendered.
+
+    The page numbers depend on how many pages the contents take, which is
+    only known after layout. `hint` is a previous rendering of the same
+    table of contents: its page count is used first, so the front matter
+    is laid out a second time only when the contents changed length, and
+    it is returned as is when its page numbers are still right.
+    """
+    pages = hint.pages if hint is not None else 1
+    numbers = page_numbers(chapters, pages)
+    if hint is not None and hint.page_numbers == numbers:
+        return hint
+    for _ in range(3):
+        unit = render_chapter(guide, FRONT_MATTER, styles, pagesize, numbers)
+        if unit.pages == pages:
+            break
+        # The page numbers only change the text of the numbers, not the
+        # layout, so the next attempt sees the same page count
+        pages = unit.pages
+        numbers = page_numbers(chapters, pages)
+    return unit
+
+
+@functools.lru_cache(maxsize=None)
+def _page_chrome_pdf(pagesize):
+    """One-page PDF holding just the static header/footer.
+
+    Kept per process: drawing the header logo is most of the cost of
+    stitching a small build.
+    """
+    buffer = io.BytesIO()
+    chrome = canvas.Canvas(buffer, pagesize=pagesize)
+    page_decorations(chrome, None)
+    chrome.showPage()
+    chrome.save()
+    return buffer.getvalue()
+
+
+def _page_chrome_form(writer, pagesize):
+    """Import the static header/footer as a form XObject"""
+    page = PdfReader(io.BytesIO(_page_chrome_pdf(tuple(pagesize)))).pages[0]
+    form = DecodedStreamObject()
+    form.set_data(page.get_contents().get_data())
+    form.update(
+        {
+            NameObject("/Type"): NameObject("/XObject"),
+            NameObject("/Subtype"): NameObject("/Form"),
+            NameObject("/BBox"): page.mediabox,
+            NameObject("/Resources"): page["/Resources"].clone(writer),
+        }
+    )
+    return writer._add_object(form.flate_encode())
+
+
+def _page_number_operators(number, page_width):
+    """PDF operators equivalent to draw_page_number() for one page"""
+    text = f"Page {number}"
+    x = (
+        page_width
+        - PAGE_NUMBER_RIGHT_MARGIN
+        - stringWidth(text, PAGE_NUMBER_FONT, PAGE_NUMBER_SIZE)
+    )
+    red, green, blue = OPNSENSE_DARK.rgb()
+    return (
+        f"q {red:.6g} {green:.6g} {blue:.6g} rg BT /FPageNo {PAGE_NUMBER_SIZE} Tf "
+        f"1 0 0 1 {x:.4f} {PAGE_NUMBER_Y} Tm ({text}) Tj ET Q"
+    )
+
+
+def _stamp_page_chrome(writer, pagesize, cover=True):
+    """Add the header, footer and page number to every page after the cover.
+
+    The static header/footer is shared by all pages as one form XObject, so
+    each page only gains a tiny content stream. The chapters' own
+    (compressed) streams are never decoded or rewritten.
+    """
+    chrome = _page_chrome_form(writer, pagesize)
+    font = DictionaryObject(
+        {
+            NameObject("/Type"): NameObject("/Font"),
+            NameObject("/Subtype"): NameObject("/Type1"),
+            NameObject("/BaseFont"): NameObject(f"/{PAGE_NUMBER_FONT}"),
+            NameObject("/Encoding"): NameObject("/WinAnsiEncoding"),
+        }
+    )
+    push = DecodedStreamObject()
+    push.set_data(b"q")
+    pop = DecodedStreamObject()
+    pop.set_data(b"Q")
+    push_ref = writer._add_object(push)
+    pop_ref = writer._add_object(pop)
+
+    first = 1 if cover else 0
+    for number, page in enumerate(writer.pages[first:], start=first + 1):
+        operators = _page_number_operators(number, pagesize[0])
+        stamp = DecodedStreamObject()
+        stamp.set_data(f"/PageChrome Do {operators}".encode("latin-1"))
+        contents = page.raw_get("/Contents")
+        if not isinstance(contents.get_object(), ArrayObject):
+            contents = [contents]
+        page[NameObject("/Contents")] = ArrayObject(
+            [push_ref, *contents, pop_ref, writer._add_object(stamp)]
+        )
+
+        resources = page["/Resources"]
+        xobjects = resources.setdefault(NameObject("/XObject"), DictionaryObject())
+        xobjects.get_object()[NameObject("/PageChrome")] = chrome
+        fonts = resources.setdefault(NameObject("/Font"), DictionaryObject())
+        fonts.get_object()[NameObject("/FPageNo")] = font
+
+
+def _link_units(writer, units):
+    """Name every anchor as a destination and add the links between units"""
+    starts, targets = [], {}
+    offset = 0
+    for unit in units:
+        starts.append(offset)
+        for name, (page, top) in unit.anchors.items():
+            targets[name] = (offset + page - 1, top)
+        offset += unit.pages
+    # Written as one sorted name tree leaf; adding the names one at a time
+    # keeps the array sorted at quadratic cost
+    dests = writer.get_named_dest_root()
+    for name in sorted(targets):
+        page, top = targets[name]
+        page_ref = writer.pages[page].indirect_reference
+        dests.extend(
+            [
+                TextStringObject(name),
+                Destination(name, page_ref, Fit.xyz(top=top)).dest_array,
+            ]
+        )
+    for start, unit in zip(starts, units):
+        for page, rect, name in unit.links:
+            if name not in targets:
+                continue
+            target_page, top = targets[name]
+            writer.add_annotation(
+                start + page - 1,
+                Link(
+                    rect=rect,
+                    border=[0, 0, 0],
+                    target_page_index=target_page,
+                    fit=Fit.xyz(top=top),
+                ),
+            )
+
+
+def _embedded_font_key(font):
+    """Digest of a TrueType font resource, or None if it is not embedded"""
+    descriptor = font.get("/FontDescriptor")
+    embedded = descriptor.get_object().get("/FontFile2") if descriptor else None
+    if embedded is None:
+        return None
+    to_unicode = font.get("/ToUnicode")
+    digest = hashlib.sha256(
+        repr(
+            (font.get("/BaseFont"), font.get("/FirstChar"), font.get("/Widths"))
+        ).encode()
+    )
+    digest.update(embedded.get_object()._data)
+    if to_unicode is not None:
+        digest.update(to_unicode.get_object()._data)
+    return digest.digest()
+
+
+def _share_embedded_fonts(writer):
+    """Point all units at one copy of each identical embedded font.
+
+    Every unit embeds its own subsets of the TrueType fonts, and the glyphs
+    reserved up front make them byte-identical, so only the first copy is
+    kept. ReportLab gives all pages and forms of a document one font
+    dictionary, so the other copies are left unreferenced and dropped.
+    Streams are compared as stored; nothing is decoded.
+    """
+    shared = {}
+    dropped = []
+    seen = set()
+    for page in writer.pages:
+        fonts = page["/Resources"].raw_get("/Font")
+        if fonts is None or getattr(fonts, "idnum", None) in seen:
+            continue
+        seen.add(getattr(fonts, "idnum", None))
+        fonts = fonts.get_object()
+        for name in list(fonts):
+            ref = fonts.raw_get(name)
+            font = ref.get_object()
+            key = _embedded_font_key(font)
+            if key is None:
+                continue
+            kept = shared.setdefault(key, ref)
+            if kept is not ref:
+                fonts[NameObject(name)] = kept
+                dropped.append(ref)
+
+    for ref in dropped:
+        font = ref.get_object()
+        descriptor = font.raw_get("/FontDescriptor")
+        for obj in (
+            ref,
+            descriptor,
+            descriptor.get_object().raw_get("/FontFile2"),
+            font.raw_get("/ToUnicode"),
+        ):
+            if isinstance(obj, IndirectObject):
+                writer._objects[obj.idnum - 1] = None
+
+
+def _deduplicate(writer):
+    """Write identical objects once and drop unreferenced ones; returns the
+    bytes this saves, from the serialized size of the objects dropped"""
+    before = list(writer._objects)
+    writer.compress_identical_objects(remove_duplicates=True, remove_unreferenced=True)
+    saved = 0
+    for idnum, (old, new) in enumerate(zip(before, writer._objects), start=1):
+        if old is not None and new is None:
+            stream = io.BytesIO()
+            old.write_to_stream(stream)
+            saved += len(f"{idnum} 0 obj\n\nendobj\n") + stream.tell()
+    return saved
+
+
+def stitch_chapters(units, output, pagesize=PAGE_SIZE, cover=True, deduplicate=False):
+    """Concatenate rendered units, link them and stamp the page header/footer.
+
+    `output` is a file name or a seekable binary stream. With `deduplicate`,
+    identical objects from different units (forms, font resources, images)
+    are written once. Returns the number of pages written and, with
+    `deduplicate`, the bytes that saved, otherwise None.
+    """
+    writer = PdfWriter()
+    for unit in units:
+        writer.append(PdfReader(io.BytesIO(unit.pdf)))
+    _link_units(writer, units)
+    _share_embedded_fonts(writer)
+    writer.page_mode = "/UseOutlines"
+    _stamp_page_chrome(writer, pagesize, cover)
+    writer.add_metadata(PdfReader(io.BytesIO(units[0].pdf)).metadata)
+    saved = _deduplicate(writer) if deduplicate else None
+    writer.write(output)
+    return len(writer.pages), saved
+
+
+def _timed_render(guide, key, styles, pagesize):
+    start = time.perf_counter()
+    unit = render_chapter(guide, key, styles, pagesize)
+    return unit, time.perf_counter() - start
+
+
+def _render_chapter_job(guide, key, pagesize):
+    """Process-pool entry point: render one build unit"""
+    return _timed_render(guide, key, get_styles(), pagesize)
+
+
+def render_chapters(guide, keys, jobs=1, pagesize=PAGE_SIZE):
+    """Render the given build units, in a process pool when jobs > 1.
+
+    Returns a dict mapping unit key to (RenderedUnit, render seconds).
+    Chapters are rendered without page numbers, so workers never need to
+    know where their pages will land in the final document.
+    """
+    if jobs <= 1 or len(keys) <= 1:
+        styles = get_styles()
+        return {key: _timed_render(guide, key, styles, pagesize) for key in keys}
+
+    def size(key):
+        return sum(1 for _ in model.iter_blocks(guide.chapter(key).blocks))
+
+    # Hand out the biggest chapters first so no worker is left with a long
+    # tail at the end of the build
+    ordered = sorted(keys, key=size, reverse=True)
+    with ProcessPoolExecutor(max_workers=min(jobs, len(keys))) as pool:
+        results = pool.map(
+            _render_chapter_job,
+            [guide] * len(ordered),
+            ordered,
+            [pagesize] * len(ordered),
+        )
+        return dict(zip(ordered, results))
+
+
+# ============================================================================
+# LIBRARY API
+# ============================================================================
+
+
+@dataclass(frozen=True)
+class RenderOptions:
+    """What to build; see build_parser() for the matching command-line options"""
+
+    pagesize: str = "letter"
+    # Chapter keys to build (no cover or contents); None builds the whole guide
+    chapters: Optional[Tuple[str, ...]] = None
+    use_cache: bool = True
+    jobs: int = 1
+    cache_dir: str = BUILD_CACHE_DIR
+    # Key of guide_output.OUTPUT_PROFILES
+    output_profile: str = "default"
+
+
+@dataclass
+class RenderResult:
+    """Metadata about one build"""
+
+    page_count: int
+    byte_size: int
+    seconds: float
+    # Render time per build unit, in document order; cached units take 0.0.
+    # A single-pass build counts each unit from compiling it until the next
+    # unit is needed, over both passes when there were two.
+    chapter_seconds: Dict[str, float] = field(default_factory=dict)
+    cached: List[str] = field(default_factory=list)
+    # Size and time to first page after the output profile was applied
+    output: Optional[guide_output.OutputReport] = None
+
+
+def _timed_units(keys, chunks, seconds):
+    """Pass the story chunks of `keys` through, adding to seconds[key] the
+    time from pulling a chunk until the next one is pulled.
+
+    StoryStream pulls a chunk only once the previous one is laid out and
+    drawn, so that is the unit's compile, layout and draw time.
+    """
+    for key, chunk in zip(keys, chunks):
+        start = time.perf_counter()
+        yield chunk
+        seconds[key] = seconds.get(key, 0.0) + time.perf_counter() - start
+
+
+def _render_single_pass(guide, styles, pagesize, front_matter, out, cache, seconds):
+    """Lay out the whole guide as one document; returns the page count.
+
+    The table of contents is drawn before the chapters are laid out, so its
+    page numbers come from the previous build with the same contents (a
+    hint in the cache). They are checked against where the anchors landed
+    and the guide is laid out a second time only when they were wrong.
+    The time spent on each build unit is added up in `seconds`.
+    """
+    keys = unit_keys(guide, front_matter)
+    hint_key = _digest("page-numbers", tuple(pagesize), toc_entries(guide))
+    hint = (cache.load_meta(hint_key) or {}) if front_matter else {}
+    for attempt in range(2):
+        if attempt:
+            out.seek(0)
+            out.truncate()
+        doc = GuideDocTemplate(
+            out, page_numbers=hint, pagesize=pagesize, **PAGE_MARGINS
+        )
+        doc.build(
+            StoryStream(
+                _timed_units(keys, iter_story(styles, guide, front_matter), seconds)
+            ),
+            onFirstPage=create_cover_page if front_matter else header_footer,
+            onLaterPages=header_footer,
+        )
+        numbers = {name: page for name, (page, _top) in doc.anchors.items()}
+        if not front_matter or numbers == hint:
+            break
+        # Page numbers do not affect the layout, so a second pass with the
+        # numbers just found is always right
+        cache.store_meta(hint_key, numbers)
+        hint = numbers
+    return doc.page
+
+
+def render_guide(options=None, out=None, guide=None):
+    """Render the guide PDF into `out`, any writable binary file object.
+
+    The PDF is assembled in memory and written to `out` in one piece, so
+    `out` need not be seekable (a socket or pipe will do). Without `out`
+    the PDF is only measured, which is useful to warm the chapter cache.
+    All state lives in local variables and the on-disk cache, so several
+    threads may render at the same time.
+
+    Chapters are rendered independently and reused from the cache when
+    their content, the styles and the page geometry are unchanged; chapters
+    that do need rendering are spread over `options.jobs` worker processes.
+    The front matter is rendered last, when the page numbers for its table
+    of contents are known. Without pypdf (needed for stitching), or with
+    use_cache=False and a single job, the whole story is laid out in one
+    pass instead. The finished PDF is written out as options.output_profile
+    asks (see guide_output), and result.output reports its size and time
+    to first page.
+    """
+    options = options or RenderOptions()
+    start = time.perf_counter()
+    guide = guide or model.load_guide()
+    front_matter = options.chapters is None
+    if not front_matter:
+        guide = guide.select(options.chapters)
+    pagesize = PAGE_SIZES[options.pagesize]
+    profile = guide_output.OUTPUT_PROFILES[options.output_profile]
+    styles = get_styles()
+    buffer = io.BytesIO()
+    result = RenderResult(page_count=0, byte_size=0, seconds=0.0)
+    rendered_size = None
+
+    if PdfWriter is None or (not options.use_cache and options.jobs <= 1):
+        # Page numbers are only a checked layout hint, so they are kept
+        # even when chapters are not cached
+        result.page_count = _render_single_pass(
+            guide,
+            styles,
+            pagesize,
+            front_matter,
+            buffer,
+            ChapterCache(options.cache_dir),
+            result.chapter_seconds,
+        )
+    else:
+        keys = unit_keys(guide, front_matter)
+        chapters = [key for key in keys if key != FRONT_MATTER]
+        cache = ChapterCache(options.cache_dir) if options.use_cache else None
+        fingerprint = build_fingerprint(styles, pagesize)
+        cache_keys = {key: chapter_key(guide, key, fingerprint) for key in keys}
+
+        units = {}
+        if cache is not None:
+            for key, cache_key in cache_keys.items():
+                unit = cache.load(cache_key)
+                if unit is not None:
+                    units[key] = unit
+
+        missing = [key for key in chapters if key not in units]
+        rendered = render_chapters(guide, missing, options.jobs, pagesize)
+        seconds = {}
+        for key, (unit, unit_seconds) in rendered.items():
+            units[key] = unit
+            seconds[key] = unit_seconds
+            if cache is not None:
+                cache.store(cache_keys[key], unit)
+
+        if front_matter:
+            front_start = time.perf_counter()
+            hint = units.get(FRONT_MATTER)
+            front = render_front_matter(
+                guide, styles, [units[key] for key in chapters], pagesize, hint
+            )
+            if front is not hint:
+                units[FRONT_MATTER] = front
+                seconds[FRONT_MATTER] = time.perf_counter() - front_start
+                if cache is not None:
+                    cache.store(cache_keys[FRONT_MATTER], front)
+
+        result.chapter_seconds = {key: seconds.get(key, 0.0) for key in keys}
+        result.cached = [key for key in keys if key not in seconds]
+        result.page_count, saved = stitch_chapters(
+            [units[key] for key in keys],
+            buffer,
+            pagesize,
+            front_matter,
+            deduplicate=profile.deduplicate,
+        )
+        if saved is not None:
+            rendered_size = len(buffer.getvalue()) + saved
+        if cache is not None:
+            cache.prune()
+
+    data, result.output = guide_output.apply_output_profile(
+        buffer.getvalue(), profile, rendered_size
+    )
+    if out is not None:
+        out.write(data)
+    result.byte_size = len(data)
+    result.seconds = time.perf_counter() - start
+    return result
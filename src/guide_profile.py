@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+OPNsense User Guide - Layout Profiler
+Records where a PDF build spends its time: per chapter, per flowable type and
+per layout step (wrap, split, draw), plus page breaks and KeepTogether re-wraps.
+
+The result is written as a Chrome trace (open it in chrome://tracing or
+https://ui.perfetto.dev) and as collapsed stacks for flamegraph.pl/speedscope.
+"""
+
+from collections import Counter, defaultdict
+import contextlib
+import functools
+import io
+import json
+import os
+import time
+
+from reportlab.platypus import Flowable, KeepTogether
+from reportlab.platypus.doctemplate import BaseDocTemplate, _FrameBreak
+
+import guide_model as model
+import guide_output
+import guide_pdf
+
+# Flowable methods timed for every class that defines them
+LAYOUT_STEPS = ("wrap", "split", "draw")
+
+# ============================================================================
+# PROFILER
+# ============================================================================
+
+
+class LayoutProfiler:
+    """Collects nested timing spans and layout events for one build.
+
+    Use it as a context manager: while active, the wrap/split/draw methods
+    of every Flowable class and the page handling of the doc template are
+    replaced by timed versions. The patches are process-wide, so only one
+    profiler may be active at a time and builds in other threads are timed
+    too; this is a diagnostic mode, not something to leave on.
+    """
+
+    def __init__(self):
+        self.events = []
+        # Self time in microseconds per stack of span names
+        self.stacks = Counter()
+        # (chapter, counter name) -> count
+        self.counters = Counter()
+        # (flowable type, step) -> [calls, total microseconds]
+        self.steps = defaultdict(lambda: [0, 0.0])
+        self.chapter = None
+        self._stack = []
+        self._patches = []
+        self._origin = time.perf_counter()
+
+    def _now(self):
+        return (time.perf_counter() - self._origin) * 1e6
+
+    # ---- spans ----
+
+    @contextlib.contextmanager
+    def span(self, name, category, **args):
+        """Time the body of the with statement as a span nested in the current one"""
+        frame = [name, self._now(), 0.0]
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            end = self._now()
+            duration = end - frame[1]
+            if self._stack:
+                self._stack[-1][2] += duration
+            path = ";".join(f[0] for f in self._stack) + (";" if self._stack else "")
+            self.stacks[path + name] += duration - frame[2]
+            event = {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": round(frame[1], 3),
+                "dur": round(duration, 3),
+                "pid": 1,
+                "tid": 1,
+            }
+            if args:
+                event["args"] = args
+            self.events.append(event)
+
+    @contextlib.contextmanager
+    def chapter_span(self, key):
+        """Span for one build unit; events inside it are attributed to `key`"""
+        self.chapter = key
+        name = "front matter" if key == guide_pdf.FRONT_MATTER else f"chapter {key}"
+        try:
+            with self.span(name, "chapter"):
+                yield
+        finally:
+            self.chapter = None
+
+    def instant(self, name, category, **args):
+        """Record a point-in-time event"""
+        self.events.append(
+            {
+                "name": name,
+                "cat": category,
+                "ph": "i",
+                "s": "t",
+                "ts": round(self._now(), 3),
+                "pid": 1,
+                "tid": 1,
+                "args": dict(args, chapter=self.chapter),
+            }
+        )
+
+    def count(self, name, amount=1):
+        self.counters[self.chapter, name] += amount
+
+    # ---- instrumentation ----
+
+    def _patch(self, owner, name, replacement):
+        self._patches.append((owner, name, owner.__dict__[name]))
+        setattr(owner, name, replacement)
+
+    def _timed_step(self, method, step):
+        profiler = self
+
+        @functools.wraps(method)
+        def timed(flowable, *args, **kwargs):
+            marker = (id(flowable), step)
+            parent = profiler._stack[-1] if profiler._stack else None
+            # Overrides that call up to a base class are one step, not two
+            if parent is not None and parent[-1] == marker:
+                return method(flowable, *args, **kwargs)
+            if step == "wrap" and flowable.__dict__.pop("_profile_kept", False):
+                if not (parent and parent[0].startswith("KeepTogether.")):
+                    profiler.count("keep_together_rewraps")
+
+            kind = type(flowable).__name__
+            start = profiler._now()
+            with profiler.span(f"{kind}.{step}", step):
+                profiler._stack[-1].append(marker)
+                result = method(flowable, *args, **kwargs)
+            totals = profiler.steps[kind, step]
+            totals[0] += 1
+            totals[1] += profiler._now() - start
+            if isinstance(flowable, KeepTogether):
+                profiler._keep_together(flowable, step, result)
+            return result
+
+        return timed
+
+    def _keep_together(self, group, step, result):
+        """Count KeepTogether's trial layouts.
+
+        KeepTogether wraps its whole content to see whether it fits; the
+        frame then wraps each piece again when placing it. Those second
+        wraps are the re-wraps; a "move" is a group pushed to the next page.
+        """
+        if step == "wrap":
+            self.count("keep_together_wraps")
+            for flowable in group._content:
+                flowable._profile_kept = True
+        elif step == "split" and result and isinstance(result[0], _FrameBreak):
+            self.count("keep_together_moves")
+            self.instant("KeepTogether moved to next page", "keep_together")
+
+    def _install(self):
+        if getattr(Flowable, "_layout_profiler", None) is not None:
+            raise RuntimeError("another layout profile is already running")
+        self._patch_attr(Flowable, "_layout_profiler", self)
+
+        classes, pending = set(), [Flowable]
+        while pending:
+            cls = pending.pop()
+            if cls not in classes:
+                classes.add(cls)
+                pending.extend(cls.__subclasses__())
+        for cls in classes:
+            for step in LAYOUT_STEPS:
+                if step in cls.__dict__:
+                    self._patch(cls, step, self._timed_step(cls.__dict__[step], step))
+
+        profiler = self
+        handle_flowable = BaseDocTemplate.handle_flowable
+        handle_pageBreak = BaseDocTemplate.handle_pageBreak
+        handle_pageEnd = BaseDocTemplate.handle_pageEnd
+        start_build = BaseDocTemplate._startBuild
+        end_build = BaseDocTemplate._endBuild
+
+        def _handle_flowable(doc, flowables):
+            if flowables:
+                doc._profile_flowable = type(flowables[0]).__name__
+            return handle_flowable(doc, flowables)
+
+        def _handle_pageBreak(doc, *args, **kwargs):
+            doc.__dict__.setdefault("_profile_cause", "PageBreak")
+            return handle_pageBreak(doc, *args, **kwargs)
+
+        def _handle_pageEnd(doc):
+            cause = doc.__dict__.pop("_profile_cause", "frame full")
+            profiler.count("pages")
+            profiler.instant(
+                "page break",
+                "page",
+                page=doc.page,
+                cause=cause,
+                flowable=getattr(doc, "_profile_flowable", None),
+            )
+            return handle_pageEnd(doc)
+
+        def _start_build(doc, *args, **kwargs):
+            # A unit laid out more than once (the front matter, until its
+            # page numbers settle) has the pages of its last layout
+            profiler.counters[profiler.chapter, "pages"] = 0
+            return start_build(doc, *args, **kwargs)
+
+        def _end_build(doc):
+            doc._profile_cause = "end of document"
+            return end_build(doc)
+
+        self._patch(BaseDocTemplate, "handle_flowable", _handle_flowable)
+        self._patch(BaseDocTemplate, "handle_pageBreak", _handle_pageBreak)
+        self._patch(BaseDocTemplate, "handle_pageEnd", _handle_pageEnd)
+        self._patch(BaseDocTemplate, "_startBuild", _start_build)
+        self._patch(BaseDocTemplate, "_endBuild", _end_build)
+
+        compile_unit = guide_pdf.compile_unit
+
+        def _compile_unit(*args, **kwargs):
+            with profiler.span("compile", "compile"):
+                return compile_unit(*args, **kwargs)
+
+        self._patch(guide_pdf, "compile_unit", _compile_unit)
+
+    def _patch_attr(self, owner, name, value):
+        self._patches.append((owner, name, owner.__dict__.get(name)))
+        setattr(owner, name, value)
+
+    def _uninstall(self):
+        while self._patches:
+            owner, name, original = self._patches.pop()
+            setattr(owner, name, original)
+
+    def __enter__(self):
+        try:
+            self._install()
+        except Exception:
+            self._uninstall()
+            raise
+        return self
+
+    def __exit__(self, *exc_info):
+        self._uninstall()
+
+    # ---- output ----
+
+    def trace(self):
+        """The recorded events in Chrome trace event format"""
+        counters = defaultdict(dict)
+        for (chapter, name), value in self.counters.items():
+            counters[chapter or "guide"][name] = value
+        return {
+            "traceEvents": [
+                {
+                    "name": "process_name",
+                    "ph": "M",
+                    "pid": 1,
+                    "args": {"name": "OPNsense User Guide build"},
+                },
+                *sorted(self.events, key=lambda event: event["ts"]),
+            ],
+            "displayTimeUnit": "ms",
+            "otherData": {"counters": counters},
+        }
+
+    def write_trace(self, path):
+        with open(path, "w", encoding="utf-8") as out:
+            json.dump(self.trace(), out, separators=(",", ":"))
+        return path
+
+    def write_collapsed(self, path):
+        """Write self time per stack in microseconds, one "a;b;c N" line each"""
+        with open(path, "w", encoding="utf-8") as out:
+            for stack, micros in sorted(self.stacks.items()):
+                if round(micros):
+                    out.write(f"{stack} {round(micros)}\n")
+        return path
+
+    def summary(self, limit=10):
+        """Human-readable overview: slowest layout steps and per-chapter counts"""
+        lines = [f"{'step':<32} {'calls':>8} {'total ms':>10}"]
+        steps = sorted(self.steps.items(), key=lambda item: item[1][1], reverse=True)
+        for (kind, step), (calls, micros) in steps[:limit]:
+            lines.append(f"{kind + '.' + step:<32} {calls:>8} {micros / 1000:>10.1f}")
+
+        chapters = {}
+        for event in self.events:
+            if event["cat"] == "chapter":
+                chapters[event["name"]] = event["dur"]
+        lines.append("")
+        lines.append(
+            f"{'unit':<16} {'ms':>8} {'pages':>6} {'KT wraps':>9} "
+            f"{'re-wraps':>9} {'moved':>6}"
+        )
+        for name, micros in chapters.items():
+            key = name.split()[-1] if name.startswith("chapter") else "front"
+            key = guide_pdf.FRONT_MATTER if key == "front" else key
+            lines.append(
+                f"{name:<16} {micros / 1000:>8.1f} "
+                f"{self.counters[key, 'pages']:>6} "
+                f"{self.counters[key, 'keep_together_wraps']:>9} "
+                f"{self.counters[key, 'keep_together_rewraps']:>9} "
+                f"{self.counters[key, 'keep_together_moves']:>6}"
+            )
+        return "\n".join(lines)
+
+
+# ============================================================================
+# PROFILED BUILD
+# ============================================================================
+
+
+def profile_guide(options=None, out=None, guide=None):
+    """Render the guide like render_guide() and return a LayoutProfiler.
+
+    Every build unit is laid out in this process with the cache off, so
+    each chapter shows up as its own span; options.use_cache and
+    options.jobs are ignored. Needs pypdf to stitch the chapters.
+    """
+    if guide_pdf.PdfWriter is None:
+        raise RuntimeError("profiling a build needs pypdf to stitch the chapters")
+    options = options or guide_pdf.RenderOptions()
+    guide = guide or model.load_guide()
+    front_matter = options.chapters is None
+    if not front_matter:
+        guide = guide.select(options.chapters)
+    pagesize = guide_pdf.PAGE_SIZES[options.pagesize]
+
+    with LayoutProfiler() as profiler:
+        with profiler.span("build", "build", pagesize=options.pagesize):
+            with profiler.span("styles", "build"):
+                styles = guide_pdf.get_styles()
+            units = []
+            for key in guide_pdf.unit_keys(guide, front_matter=False):
+                with profiler.chapter_span(key):
+                    units.append(guide_pdf.render_chapter(guide, key, styles, pagesize))
+            if front_matter:
+                with profiler.chapter_span(guide_pdf.FRONT_MATTER):
+                    front = guide_pdf.render_front_matter(
+                        guide, styles, units, pagesize
+                    )
+                units.insert(0, front)
+            buffer = io.BytesIO()
+            profile = guide_output.OUTPUT_PROFILES[options.output_profile]
+            with profiler.span("stitch", "build"):
+                guide_pdf.stitch_chapters(
+                    units,
+                    buffer,
+                    pagesize,
+                    front_matter,
+                    deduplicate=profile.deduplicate,
+                )
+            with profiler.span("output", "build", profile=profile.name):
+                data, _ = guide_output.apply_output_profile(buffer.getvalue(), profile)
+
+    if out is not None:
+        out.write(data)
+    return profiler
+
+
+def write_profile(profiler, prefix):
+    """Write <prefix>.trace.json and <prefix>.folded; returns both paths"""
+    os.makedirs(os.path.dirname(os.path.abspath(prefix)), exist_ok=True)
+    return (
+        profiler.write_trace(prefix + ".trace.json"),
+        profiler.write_collapsed(prefix + ".folded"),
+    )
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+OPNsense User Guide - Render Server
+Keeps the generator loaded between builds and serves build jobs on a Unix socket
+"""
+
+import argparse
+import io
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+
+import guide_model as model
+import opnsense_user_guide as generator
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+SOCKET_PATH = os.path.join(PROJECT_ROOT, ".cache", "user-guide", "render.sock")
+
+# Build formats and how to announce their output
+FORMATS = {
+    "pdf": "PDF",
+    "jsonl": "JSONL",
+    "markdown": "Markdown",
+    "markdown-lean": "Markdown",
+}
+
+# ============================================================================
+# PROTOCOL
+# ============================================================================
+# The client sends one JSON line: {"command": "build", "format": ...,
+# "pagesize": ..., "chapters": [...], "jobs": ..., "use_cache": ...,
+# "output_profile": ...}, {"command": "ping"} or {"command": "stop"}.
+# The server answers with one JSON line, {"ok": true, "size": N, ...} or
+# {"ok": false, "error": ...}, followed by N bytes of output for a build.
+
+
+def _send_header(wfile, **header):
+    wfile.write(json.dumps(header).encode("utf-8") + b"\n")
+
+
+def _read_header(rfile):
+    line = rfile.readline()
+    if not line:
+        raise ConnectionError("connection closed before a header was received")
+    return json.loads(line)
+
+
+# ============================================================================
+# SERVER
+# ============================================================================
+
+
+def build(request):
+    """Run one build job; returns (output bytes, header fields)"""
+    fmt = request.get("format", "pdf")
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown format {fmt!r}")
+    chapters = request.get("chapters") or None
+    guide = model.load_guide()
+
+    if fmt == "pdf":
+        import guide_pdf
+
+        options = guide_pdf.RenderOptions(
+            pagesize=request.get("pagesize", "letter"),
+            chapters=tuple(chapters) if chapters else None,
+            use_cache=request.get("use_cache", True),
+            jobs=request.get("jobs", 1),
+            output_profile=request.get("output_profile", "default"),
+        )
+        out = io.BytesIO()
+        result = guide_pdf.render_guide(options, out, guide)
+        meta = {
+            "page_count": result.page_count,
+            "seconds": result.seconds,
+            "chapter_seconds": result.chapter_seconds,
+            "cached": result.cached,
+            "first_page_bytes": result.output.first_page_bytes,
+        }
+        return out.getvalue(), meta
+
+    if chapters:
+        guide = guide.select(chapters)
+    out = io.StringIO()
+    if fmt == "jsonl":
+        generator.export_jsonl(out, guide)
+    else:
+        generator.export_markdown(out, guide, lean=fmt == "markdown-lean")
+    return out.getvalue().encode("utf-8"), {}
+
+
+class RenderHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        try:
+            request = _read_header(self.rfile)
+            command = request.get("command", "build")
+            if command == "ping":
+                _send_header(self.wfile, ok=True, size=0, pid=os.getpid())
+            elif command == "stop":
+                _send_header(self.wfile, ok=True, size=0)
+                threading.Thread(target=self.server.shutdown).start()
+            elif command == "build":
+                # Jobs that arrive while the server warms up wait for it
+                self.server.warm.wait()
+                data, meta = build(request)
+                output = generator.OUTPUTS[request.get("format", "pdf")]
+                _send_header(self.wfile, ok=True, size=len(data), output=output, **meta)
+                self.wfile.write(data)
+            else:
+                raise ValueError(f"unknown command {command!r}")
+        except Exception as e:
+            # Report the failure to the client and keep serving
+            message = e.args[0] if isinstance(e, KeyError) else str(e)
+            _send_header(self.wfile, ok=False, error=message)
+
+
+class RenderServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path):
+        super().__init__(path, RenderHandler)
+        # Set once the warm-up build is done
+        self.warm = threading.Event()
+
+    def warm_up(self):
+        """One full build populates the chapter cache, the text metric
+        caches and the page chrome, so the first real job is as fast as
+        the rest"""
+        import guide_pdf
+
+        try:
+            guide_pdf.render_guide(guide_pdf.RenderOptions())
+        except Exception as e:
+            # Jobs still run, only without warm caches
+            print(f"warm-up build failed: {e}", file=sys.stderr, flush=True)
+        finally:
+            self.warm.set()
+
+
+def _claim_socket(path):
+    """Remove a stale socket file; refuse to start next to a live server"""
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except OSError:
+        os.remove(path)
+    else:
+        raise SystemExit(f"a render server is already listening on {path}")
+    finally:
+        probe.close()
+
+
+def serve(path=SOCKET_PATH):
+    """Claim the socket, warm the renderer's caches and serve build jobs
+    until stopped.
+
+    The socket is claimed first, so a second server fails straight away
+    and clients can connect during the warm-up; their builds wait for it.
+    """
+    _claim_socket(path)
+    server = RenderServer(path)
+    threading.Thread(target=server.warm_up, daemon=True).start()
+    print(f"Render server listening on {path}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        os.remove(path)
+
+
+# ============================================================================
+# CLIENT
+# ============================================================================
+
+
+def request(message, path=SOCKET_PATH):
+    """Send one request to the server; returns (header, output bytes)"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.connect(path)
+        rfile = conn.makefile("rb")
+        conn.sendall(json.dumps(message).encode("utf-8") + b"\n")
+        header = _read_header(rfile)
+        data = rfile.read(header.get("size", 0))
+    if not header["ok"]:
+        raise RuntimeError(header["error"])
+    return header, data
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Warm render server for the OPNsense User Guide"
+    )
+    parser.add_argument("--socket", default=SOCKET_PATH, help="Unix socket path")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("serve", help="run the server in the foreground")
+    commands.add_parser("stop", help="stop a running server")
+    commands.add_parser("ping", help="check that a server is running")
+
+    job = commands.add_parser("build", help="build an artifact through the server")
+    job.add_argument("-f", "--format", choices=FORMATS, default="pdf")
+    job.add_argument(
+        "-o", "--output", help="output file, or - for stdout (default: repository path)"
+    )
+    job.add_argument("--pagesize", choices=generator.PAGE_SIZE_NAMES, default="letter")
+    job.add_argument("--chapters", metavar="KEYS", help="e.g. 4,5,B")
+    job.add_argument("--no-cache", action="store_true")
+    job.add_argument("-j", "--jobs", type=int, default=1)
+    job.add_argument(
+        "--output-profile", choices=generator.OUTPUT_PROFILE_NAMES, default="default"
+    )
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "build" and args.chapters:
+        problem = generator.partial_output_problem(args.output)
+        if problem:
+            parser.error(problem)
+    if args.command == "serve":
+        serve(args.socket)
+        return
+
+    message = {"command": args.command}
+    if args.command == "build":
+        chapters = args.chapters or ""
+        message.update(
+            format=args.format,
+            pagesize=args.pagesize,
+            chapters=[k.strip().upper() for k in chapters.split(",") if k.strip()],
+            use_cache=not args.no_cache,
+            jobs=args.jobs,
+            output_profile=args.output_profile,
+        )
+    try:
+        header, data = request(message, args.socket)
+    except OSError as e:
+        raise SystemExit(f"no render server on {args.socket} ({e.strerror or e})")
+    except RuntimeError as e:
+        raise SystemExit(f"error: {e}")
+
+    if args.command == "build":
+        output = args.output or header["output"]
+        if output == "-":
+            sys.stdout.buffer.write(data)
+        else:
+            with open(output, "wb") as fh:
+                fh.write(data)
+            print(f"{FORMATS[args.format]} created: {output}")
+    elif args.command == "ping":
+        print(f"render server running (pid {header['pid']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+OPNsense User Guide - MCP Tool Reference
+Reads the tool definitions of the bundled MCP server and generates the
+"Complete MCP Tool Reference" tables of Chapter 13 from them
+"""
+
+import ast
+from dataclasses import asdict, dataclass, field
+import functools
+import json
+import os
+import re
+import threading
+from typing import List, Tuple
+
+from guide_model import Heading, Spacer, Table
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+SERVER_DIR = os.path.join(PROJECT_ROOT, "opnsense-mcp-server")
+SERVER_SOURCE_PATH = os.path.join(SERVER_DIR, "src", "index.ts")
+SERVER_SCHEMA_PATH = os.path.join(SERVER_DIR, "schema.json")
+
+# Parsed tool definitions, reused while the server sources keep their mtime
+TOOLS_CACHE_PATH = os.path.join(PROJECT_ROOT, ".cache", "user-guide", "mcp-tools.json")
+
+# Bump when parse_tools() gives a different result for the same sources
+TOOLS_CACHE_VERSION = 2
+
+# MCP clients show the server's tools under this prefix
+TOOL_PREFIX = "opnsense_"
+
+# ============================================================================
+# TOOL DEFINITIONS
+# ============================================================================
+
+
+@dataclass
+class Tool:
+    """One MCP tool as the server announces it.
+
+    `parameters` are the input schema's property names in declaration
+    order, `arrays` the ones that take a list. `group` is the comment the
+    server source puts above the tool ("NAT Management Tools").
+    """
+
+    name: str
+    description: str
+    parameters: List[str] = field(default_factory=list)
+    required: List[str] = field(default_factory=list)
+    arrays: List[str] = field(default_factory=list)
+    group: str = ""
+
+
+# ---- TypeScript object literals ----
+
+_TOKEN = re.compile(
+    r"""
+      (?P<space>\s+)
+    | (?P<comment>//[^\n]*)
+    | (?P<block>/\*.*?\*/)
+    | (?P<string>'(?:\\.|[^'\\])*'|"(?:\\.|[^"\\])*"|`(?:\\.|[^`\\])*`)
+    | (?P<spread>\.\.\.)
+    | (?P<word>-?\d+(?:\.\d+)?|[A-Za-z_$][\w$.]*)
+    | (?P<punct>[{}\[\](),:?])
+    """,
+    re.S | re.X,
+)
+
+_WORDS = {"true": True, "false": False, "null": None, "undefined": None}
+
+# Escapes in template literals; any other escaped character stands for itself
+_TEMPLATE_ESCAPE = re.compile(r"\\(.)", re.S)
+_TEMPLATE_CHARS = {"n": "\n", "t": "\t", "r": "\r", "\n": ""}
+
+
+class _Comment(str):
+    """A line comment between array elements"""
+
+
+class _LiteralParser:
+    """Parses one JavaScript/TypeScript literal into Python values.
+
+    Handles what tool lists are written with: objects, arrays, strings,
+    numbers, booleans and conditional spreads (`...(flag ? [a] : [])`,
+    which contribute their first branch). Line comments between array
+    elements are kept as _Comment items.
+    """
+
+    def __init__(self, text, pos=0):
+        self.text = text
+        self.pos = pos
+
+    def _next(self, keep_comments=False):
+        while True:
+            match = _TOKEN.match(self.text, self.pos)
+            if match is None:
+                raise ValueError(f"unexpected input at offset {self.pos}")
+            self.pos = match.end()
+            kind = match.lastgroup
+            if kind == "comment" and keep_comments:
+                return kind, match.group()[2:].strip()
+            if kind not in ("space", "comment", "block"):
+                return kind, match.group()
+
+    def _peek(self, keep_comments=False):
+        pos = self.pos
+        token = self._next(keep_comments)
+        self.pos = pos
+        return token
+
+    def _expect(self, punct):
+        token = self._next()
+        if token != ("punct", punct):
+            raise ValueError(
+                f"expected {punct!r} at offset {self.pos}, got {token[1]!r}"
+            )
+
+    def value(self):
+        kind, text = self._next()
+        if (kind, text) == ("punct", "{"):
+            return self._object()
+        if (kind, text) == ("punct", "["):
+            return self._array()
+        if kind == "string":
+            if text[0] == "`":
+                return _TEMPLATE_ESCAPE.sub(
+                    lambda m: _TEMPLATE_CHARS.get(m.group(1), m.group(1)), text[1:-1]
+                )
+            return ast.literal_eval(text)
+        if kind == "word":
+            if text in _WORDS:
+                return _WORDS[text]
+            try:
+                return ast.literal_eval(text)
+            except (ValueError, SyntaxError):
+                return text  # an identifier; tool lists only use literals
+        raise ValueError(f"unexpected {text!r} at offset {self.pos}")
+
+    def _object(self):
+        result = {}
+        while self._peek() != ("punct", "}"):
+            kind, key = self._next()
+            if kind == "string":
+                key = ast.literal_eval(key)
+            elif kind != "word":
+                raise ValueError(f"unexpected {key!r} at offset {self.pos}")
+            self._expect(":")
+            result[key] = self.value()
+            if self._peek() == ("punct", ","):
+                self._next()
+        self._next()
+        return result
+
+    def _array(self):
+        items = []
+        while True:
+            kind, text = self._peek(keep_comments=True)
+            if kind == "comment":
+                items.append(_Comment(self._next(keep_comments=True)[1]))
+            elif (kind, text) == ("punct", "]"):
+                self._next()
+                return items
+            elif kind == "spread":
+                self._next()
+                items.extend(self._spread())
+            else:
+                items.append(self.value())
+            if self._peek() == ("punct", ","):
+                self._next()
+
+    def _spread(self):
+        """The items of `...(condition ? [items] : [other])`"""
+        self._expect("(")
+        while self._next() != ("punct", "?"):
+            pass
+        items = self.value()
+        self._expect(":")
+        self.value()
+        self._expect(")")
+        if not isinstance(items, list):
+            raise ValueError(f"spread of a non-array at offset {self.pos}")
+        return items
+
+
+def _tool_list(source):
+    """The array literal returned by the server's ListTools handler"""
+    handler = source.find("setRequestHandler(ListToolsRequestSchema")
+    if handler < 0:
+        raise ValueError("no ListTools request handler in the server source")
+    match = re.compile(r"\btools\s*:\s*\[").search(source, handler)
+    if match is None:
+        raise ValueError("no tools array in the ListTools request handler")
+    return _LiteralParser(source, match.end() - 1).value()
+
+
+def _tool(definition, group=""):
+    schema = definition.get("inputSchema") or {}
+    properties = schema.get("properties") or {}
+    return Tool(
+        name=definition["name"],
+        description=definition.get("description", ""),
+        parameters=list(properties),
+        required=[name for name in schema.get("required", []) if name in properties],
+        arrays=[
+            name
+            for name, prop in properties.items()
+            if isinstance(prop, dict) and prop.get("type") == "array"
+        ],
+        group=group,
+    )
+
+
+def parse_tools(source_path=SERVER_SOURCE_PATH, schema_path=SERVER_SCHEMA_PATH):
+    """Every tool the MCP server lists, in the order the server lists them.
+
+    src/index.ts is what the server actually announces; schema.json (the
+    package manifest) only fills in descriptions the source leaves out.
+    """
+    with open(source_path, encoding="utf-8") as fh:
+        definitions = _tool_list(fh.read())
+    with open(schema_path, encoding="utf-8") as fh:
+        manifest = json.load(fh).get("tools", {})
+
+    tools, group = [], ""
+    for item in definitions:
+        if isinstance(item, _Comment):
+            group = item
+        elif isinstance(item, dict) and "name" in item:
+            tool = _tool(item, group)
+            if not tool.description:
+                tool.description = manifest.get(tool.name, {}).get("description", "")
+            tools.append(tool)
+    return tools
+
+
+# ---- cache ----
+
+
+def _sources_stamp(paths):
+    """What the cached parse depends on: file sizes and modification times"""
+    stamp = [TOOLS_CACHE_VERSION]
+    for path in paths:
+        info = os.stat(path)
+        stamp.append([os.path.abspath(path), info.st_mtime_ns, info.st_size])
+    return stamp
+
+
+@functools.lru_cache(maxsize=4)
+def _cached_tools(source_path, schema_path, stamp_json, cache_path):
+    stamp = json.loads(stamp_json)
+    if cache_path:
+        try:
+            with open(cache_path, encoding="utf-8") as fh:
+                cached = json.load(fh)
+            if cached["stamp"] == stamp:
+                return tuple(Tool(**tool) for tool in cached["tools"])
+        except (OSError, ValueError, KeyError, TypeError):
+            pass  # missing, stale or unreadable: parse again
+
+    tools = tuple(parse_tools(source_path, schema_path))
+    if cache_path:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        temp = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp, "w", encoding="utf-8") as fh:
+            json.dump({"stamp": stamp, "tools": [asdict(t) for t in tools]}, fh)
+        os.replace(temp, cache_path)
+    return tools
+
+
+def load_tools(
+    source_path=SERVER_SOURCE_PATH,
+    schema_path=SERVER_SCHEMA_PATH,
+    cache_path=TOOLS_CACHE_PATH,
+):
+    """parse_tools(), cached in memory and on disk until a source file changes.
+
+    Pass cache_path=None to skip the on-disk cache.
+    """
+    stamp = _sources_stamp((source_path, schema_path))
+    return list(_cached_tools(source_path, schema_path, json.dumps(stamp), cache_path))
+
+
+# ============================================================================
+# REFERENCE TABLES
+# ============================================================================
+
+
+@dataclass(frozen=True)
+class ToolTable:
+    """A table of the tool reference and the tools that go in it.
+
+    A tool is placed by its exact name first, then by the longest matching
+    name prefix, then by the comment group it has in the server source.
+    """
+
+    id: str
+    heading: str
+    names: Tuple[str, ...] = ()
+    prefixes: Tuple[str, ...] = ()
+    groups: Tuple[str, ...] = ()
+
+
+TOOL_TABLES = (
+    ToolTable(
+        "conn_all_tools",
+        "Connection & Configuration",
+        names=("interface_list_overview", "interface_get_config"),
+        groups=("Configuration tool", "Utility tools"),
+    ),
+    ToolTable("vlan_all_tools", "VLAN Management", groups=("VLAN Management Tools",)),
+    ToolTable(
+        "fw_all_tools", "Firewall Rules", groups=("Firewall Rule Management Tools",)
+    ),
+    ToolTable("alias_all_tools", "Firewall Aliases", prefixes=("alias_",)),
+    ToolTable("pf_all_tools", "Firewall States (pf)", prefixes=("pf_",)),
+    ToolTable("nat_all_tools", "NAT Management", prefixes=("nat_",)),
+    ToolTable(
+        "dhcp_all_tools",
+        "DHCP & ARP Discovery",
+        groups=("DHCP Lease Management Tools", "ARP Table Management Tools"),
+    ),
+    ToolTable(
+        "dns_all_tools",
+        "DNS Blocklist Management",
+        groups=("DNS Blocklist Management Tools",),
+    ),
+    ToolTable(
+        "haproxy_all_tools",
+        "HAProxy (Reverse Proxy/Load Balancer)",
+        prefixes=("haproxy_",),
+    ),
+    ToolTable("ssh_all_tools", "SSH/CLI Tools", prefixes=("ssh_",)),
+    ToolTable(
+        "routing_all_tools",
+        "Routing & Diagnostics",
+        prefixes=("routing_", "interface_"),
+    ),
+    ToolTable("gateway_all_tools", "Gateway Monitoring", prefixes=("gateway_",)),
+    ToolTable("wireguard_all_tools", "WireGuard VPN", prefixes=("wireguard_",)),
+    ToolTable("system_all_tools", "System Settings", prefixes=("system_",)),
+    ToolTable(
+        "backup_all_tools", "Backup & Restore", groups=("Backup Management Tools",)
+    ),
+    ToolTable("macro_all_tools", "Macros & Automation", prefixes=("macro_",)),
+    ToolTable("iac_all_tools", "Infrastructure as Code (IaC)", prefixes=("iac_",)),
+    ToolTable("cli_all_tools", "CLI Execute Tools", prefixes=("cli_",)),
+)
+
+TOOL_TABLE_COLUMNS = ["Tool", "Parameters", "Description"]
+
+
+def _table_for(tool, tables):
+    for table in tables:
+        if tool.name in table.names:
+            return table
+    matches = [
+        (len(prefix), index)
+        for index, table in enumerate(tables)
+        for prefix in table.prefixes
+        if tool.name.startswith(prefix)
+    ]
+    if matches:
+        return tables[max(matches)[1]]
+    for table in tables:
+        if tool.group in table.groups:
+            return table
+    # A group the guide does not know yet gets a table of its own
+    heading = re.sub(r"\s+tools?$", "", tool.group, flags=re.I) or "Other Tools"
+    slug = re.sub(r"[^a-z0-9]+", "_", heading.lower()).strip("_")
+    return ToolTable(f"{slug}_all_tools", heading, groups=(tool.group,))
+
+
+def parameter_summary(tool):
+    """Parameters column: names in order, `[]` for lists, `?` when optional"""
+    if not tool.parameters:
+        return "(none)"
+    return ", ".join(
+        name
+        + ("[]" if name in tool.arrays else "")
+        + ("" if name in tool.required else "?")
+        for name in tool.parameters
+    )
+
+
+def tool_reference_blocks(tools=None, tables=TOOL_TABLES):
+    """Level 2 heading and table per tool category, in the order of `tables`
+    (categories only known from the server source come last)"""
+    tools = load_tools() if tools is None else tools
+    rows = {}
+    order = list(tables)
+    for tool in tools:
+        table = _table_for(tool, order)
+        if table not in order:
+            order.append(table)
+        rows.setdefault(table, []).append(
+            [TOOL_PREFIX + tool.name, parameter_summary(tool), tool.description]
+        )
+
+    blocks = []
+    for table in order:
+        if table not in rows:
+            continue
+        if blocks:
+            blocks.append(Spacer(15))
+        blocks.append(Heading(table.heading, level=2))
+        blocks.append(
+            # Sized to the contents: tool names and parameter lists vary a lot
+            Table(id=table.id, rows=[TOOL_TABLE_COLUMNS, *rows[table]])
+        )
+    return blocks
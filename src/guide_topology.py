@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+OPNsense User Guide - Topology Layout
+Arranges the nodes and links of a network topology in layers, top to bottom,
+for the topology diagrams of the PDF renderer
+"""
+
+from bisect import bisect_right, insort
+from collections import deque
+from dataclasses import dataclass
+import functools
+from typing import Tuple
+
+# Rounds of barycenter reordering (one pass down, one pass up) per layout
+ORDER_SWEEPS = 8
+
+# ============================================================================
+# GRAPH
+# ============================================================================
+
+
+@dataclass(frozen=True)
+class Node:
+    """A box in the diagram: an interface, network, VLAN, VPN peer, host...
+
+    `detail` is an optional second line under the label, such as a subnet.
+    """
+
+    id: str
+    label: str
+    kind: str = "network"
+    detail: str = ""
+
+
+@dataclass(frozen=True)
+class Link:
+    """A line from `source` down to `target`"""
+
+    source: str
+    target: str
+    label: str = ""
+    kind: str = "link"
+
+
+def topology_graph(nodes, links=()):
+    """Normalize nodes and links to hashable (Node tuple, Link tuple).
+
+    Both may be given as the dataclasses or as the plain lists of a
+    guide_model.Topology block. Raises ValueError for a duplicate node id
+    or a link to an unknown node.
+    """
+    nodes = tuple(node if isinstance(node, Node) else Node(*node) for node in nodes)
+    links = tuple(link if isinstance(link, Link) else Link(*link) for link in links)
+    ids = set()
+    for node in nodes:
+        if node.id in ids:
+            raise ValueError(f"duplicate topology node {node.id!r}")
+        ids.add(node.id)
+    for link in links:
+        for end in (link.source, link.target):
+            if end not in ids:
+                raise ValueError(
+                    f"link {link.source!r} -> {link.target!r}: unknown node {end!r}"
+                )
+    return nodes, links
+
+
+# ============================================================================
+# LAYERED LAYOUT
+# ============================================================================
+# A simplified Sugiyama layout: break cycles, assign each node to a layer
+# (row), then reorder the rows to reduce crossing links. Every step is
+# linear in the size of the graph apart from sorting, so hundreds of nodes
+# lay out in milliseconds.
+
+
+def _acyclic_edges(count, edges):
+    """`edges` (index pairs) with the links that close a cycle reversed.
+
+    A depth-first search from each node in input order decides which links
+    are reversed, so the order the nodes are written in picks how a loop
+    (a VPN mesh, say) is drawn.
+    """
+    successors = [[] for _ in range(count)]
+    for source, target in edges:
+        if source != target:
+            successors[source].append(target)
+
+    # 0: not visited, 1: on the search path, 2: finished
+    state = [0] * count
+    result = set()
+    for root in range(count):
+        if state[root]:
+            continue
+        state[root] = 1
+        stack = [(root, iter(successors[root]))]
+        while stack:
+            node, pending = stack[-1]
+            for target in pending:
+                if state[target] == 1:
+                    result.add((target, node))
+                    continue
+                result.add((node, target))
+                if state[target] == 0:
+                    state[target] = 1
+                    stack.append((target, iter(successors[target])))
+                    break
+            else:
+                state[node] = 2
+                stack.pop()
+    return sorted(result)
+
+
+def _assign_layers(count, down, up):
+    """Layer of every node: the longest path to it from a node without links in.
+
+    Nodes that only have links out are then moved down to sit right above
+    their highest successor instead of all sharing the top row.
+    """
+    layer = [0] * count
+    waiting = [len(up[node]) for node in range(count)]
+    queue = deque(node for node in range(count) if not waiting[node])
+    while queue:
+        node = queue.popleft()
+        for target in down[node]:
+            layer[target] = max(layer[target], layer[node] + 1)
+            waiting[target] -= 1
+            if not waiting[target]:
+                queue.append(target)
+    for node in range(count):
+        if down[node] and not up[node]:
+            layer[node] = min(layer[target] for target in down[node]) - 1
+    return layer
+
+
+def _crossings(layers, down, layer_of, rank):
+    """Crossings between links that join neighbouring layers"""
+    total = 0
+    for upper in layers[:-1]:
+        pairs = sorted(
+            (rank[node], rank[target])
+            for node in upper
+            for target in down[node]
+            if layer_of[target] == layer_of[node] + 1
+        )
+        seen = []
+        for _, lower in pairs:
+            total += len(seen) - bisect_right(seen, lower)
+            insort(seen, lower)
+    return total
+
+
+def _sweep(layers, neighbours, position):
+    """Sort each layer by the mean position of the nodes' neighbours.
+
+    Positions are relative to the width of their layer, so rows of
+    different lengths can be compared; nodes without neighbours on that
+    side keep their place.
+    """
+    for layer in layers:
+
+        def barycenter(node):
+            linked = neighbours[node]
+            if not linked:
+                return position[node]
+            return sum(position[other] for other in linked) / len(linked)
+
+        layer.sort(key=barycenter)
+        for index, node in enumerate(layer):
+            position[node] = (index + 0.5) / len(layer)
+
+
+def _order_layers(layers, down, up, layer_of):
+    """Reorder the layers in place, keeping the order with the fewest crossings"""
+    position = [0.0] * len(layer_of)
+    rank = [0] * len(layer_of)
+    for layer in layers:
+        for index, node in enumerate(layer):
+            position[node] = (index + 0.5) / len(layer)
+            rank[node] = index
+
+    best = [list(layer) for layer in layers]
+    fewest = _crossings(layers, down, layer_of, rank)
+    for _ in range(ORDER_SWEEPS):
+        if not fewest:
+            break
+        _sweep(layers[1:], up, position)
+        _sweep(layers[-2::-1], down, position)
+        for layer in layers:
+            for index, node in enumerate(layer):
+                rank[node] = index
+        crossings = _crossings(layers, down, layer_of, rank)
+        if crossings < fewest:
+            best = [list(layer) for layer in layers]
+            fewest = crossings
+    layers[:] = best
+
+
+@functools.lru_cache(maxsize=256)
+def layer_graph(nodes, links) -> Tuple[Tuple[str, ...], ...]:
+    """Node ids per layer, top to bottom, each layer ordered left to right.
+
+    Takes the output of topology_graph(). Every link runs from a layer to
+    a lower one (links that close a cycle are drawn the other way round);
+    the result is cached per graph.
+    """
+    index = {node.id: number for number, node in enumerate(nodes)}
+    edges = _acyclic_edges(
+        len(nodes), [(index[link.source], index[link.target]) for link in links]
+    )
+    down = [[] for _ in nodes]
+    up = [[] for _ in nodes]
+    for source, target in edges:
+        down[source].append(target)
+        up[target].append(source)
+
+    layer_of = _assign_layers(len(nodes), down, up)
+    layers = [[] for _ in range(max(layer_of, default=-1) + 1)]
+    for node, layer in enumerate(layer_of):
+        layers[layer].append(node)
+    _order_layers(layers, down, up, layer_of)
+    return tuple(tuple(nodes[node].id for node in layer) for layer in layers)
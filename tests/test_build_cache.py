@@ -0,0 +1,38 @@
+"""Changing any input of a build unit misses the chapter cache"""
+
+import io
+import shutil
+
+import pytest
+
+guide_pdf = pytest.importorskip("guide_pdf")
+
+
+@pytest.fixture
+def logo(tmp_path, monkeypatch):
+    path = tmp_path / "logo.svg"
+    shutil.copy(guide_pdf.OPNSENSE_LOGO_PATH, path)
+    monkeypatch.setattr(guide_pdf, "OPNSENSE_LOGO_PATH", str(path))
+    monkeypatch.setattr(guide_pdf, "RENDER_ASSETS", (str(path),))
+    return path
+
+
+def _render(cache_dir):
+    options = guide_pdf.RenderOptions(chapters=("4",), cache_dir=str(cache_dir))
+    return guide_pdf.render_guide(options, io.BytesIO())
+
+
+def test_unchanged_inputs_hit_the_cache(tmp_path, logo):
+    assert _render(tmp_path / "cache").cached == []
+    assert _render(tmp_path / "cache").cached == ["4"]
+
+
+def test_changed_asset_misses_the_cache(tmp_path, logo):
+    styles = guide_pdf.get_styles()
+    before = guide_pdf.build_fingerprint(styles)
+    _render(tmp_path / "cache")
+
+    logo.write_text(logo.read_text().replace("</svg>", "<g/></svg>"))
+
+    assert guide_pdf.build_fingerprint(styles) != before
+    assert _render(tmp_path / "cache").cached == []
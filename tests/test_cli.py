@@ -0,0 +1,39 @@
+"""opnsense_user_guide.py: --output picks the format and is only replaced by a finished build"""
+
+import pytest
+
+cli = pytest.importorskip("opnsense_user_guide")
+guide_pdf = pytest.importorskip("guide_pdf")
+
+
+def test_chapters_output_defaults_to_pdf(tmp_path):
+    output = tmp_path / "chapter4.pdf"
+    cli.main(["--chapters", "4", "-o", str(output)])
+    assert output.read_bytes().startswith(b"%PDF")
+
+
+@pytest.mark.parametrize(
+    "name, fmt",
+    [("x.pdf", "pdf"), ("x.jsonl", "jsonl"), ("x.md", "markdown"), ("x", "pdf")],
+)
+def test_format_follows_output_extension(name, fmt):
+    assert cli.output_formats("all", name, ["4"]) == [fmt]
+
+
+def test_output_without_format_or_extension_is_refused():
+    assert cli.output_formats("all", "x", None) is None
+    assert cli.output_formats("jsonl", "x", None) == ["jsonl"]
+
+
+def test_failed_build_keeps_previous_output(tmp_path, monkeypatch):
+    output = tmp_path / "chapter4.pdf"
+    output.write_bytes(b"previous build")
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("render failed")
+
+    monkeypatch.setattr(guide_pdf, "render_guide", fail)
+    with pytest.raises(RuntimeError):
+        cli.main(["--chapters", "4", "-o", str(output)])
+    assert output.read_bytes() == b"previous build"
+    assert [path.name for path in tmp_path.iterdir()] == ["chapter4.pdf"]
@@ -0,0 +1,44 @@
+"""fit_column_widths() gives every column a usable width"""
+
+import pytest
+
+guide_pdf = pytest.importorskip("guide_pdf")
+from reportlab.platypus import Spacer  # noqa: E402
+
+WIDTH = guide_pdf.TABLE_WIDTH
+
+
+def test_flowable_only_column_gets_an_even_share():
+    data = [
+        ["Name", "Diagram"],
+        ["WAN", Spacer(10, 10)],
+        ["LAN", Spacer(10, 10)],
+    ]
+    widths = guide_pdf.fit_column_widths(data)
+    assert widths[1] == pytest.approx(WIDTH / 2)
+    assert 0 < widths[0] <= WIDTH / 2
+
+
+def test_table_without_text_is_split_evenly():
+    data = [[Spacer(10, 10), Spacer(10, 10), Spacer(10, 10)]]
+    assert guide_pdf.fit_column_widths(data) == pytest.approx([WIDTH / 3] * 3)
+
+
+def test_table_without_rows_has_no_columns():
+    assert guide_pdf.fit_column_widths([]) == []
+
+
+def test_wide_text_shares_what_the_flowables_leave():
+    data = [["Text " * 60, Spacer(10, 10)]]
+    widths = guide_pdf.fit_column_widths(data)
+    assert sum(widths) == pytest.approx(WIDTH)
+    assert widths[1] == pytest.approx(WIDTH / 2)
+
+
+def test_table_with_flowable_column_lays_out():
+    table = guide_pdf.create_styled_table(
+        [["Name", "Diagram"], ["WAN", Spacer(10, 10)]]
+    )
+    width, height = table.wrap(WIDTH, 1000)
+    assert width == pytest.approx(sum(table._colWidths))
+    assert height > 0
@@ -0,0 +1,53 @@
+"""The lean knowledge base keeps the tools, workflows and quick reference within budget"""
+
+import io
+
+import pytest
+
+guide_export = pytest.importorskip("guide_export")
+guide_model = pytest.importorskip("guide_model")
+
+
+@pytest.fixture(scope="module")
+def guide():
+    return guide_model.load_guide()
+
+
+@pytest.fixture(scope="module")
+def lean(guide):
+    out = io.StringIO()
+    guide_export.write_markdown(guide, out, lean=True)
+    return out.getvalue()
+
+
+def test_lean_markdown_within_budget(lean):
+    size = len(lean.encode("utf-8"))
+    assert size <= guide_export.LEAN_BUDGET_BYTES, (
+        f"lean knowledge base is {size} bytes, "
+        f"budget {guide_export.LEAN_BUDGET_BYTES}"
+    )
+
+
+def test_lean_markdown_lists_every_tool_once(guide, lean):
+    tools = {
+        guide_export.plain_text(str(row[0]))
+        for chapter in guide.chapters
+        for block in guide_model.iter_blocks(chapter.blocks)
+        if isinstance(block, guide_model.Table)
+        and tuple(block.rows[0]) == guide_export.LEAN_TOOL_HEADER
+        for row in block.rows[1:]
+    }
+    listed = [
+        line.split(" - ")[0]
+        for line in lean.splitlines()
+        if line.startswith(guide_export.MCP_TOOL_PREFIX) and " - " in line
+    ]
+    assert sorted(listed) == sorted(tools)
+
+
+@pytest.mark.parametrize(
+    "heading",
+    ["#### Create a VLAN Network", "#### Quick Diagnostics", "### Common Ports"],
+)
+def test_lean_markdown_keeps_workflows_and_quick_reference(lean, heading):
+    assert heading in lean.splitlines()
@@ -0,0 +1,66 @@
+"""Text outside the standard fonts is set in DejaVu Sans wherever it is drawn"""
+
+import io
+
+import pytest
+
+guide_pdf = pytest.importorskip("guide_pdf")
+pypdf = pytest.importorskip("pypdf")
+from reportlab.platypus import SimpleDocTemplate  # noqa: E402
+
+TITLE = "Привет"
+CALLOUT = "Проверка ✓ текст"
+CELL = "Тест ✓"
+
+
+def _fonts_by_text(flowables):
+    """{text run: base font} for every run drawn on the rendered pages"""
+    out = io.BytesIO()
+    SimpleDocTemplate(out, pagesize=guide_pdf.PAGE_SIZE).build(flowables)
+    drawn = {}
+
+    def visitor(text, cm, tm, font_dict, font_size):
+        if text.strip() and font_dict is not None:
+            drawn[text.strip()] = str(font_dict["/BaseFont"]).lstrip("/")
+
+    for page in pypdf.PdfReader(io.BytesIO(out.getvalue())).pages:
+        page.extract_text(visitor_text=visitor)
+    return drawn
+
+
+@pytest.fixture(scope="module")
+def drawn():
+    return _fonts_by_text(
+        [
+            guide_pdf.ChapterHeader(9, TITLE),
+            guide_pdf.IconBox(CALLOUT, "tip"),
+            guide_pdf.create_styled_table([["Name", "Value"], ["a", CELL]]),
+        ]
+    )
+
+
+def _font_of(drawn, fragment):
+    fonts = [font for text, font in drawn.items() if fragment in text]
+    assert fonts, f"{fragment!r} was not drawn: {drawn}"
+    return fonts
+
+
+@pytest.mark.parametrize(
+    "fragment, font",
+    [
+        ("Привет", "DejaVuSans-Bold"),
+        ("Проверка", "DejaVuSans"),
+        ("Тест", "DejaVuSans"),
+        # ZapfDingbats has a check mark of its own
+        ("✓", "ZapfDingbats"),
+    ],
+)
+def test_uncovered_text_uses_fallback_font(drawn, fragment, font):
+    # Embedded subsets are named "AAAAAA+<font>"
+    used = {name.split("+")[-1] for name in _font_of(drawn, fragment)}
+    assert used == {font}
+
+
+def test_latin_text_keeps_standard_font(drawn):
+    assert _font_of(drawn, "Value") == ["Helvetica-Bold"]
+    assert _font_of(drawn, "9") == ["Helvetica-Bold"]
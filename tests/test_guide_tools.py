@@ -0,0 +1,120 @@
+"""guide_tools reads the MCP server's tool list from its TypeScript source"""
+
+import json
+
+import pytest
+
+guide_tools = pytest.importorskip("guide_tools")
+
+
+def parse(text):
+    return guide_tools._LiteralParser(text).value()
+
+
+@pytest.mark.parametrize(
+    "literal, value",
+    [
+        (r"'it\'s'", "it's"),
+        (r'"say \"hi\""', 'say "hi"'),
+        (r"'tab\tand\nnewline'", "tab\tand\nnewline"),
+        (r"'back\\slash'", "back\\slash"),
+        (r"'été'", "été"),
+    ],
+)
+def test_string_escapes(literal, value):
+    assert parse(literal) == value
+
+
+@pytest.mark.parametrize(
+    "literal, value",
+    [
+        ("`plain`", "plain"),
+        ("`two\nlines`", "two\nlines"),
+        ('`it\'s "quoted"`', 'it\'s "quoted"'),
+        (r"`a \`tick\` and \n`", "a `tick` and \n"),
+        ("`rule ${name}`", "rule ${name}"),
+    ],
+)
+def test_template_literals(literal, value):
+    assert parse(literal) == value
+
+
+def test_nested_schema():
+    literal = """{
+      name: 'create_rule',
+      description: 'Create a rule',
+      inputSchema: {
+        type: 'object',
+        properties: {
+          ports: { type: 'array', items: { type: 'number' } },
+          options: { type: 'object', properties: { log: { type: 'boolean' } } },
+          'quoted-key': { type: 'string', default: null },
+        },
+        required: ['ports'],
+      },
+    }"""
+    definition = parse(literal)
+    assert definition["inputSchema"]["properties"]["options"] == {
+        "type": "object",
+        "properties": {"log": {"type": "boolean"}},
+    }
+    tool = guide_tools._tool(definition)
+    assert tool.parameters == ["ports", "options", "quoted-key"]
+    assert tool.required == ["ports"]
+    assert tool.arrays == ["ports"]
+
+
+def test_comments_and_conditional_spreads():
+    literal = """[
+      // Group one
+      { name: 'a' },
+      ...(enabled ? [{ name: 'b' }] : []),
+      /* skipped */ { name: 'c', count: -2, ok: true },
+    ]"""
+    items = parse(literal)
+    assert items == [
+        "Group one",
+        {"name": "a"},
+        {"name": "b"},
+        {"name": "c", "count": -2, "ok": True},
+    ]
+    assert isinstance(items[0], guide_tools._Comment)
+
+
+SOURCE = """
+server.setRequestHandler(ListToolsRequestSchema, async () => ({
+  tools: [
+    // Test Tools
+    { name: 'described', description: 'From the source', inputSchema: {} },
+    { name: 'undescribed', inputSchema: { type: 'object', properties: {} } },
+  ],
+}));
+"""
+
+
+def test_missing_description_falls_back_to_schema_json(tmp_path):
+    source = tmp_path / "index.ts"
+    source.write_text(SOURCE)
+    schema = tmp_path / "schema.json"
+    schema.write_text(
+        json.dumps(
+            {
+                "tools": {
+                    "described": {"description": "From the manifest"},
+                    "undescribed": {"description": "From the manifest"},
+                }
+            }
+        )
+    )
+    tools = guide_tools.parse_tools(str(source), str(schema))
+    assert [(t.name, t.description, t.group) for t in tools] == [
+        ("described", "From the source", "Test Tools"),
+        ("undescribed", "From the manifest", "Test Tools"),
+    ]
+
+
+def test_server_source_lists_every_tool():
+    tools = guide_tools.parse_tools()
+    assert len(tools) == 130
+    assert len({tool.name for tool in tools}) == 130
+    assert all(tool.description for tool in tools)
@@ -0,0 +1,26 @@
+"""The JSONL and Markdown exports start fast and never load the PDF stack"""
+
+import pytest
+
+bench = pytest.importorskip("bench_user_guide")
+
+# Fresh interpreters to take the best of, as in check_import_budget()
+REPEAT = 5
+
+
+@pytest.fixture(scope="module")
+def probes():
+    return [bench._run_probe(bench._IMPORT_PROBE) for _ in range(REPEAT)]
+
+
+def test_export_stays_within_import_budget(probes):
+    best = min(run["ms"] for run in probes)
+    assert best <= bench.IMPORT_BUDGET_MS, (
+        f"import + JSONL export took {best:.1f} ms, "
+        f"budget {bench.IMPORT_BUDGET_MS} ms"
+    )
+
+
+@pytest.mark.parametrize("module", ["reportlab", "pypdf"])
+def test_export_does_not_import(probes, module):
+    assert not any(run[module] for run in probes)
@@ -0,0 +1,23 @@
+"""The layout profile counts the pages of the document it built"""
+
+import io
+
+import pytest
+
+guide_pdf = pytest.importorskip("guide_pdf")
+guide_profile = pytest.importorskip("guide_profile")
+pypdf = pytest.importorskip("pypdf")
+
+
+def test_page_counters_add_up_to_the_document():
+    out = io.BytesIO()
+    profiler = guide_profile.profile_guide(guide_pdf.RenderOptions(), out)
+
+    pages = {
+        chapter: value
+        for (chapter, name), value in profiler.counters.items()
+        if name == "pages"
+    }
+    # The front matter is laid out again until its page numbers settle;
+    # only its last layout counts
+    assert sum(pages.values()) == len(pypdf.PdfReader(out).pages)
@@ -0,0 +1,62 @@
+"""render_guide() is re-entrant: concurrent builds match the same builds run alone"""
+
+from concurrent.futures import ThreadPoolExecutor
+import io
+
+import pytest
+
+guide_pdf = pytest.importorskip("guide_pdf")
+pypdf = pytest.importorskip("pypdf")
+
+# Different page sizes, cache modes and unit sets, so the threads share the
+# process-wide caches (drawings, text metrics, page chrome) while building
+# different documents
+OPTIONS = [
+    {},
+    {"pagesize": "a4"},
+    {"use_cache": False},
+    {"chapters": ("4", "C")},
+]
+
+
+def _pages(data):
+    """Every page's content streams and the forms it draws, decoded.
+
+    The raw bytes differ between any two builds (creation date, file id),
+    so the comparison is of what the pages draw.
+    """
+    pages = []
+    for page in pypdf.PdfReader(io.BytesIO(data)).pages:
+        streams = [page.get_contents().get_data()]
+        pending = [page.get("/Resources")]
+        while pending:
+            resources = pending.pop()
+            if resources is None:
+                continue
+            xobjects = resources.get_object().get("/XObject") or {}
+            for name in sorted(xobjects):
+                xobject = xobjects[name].get_object()
+                streams.append((name, xobject.get_data()))
+                pending.append(xobject.get("/Resources"))
+        pages.append(streams)
+    return pages
+
+
+def _render(options, cache_dir):
+    out = io.BytesIO()
+    guide_pdf.render_guide(guide_pdf.RenderOptions(cache_dir=cache_dir, **options), out)
+    return _pages(out.getvalue())
+
+
+def test_concurrent_builds_match_serial_builds(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    alone = [_render(options, cache_dir) for options in OPTIONS]
+
+    jobs = OPTIONS * 2
+    with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+        results = list(pool.map(lambda options: _render(options, cache_dir), jobs))
+
+    for index, result in enumerate(results):
+        expected = alone[index % len(OPTIONS)]
+        assert len(result) == len(expected), jobs[index]
+        assert result == expected, jobs[index]
@@ -0,0 +1,25 @@
+"""render_guide() reports a render time for every build unit in every mode"""
+
+import io
+
+import pytest
+
+guide_pdf = pytest.importorskip("guide_pdf")
+
+
+@pytest.mark.parametrize(
+    "options",
+    [{"use_cache": False}, {"use_cache": False, "chapters": ("4", "C")}, {}],
+    ids=["single-pass", "single-pass-chapters", "stitched"],
+)
+def test_chapter_seconds_cover_every_unit(tmp_path, options):
+    options = guide_pdf.RenderOptions(cache_dir=str(tmp_path), **options)
+    result = guide_pdf.render_guide(options, io.BytesIO())
+
+    guide = guide_pdf.model.load_guide()
+    front_matter = options.chapters is None
+    if not front_matter:
+        guide = guide.select(options.chapters)
+    assert list(result.chapter_seconds) == guide_pdf.unit_keys(guide, front_matter)
+    assert all(seconds > 0 for seconds in result.chapter_seconds.values())
+    assert sum(result.chapter_seconds.values()) <= result.seconds